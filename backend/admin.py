@@ -3,40 +3,48 @@
 
 from symbols import * #importa os símbolos a serem inseridos na matriz do jogo
 import random	#usado apenas nas jogadas da IA no modo PvE
+from logic.board import BLACK, WHITE
+from logic.rules import get_rules
+from logic.runs import RunTracker
 
 
 #um objeto da classe admin não é um jogador, mas funciona como uma forma de "cuidador",
 #montando o jogo e administrando as jogadas e condição de vitória
 class Admin:
-	def __init__(self, ):
-		pass
+	def __init__(self, rules=None):
+		#tamanho do tabuleiro e variante de regras (BOARD_SIZE / GAME_VARIANT)
+		self.rules = rules or get_rules()
+		self.size = self.rules.size
+		self.board = None
+		self.matrix = None
 
 #Cria uma lista de listas que será utilizada como a matriz do jogo, inserindo símbolos
 #da tabela unicode em ordem, que são substituídos por peças dos jogadores em cada rodada 
 	def createTable(self):
 		table = []
 		#cria todas as "linhas" da matriz
-		for i in range(19):
+		last = self.size - 1
+		for i in range(self.size):
 			table.append([])
 
 		#insere os símbolos na primeira linha
 		table[0].append(corner1)
-		for i in range(17):
+		for i in range(self.size - 2):
 			table[0].append(uhline)		
 		table[0].append(corner2)
 
 		#insere os símbolos na última linha
-		table[18].append(corner3)
-		for i in range(17):
-			table[18].append(lhline)		
-		table[18].append(corner4)
+		table[last].append(corner3)
+		for i in range(self.size - 2):
+			table[last].append(lhline)		
+		table[last].append(corner4)
 
 		#constrói todo o meio da matriz
-		for i in range(1, 18):
-			for j in range(19):
+		for i in range(1, last):
+			for j in range(self.size):
 				if (j == 0):
 					table[i].append(lvline)
-				elif (j == 18):
+				elif (j == last):
 					table[i].append(rvline)
 				else:
 					table[i].append(cross)		
@@ -49,29 +57,21 @@ class Admin:
 	
 #mostra de forma enumerada, linha a linha, a matriz do jogo
 	def printTable(self, table):
+		print(self.renderTable(table))
+		self.printLines()
 
-		print()
-
+#monta o tabuleiro inteiro numa única string (um print só, em vez de um por casa);
+#só é chamado quando o tabuleiro vai ser mostrado
+	def renderTable(self, table):
+		rows = ['']
 		for i in range(len(table)):
-			#mostra primeiro o "nome" da linha
-			print(f'{chr(i+65)} ', end='')
-			
-			#mostra a linha atual, item a item, com uma linha horizontal após cada item
-			for j in range(len(table[i])):
-				if (j < len(table[i])-1):
-					print(table[i][j], end=hline)	
-				else:									
-					print(table[i][j], end='')		
-			print()
-
-			#como uma última linha, mostra o "nome" de cada coluna
-			if (i == 18):
-				print(' '*2, end='')
-				for n in range(19):
-					print(f'{chr(n+65)}', end=' ')
-				print()
-		print()
-		self.printLines()
+			#"nome" da linha seguido dos itens, com uma linha horizontal entre eles
+			rows.append(f'{chr(i+65)} ' + hline.join(table[i]))
+
+		#como uma última linha, mostra o "nome" de cada coluna
+		rows.append(' '*2 + ''.join(f'{chr(n+65)} ' for n in range(len(table))))
+		rows.append('')
+		return '\n'.join(rows)
 
 
 #decodifica uma coordenada de jogada de caractere para inteiro.
@@ -85,9 +85,10 @@ class Admin:
 			c = 'z'
 		
 		c = ord(c)-97	   
-		if (c >= 0 and c <= 18): #caso a entrada seja uma letra minuscula
+		last = self.size - 1
+		if (c >= 0 and c <= last): #caso a entrada seja uma letra minuscula
 			return c
-		elif (c >= -32 and c <= -14):  #caso a entrada seja uma letra maiuscula
+		elif (c >= -32 and c <= -32 + last):  #caso a entrada seja uma letra maiuscula
 			c+=32
 			return c
 		return c
@@ -95,7 +96,7 @@ class Admin:
 	#verifica se o pedido de inserção do jogador é valido, avaliando se há alguma peça
 	#na posição pedida e se esta está dentro dos índices da matriz
 	def checkValidInsertion(self, c1, c2, matrix):
-		validCoordinates = (c1 >= 0 and c1 <= 18 and c2 >= 0 and c2 <= 18)
+		validCoordinates = self.rules.in_bounds(c1, c2)
 		if (validCoordinates):
 			#spotOccupied pode ser declarado apenas se as coordenadas forem válidas,
 			#caso contrário poderá ocorrer erro de indexação
@@ -108,87 +109,39 @@ class Admin:
 		else:
 			return False 
 
-	#checa se algum jogador venceu, procurando 5 peças em sequência na linha, coluna,
-	#e diagonais que abrangem a coordenada da última peça inserida
-	def winCheck(self, player, line, column, matrix):
-		#Line check
-		win = False
-		inSequence = 0
-		for j in range(len(matrix[line])):
-			current = matrix[line][j]
-			if  (current == player.piece):
-				inSequence+=1
-				if (inSequence == 5):
-					win = True
-			else:
-				inSequence = 0
-
-		#Column check
-		inSequence = 0
-		for i in range(len(matrix[line])):
-			current = matrix[i][column]
-			if  (current == player.piece):
-				inSequence+=1
-				if (inSequence == 5):
-					win = True
-			else:
-				inSequence = 0
-
-		#diagonal check
-		if (line <= column):	#ocorre caso o último movimento tenha ocorrido acima
-			inSequence = 0		#ou na própria diagonal principal
-			currentLine = 0
-			for j in range(column-line, 19):
-				current = matrix[currentLine][j]
-				if  (current == player.piece):
-					inSequence+=1
-					if (inSequence == 5):
-						win = True
-				else:
-					inSequence = 0
-				currentLine+=1
-
-		elif (column < line):	#ocorre caso o último movimento tenha ocorrido abaixo
-			inSequence = 0		#da diagonal principal
-			currentColumn = 0
-			for i in range(line-column, 19):
-				current = matrix[currentColumn][i]
-				if  (current == player.piece):
-					inSequence+=1
-					if (inSequence == 5):
-						win = True
-				else:
-					inSequence = 0
-				currentColumn-=1
-
-		#counterdiagonal check
-		if (line+column <= 18):	#ocorre caso o último movimento tenha ocorrido acima ou
-			inSequence = 0		#na própria diagonal secundária
-			currentLine = 0
-			for j in range(column+line, -1, -1):
-				current = matrix[currentLine][j]
-				if  (current == player.piece):
-					inSequence+=1
-					if (inSequence == 5):
-						win = True
-				else:
-					inSequence = 0
-				currentLine+=1
-
-		elif (column > line):	#ocorre caso o último movimento tenha ocorrido abaixo
-			inSequence = 0		#da diagonal secundária
-			currentColumn = 18
-			for i in range(line-column, 19):
-				current = matrix[currentColumn][i]
-				if  (current == player.piece):
-					inSequence+=1
-					if (inSequence == 5):
-						win = True
-				else:
-					inSequence = 0
-				currentColumn-=1
+	#verifica se a variante de regras proíbe a jogada ao jogador (Renju: as
+	#pretas não podem fazer seis em linha, quatro duplo ou três duplo)
+	def checkAllowedInsertion(self, player, c1, c2, matrix):
+		board = self.boardFor(matrix)
+		color = BLACK if player.piece == p1piece else WHITE
+		return self.rules.forbidden(board, board.index(c1, c2), color) is None
 
-		return win
+	#checa se algum jogador venceu: o tabuleiro interno guarda o comprimento das
+	#sequências de peças nas quatro direções e as junta a cada inserção, então
+	#a checagem é uma consulta em vez de varrer linha, coluna e diagonais
+	def winCheck(self, player, line, column, matrix):
+		board = self.boardFor(matrix)
+		index = board.index(line, column)
+		color = BLACK if player.piece == p1piece else WHITE
+		if (board.color_at(index) != color):
+			board.remove(index)
+			board.place(index, color)
+		return board.is_five_at(index, color)
+
+	#devolve o tabuleiro que acompanha a matriz do jogo, montando-o a partir
+	#das peças já inseridas quando a matriz ainda não é conhecida
+	def boardFor(self, matrix):
+		if (self.board is None or self.matrix is not matrix):
+			self.board = get_rules(len(matrix), self.rules.variant).new_board()
+			for i in range(len(matrix)):
+				for j in range(len(matrix[i])):
+					if (matrix[i][j] == p1piece):
+						self.board.place(self.board.index(i, j), BLACK)
+					elif (matrix[i][j] == p2piece):
+						self.board.place(self.board.index(i, j), WHITE)
+			RunTracker(self.board).attach()
+			self.matrix = matrix
+		return self.board
 
 	#insere a peça de um jogador no local designado caso a jogada seja válida, 
 	#trocando um símbolo de construção da tabela pela peça do respectivo
@@ -202,7 +155,8 @@ class Admin:
 				coord1 = self.coordDecoder(array[0]) 
 				coord2 = self.coordDecoder(array[1])
 
-				if (self.checkValidInsertion(coord1, coord2, matrix)):
+				if (self.checkValidInsertion(coord1, coord2, matrix)
+						and self.checkAllowedInsertion(player, coord1, coord2, matrix)):
 					matrix[coord1][coord2] = player.piece
 					self.printTable(matrix)
 					insertion = True
@@ -215,14 +169,49 @@ class Admin:
 		else:								#caso o jogador atual seja a IA
 			print(player)
 			while (not insertion):
-				coord1 = random.randint(0,18)
-				coord2 = random.randint(0,18)
+				coord1 = random.randint(0, self.size-1)
+				coord2 = random.randint(0, self.size-1)
 	
-				if (self.checkValidInsertion(coord1, coord2, matrix)):
+				if (self.checkValidInsertion(coord1, coord2, matrix)
+						and self.checkAllowedInsertion(player, coord1, coord2, matrix)):
 					matrix[coord1][coord2] = player.piece
 					print(f"Input row coordinate:{chr(coord1+65)}")
 					print(f"Input column coordinate:{chr(coord2+65)}")
 					self.printTable(matrix)
 					insertion = True
 	
-			return(self.winCheck(player, coord1, coord2, matrix))
\ No newline at end of file
+			return(self.winCheck(player, coord1, coord2, matrix))
+	#joga uma partida inteira sem terminal entre dois jogadores automáticos
+	#(player.RandomPlayer / player.EnginePlayer): nada é impresso, e o tabuleiro
+	#só é montado como texto se display for pedido. As jogadas de opening são
+	#feitas antes, alternando as cores a partir das pretas, para que jogadores
+	#determinísticos não repitam sempre a mesma partida. Uma jogada inválida
+	#perde a partida. Devolve o vencedor (None no empate), as jogadas e o motivo do fim
+	def playGame(self, p1, p2, display=False, opening=()):
+		matrix = self.createTable()
+		moves = []
+		current, other = p1, p2
+		end = 'draw'
+		winner = None
+		while (len(moves) < self.size ** 2):
+			if (len(moves) < len(opening)):
+				coord1, coord2 = opening[len(moves)]
+			else:
+				coord1, coord2 = current.chooseMove(self, matrix)
+			if (not (self.checkValidInsertion(coord1, coord2, matrix)
+					and self.checkAllowedInsertion(current, coord1, coord2, matrix))):
+				winner, end = other, 'invalid'
+				break
+			matrix[coord1][coord2] = current.piece
+			moves.append((coord1, coord2))
+			if (self.winCheck(current, coord1, coord2, matrix)):
+				winner, end = current, 'five'
+				break
+			current, other = other, current
+
+		return {
+			'winner': winner,
+			'moves': moves,
+			'end': end,
+			'table': self.renderTable(matrix) if display else None,
+		}
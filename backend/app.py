@@ -15,6 +15,8 @@ from routers import auth, users, websocket_games, lobby, recordings, webrtc, ran
 from routers.games import router as games_router
 from models.database import database
 from services.cleanup_service import cleanup_service
+from services.ai_service import ai_service
+from services.analysis_service import analysis_service
 
 load_dotenv()
 
@@ -34,11 +36,17 @@ async def lifespan(app: FastAPI):
     await connect_to_mongo()
     logger.info("🔄 Starting cleanup service...")
     asyncio.create_task(cleanup_service.start())
+    logger.info("🤖 Starting AI worker pool...")
+    ai_service.start()
+    logger.info("🔍 Starting game analysis workers...")
+    asyncio.create_task(analysis_service.start())
     logger.info("✅ Server ready!")
     yield
     # Shutdown
     logger.info("🛑 Shutting down...")
     cleanup_service.stop()
+    ai_service.stop()
+    analysis_service.stop()
     await close_mongo_connection()
     logger.info("👋 Goodbye!")
 
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Gera o livro de aberturas da IA (data/opening_book_<size>.bin)
+
+    python build_opening_book.py --size 15                # linhas jogadas pelo motor
+    python build_opening_book.py --size 15 --from-mongo   # + partidas terminadas no MongoDB
+"""
+import argparse
+import asyncio
+import time
+
+from dotenv import load_dotenv
+
+from logic.book import (
+    DEFAULT_MAX_PLIES, book_path, build_book, generate_lines, lines_from_games, write_book,
+)
+from logic.rules import FREESTYLE
+
+load_dotenv()
+
+
+async def load_finished_games(size: int) -> list:
+    """Move sequences of the finished games stored in MongoDB"""
+    from database import connect_to_mongo, close_mongo_connection, get_collection
+
+    await connect_to_mongo()
+    try:
+        games = await get_collection("games")
+        docs = await games.find(
+            {"status": "finished"}, {"moves": 1, "board": 1, "variant": 1}
+        ).to_list(length=None)
+    finally:
+        await close_mongo_connection()
+    # The engine lines are freestyle; games under other rules would skew the book
+    return lines_from_games(docs, size, FREESTYLE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the AI opening book")
+    parser.add_argument("--size", type=int, default=15)
+    parser.add_argument("--plies", type=int, default=8, help="length of the generated lines")
+    parser.add_argument("--max-plies", type=int, default=DEFAULT_MAX_PLIES, help="deepest position stored")
+    parser.add_argument("--replies", type=int, default=3, help="black alternatives tried per move")
+    parser.add_argument("--radius", type=int, default=2, help="black first moves around the centre")
+    parser.add_argument("--time-limit", type=float, default=0.2, help="engine seconds per white move")
+    parser.add_argument("--from-mongo", action="store_true", help="also import finished games")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    started = time.time()
+    lines = generate_lines(args.size, plies=args.plies, replies=args.replies,
+                           radius=args.radius, time_limit=args.time_limit)
+    print(f"🤖 {len(lines)} engine lines in {time.time() - started:.1f}s")
+    if args.from_mongo:
+        imported = asyncio.run(load_finished_games(args.size))
+        print(f"📥 {len(imported)} games imported from MongoDB")
+        lines.extend(imported)
+
+    out = args.out or book_path(args.size)
+    count = write_book(out, build_book(lines, args.size, args.max_plies), args.size)
+    print(f"✅ {count} records written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,520 @@
+"""Compact bitboard representation of a Gomoku board.
+
+Every cell is addressed by a flat index ``row * size + col`` and each color
+is stored as a single Python ``int`` whose bit ``index`` is set when that
+color owns the cell. Line patterns (five in a row, open fours, ...) are
+detected with shift-and-mask over the whole board at once instead of
+walking the grid cell by cell.
+
+The API and Mongo documents keep using the list-of-lists shape
+(``"black"``/``"white"``/``None``); ``Board.from_rows``/``Board.to_rows``
+and ``Board.from_document`` convert between the two.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from logic import symmetry
+from logic.zobrist import zobrist_keys
+
+EMPTY = 0
+BLACK = 1
+WHITE = 2
+
+COLOR_NAMES = {BLACK: "black", WHITE: "white"}
+COLOR_CODES = {"black": BLACK, "white": WHITE}
+
+# (row step, col step) for horizontal, vertical, diagonal and anti-diagonal
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def opponent(color: int) -> int:
+    """Return the color code of the other player"""
+    return 3 - color
+
+
+def color_code(value: Any) -> int:
+    """Convert a board cell value ("black", PieceColor, None...) into a color code"""
+    if value is None:
+        return EMPTY
+    if isinstance(value, int):
+        return value
+    return COLOR_CODES.get(getattr(value, "value", value), EMPTY)
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the index of every set bit in ``mask`` (lowest first)"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Geometry:
+    """Shift amounts and window masks shared by every board of one size"""
+
+    __slots__ = ("size", "cells", "full", "shifts", "zobrist", "sym_zobrist", "_starts", "_cover", "_rings", "_neighbours", "_steps")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.cells = size * size
+        self.full = (1 << self.cells) - 1
+        self.zobrist = zobrist_keys(size)
+        # sym_zobrist[color][cell]: the key of that stone under each of the
+        # eight symmetries, i.e. the key of the cell it is mapped onto
+        images = symmetry.permutations(size)
+        self.sym_zobrist = tuple(
+            tuple(tuple(keys[image[cell]] for image in images) for cell in range(self.cells))
+            for keys in self.zobrist
+        )
+        # Moving one step along a direction adds ``shift`` to the flat index
+        self.shifts = tuple(dr * size + dc for dr, dc in DIRECTIONS)
+        self._starts: Dict[int, Tuple[int, ...]] = {}
+        self._cover: Dict[int, Tuple[Tuple[int, ...], ...]] = {}
+        self._rings: Dict[int, Tuple[int, ...]] = {}
+        self._neighbours: Dict[int, Tuple[Tuple[int, ...], ...]] = {}
+        self._steps: Optional[Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], ...]] = None
+
+    def starts(self, length: int) -> Tuple[int, ...]:
+        """Per direction, the mask of cells where a window of ``length`` fits.
+
+        Restricting a shifted AND to these start cells is what keeps a
+        horizontal window from wrapping onto the next row.
+        """
+        masks = self._starts.get(length)
+        if masks is None:
+            n = self.size
+            built = []
+            for dr, dc in DIRECTIONS:
+                mask = 0
+                for row in range(n):
+                    for col in range(n):
+                        end_row = row + dr * (length - 1)
+                        end_col = col + dc * (length - 1)
+                        if 0 <= end_row < n and 0 <= end_col < n:
+                            mask |= 1 << (row * n + col)
+                built.append(mask)
+            masks = self._starts[length] = tuple(built)
+        return masks
+
+    def cover(self, length: int) -> Tuple[Tuple[int, ...], ...]:
+        """Per direction and cell, the mask of window starts whose window contains the cell"""
+        masks = self._cover.get(length)
+        if masks is None:
+            built = []
+            for shift, start in zip(self.shifts, self.starts(length)):
+                per_cell = []
+                for index in range(self.cells):
+                    mask = 0
+                    for k in range(length):
+                        origin = index - k * shift
+                        if 0 <= origin < self.cells and start >> origin & 1:
+                            mask |= 1 << origin
+                    per_cell.append(mask)
+                built.append(tuple(per_cell))
+            masks = self._cover[length] = tuple(built)
+        return masks
+
+    def rings(self, radius: int) -> Tuple[int, ...]:
+        """Per cell, the mask of other cells within Chebyshev distance ``radius``"""
+        masks = self._rings.get(radius)
+        if masks is None:
+            n = self.size
+            built = []
+            for index in range(self.cells):
+                row, col = divmod(index, n)
+                mask = 0
+                for r in range(max(0, row - radius), min(n, row + radius + 1)):
+                    for c in range(max(0, col - radius), min(n, col + radius + 1)):
+                        mask |= 1 << (r * n + c)
+                built.append(mask & ~(1 << index))
+            masks = self._rings[radius] = tuple(built)
+        return masks
+
+    def neighbours(self, radius: int) -> Tuple[Tuple[int, ...], ...]:
+        """Per cell, the indexes of the other cells within ``radius`` (same as ``rings``)"""
+        lists = self._neighbours.get(radius)
+        if lists is None:
+            lists = self._neighbours[radius] = tuple(tuple(iter_bits(mask)) for mask in self.rings(radius))
+        return lists
+
+    def steps(self) -> Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], ...]:
+        """Per direction, ``(back, ahead)``: the previous/next cell of every cell, -1 off the board"""
+        if self._steps is None:
+            n = self.size
+            tables = []
+            for dr, dc in DIRECTIONS:
+                back, ahead = [], []
+                for index in range(self.cells):
+                    row, col = divmod(index, n)
+                    back.append((row - dr) * n + col - dc if 0 <= row - dr < n and 0 <= col - dc < n else -1)
+                    ahead.append((row + dr) * n + col + dc if 0 <= row + dr < n and 0 <= col + dc < n else -1)
+                tables.append((tuple(back), tuple(ahead)))
+            self._steps = tuple(tables)
+        return self._steps
+
+
+@lru_cache(maxsize=None)
+def get_geometry(size: int) -> Geometry:
+    """Return the shared geometry tables for ``size``"""
+    return Geometry(size)
+
+
+# Empty cells within this distance of a stone are the AI's candidate moves
+FRONTIER_RADIUS = 2
+
+# Static evaluation shapes: 'x' own stone, '_' empty cell. Each shape is
+# matched along all four directions with shift-and-mask.
+SHAPE_WEIGHTS: Tuple[Tuple[str, int], ...] = (
+    ("xxxxx", 1000000),
+    ("_xxxx_", 50000),
+    ("xxxx_", 5000),
+    ("_xxxx", 5000),
+    ("xxx_x", 5000),
+    ("x_xxx", 5000),
+    ("xx_xx", 5000),
+    ("_xxx_", 1000),
+    ("_xx_x_", 800),
+    ("_x_xx_", 800),
+    ("xxx__", 100),
+    ("__xxx", 100),
+    ("_xx_", 60),
+    ("_x_x_", 20),
+)
+
+
+class Board:
+    """Gomoku board stored as one integer bitboard per color"""
+
+    __slots__ = ("size", "geometry", "bits", "move_count", "key", "_sym_keys", "_sym_bits", "frontier", "_near", "_neighbours", "trackers", "runs", "rules")
+
+    def __init__(self, size: int = 19):
+        self.size = size
+        self.geometry = get_geometry(size)
+        # Indexed by color code; bits[EMPTY] stays 0 so lookups never branch
+        self.bits = [0, 0, 0]
+        self.move_count = 0
+        # Zobrist hash of the stones, kept up to date by place/remove
+        self.key = 0
+        # Keys of the eight symmetric images of the position (see sym_keys),
+        # valid for the stones of _sym_bits; brought up to date on demand so
+        # that place/remove in the search loops do not pay for them
+        self._sym_keys = (0,) * symmetry.COUNT
+        self._sym_bits = (0, 0, 0)
+        # Mask of empty cells within FRONTIER_RADIUS of a stone, maintained
+        # from per-cell counts of nearby stones
+        self.frontier = 0
+        self._near = bytearray(self.geometry.cells)
+        self._neighbours = self.geometry.neighbours(FRONTIER_RADIUS)
+        # Incremental views of the position (pattern evaluator, ...) that
+        # are told about every place/remove through on_place/on_remove
+        self.trackers: List[Any] = []
+        # Run-length tracker (logic.runs) when one is attached; it turns
+        # is_five_at into a lookup
+        self.runs: Optional[Any] = None
+        # Variant rules (logic.rules) when they differ from freestyle; they
+        # decide what is_five_at and winning_cells count as a win
+        self.rules: Optional[Any] = None
+
+    # ------------------------------------------------------------------
+    # Conversions
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]]) -> "Board":
+        """Build a board from the list-of-lists shape used by the API and Mongo"""
+        board = cls(len(rows))
+        n = board.size
+        for row_index, row in enumerate(rows):
+            base = row_index * n
+            for col_index, cell in enumerate(row):
+                if cell is not None:
+                    color = color_code(cell)
+                    if color:
+                        board.place(base + col_index, color)
+        return board
+
+    @classmethod
+    def from_moves(cls, moves: Sequence[Dict[str, Any]], size: int = 19) -> "Board":
+        """Replay a Mongo ``moves`` array ({row, col, player} or {position, piece})"""
+        board = cls(size)
+        for move in moves:
+            position = move.get("position") or move
+            color = color_code(move.get("player") or move.get("piece"))
+            row, col = position.get("row"), position.get("col")
+            if color and row is not None and col is not None:
+                board.place(row * size + col, color)
+        return board
+
+    @classmethod
+    def from_masks(cls, size: int, black: int, white: int, rules: Optional[Any] = None) -> "Board":
+        """Build a board from the two color bitboards"""
+        board = cls(size)
+        for color, mask in ((BLACK, black), (WHITE, white)):
+            for index in iter_bits(mask):
+                board.place(index, color)
+        board.rules = rules
+        return board
+
+    def __reduce__(self):
+        # Pickle as the two masks; derived state is rebuilt on load
+        return Board.from_masks, (self.size, self.bits[BLACK], self.bits[WHITE], self.rules)
+
+    @classmethod
+    def from_document(cls, doc: Dict[str, Any], size: Optional[int] = None) -> "Board":
+        """Build a board from a ``games`` document, preferring the stored grid"""
+        rows = doc.get("board")
+        if rows:
+            return cls.from_rows(rows)
+        return cls.from_moves(doc.get("moves") or [], size or 19)
+
+    def to_rows(self) -> List[List[Optional[str]]]:
+        """Return the list-of-lists shape ("black"/"white"/None)"""
+        n = self.size
+        black, white = self.bits[BLACK], self.bits[WHITE]
+        rows = []
+        for row in range(n):
+            line: List[Optional[str]] = []
+            for index in range(row * n, row * n + n):
+                if black >> index & 1:
+                    line.append("black")
+                elif white >> index & 1:
+                    line.append("white")
+                else:
+                    line.append(None)
+            rows.append(line)
+        return rows
+
+    def copy(self) -> "Board":
+        clone = Board.__new__(Board)
+        clone.size = self.size
+        clone.geometry = self.geometry
+        clone.bits = list(self.bits)
+        clone.move_count = self.move_count
+        clone.key = self.key
+        clone._sym_keys = self._sym_keys
+        clone._sym_bits = self._sym_bits
+        clone.frontier = self.frontier
+        clone._near = bytearray(self._near)
+        clone._neighbours = self._neighbours
+        clone.trackers = []
+        clone.runs = None
+        clone.rules = self.rules
+        return clone
+
+    # ------------------------------------------------------------------
+    # Cell access
+    # ------------------------------------------------------------------
+    def index(self, row: int, col: int) -> int:
+        return row * self.size + col
+
+    def coords(self, index: int) -> Tuple[int, int]:
+        return divmod(index, self.size)
+
+    def in_bounds(self, row: int, col: int) -> bool:
+        return 0 <= row < self.size and 0 <= col < self.size
+
+    def color_at(self, index: int) -> int:
+        if self.bits[BLACK] >> index & 1:
+            return BLACK
+        if self.bits[WHITE] >> index & 1:
+            return WHITE
+        return EMPTY
+
+    def is_empty(self, index: int) -> bool:
+        return not ((self.bits[BLACK] | self.bits[WHITE]) >> index & 1)
+
+    @property
+    def occupied(self) -> int:
+        return self.bits[BLACK] | self.bits[WHITE]
+
+    @property
+    def empty(self) -> int:
+        return self.geometry.full & ~(self.bits[BLACK] | self.bits[WHITE])
+
+    def is_full(self) -> bool:
+        return self.move_count >= self.geometry.cells
+
+    def canonical(self) -> Tuple[int, int]:
+        """``(key, symmetry)`` of the canonical orientation of the position.
+
+        Symmetric positions share the key; moves are carried into that
+        orientation with ``symmetry.transform_cell`` and back with
+        ``symmetry.restore_cell``.
+        """
+        keys = self.sym_keys
+        key = min(keys)
+        return key, keys.index(key)
+
+    @property
+    def sym_keys(self) -> Tuple[int, ...]:
+        """Keys of the eight symmetric images of the position (index 0 is ``key``).
+
+        Only the stones placed or removed since the last call are folded
+        in, which between two probes of a search is usually one or two.
+        """
+        bits = self.bits
+        synced = self._sym_bits
+        if bits[BLACK] != synced[BLACK] or bits[WHITE] != synced[WHITE]:
+            keys = list(self._sym_keys)
+            count = len(keys)
+            for color in (BLACK, WHITE):
+                images = self.geometry.sym_zobrist[color]
+                for cell in iter_bits(bits[color] ^ synced[color]):
+                    image = images[cell]
+                    for sym in range(count):
+                        keys[sym] ^= image[sym]
+            self._sym_keys = tuple(keys)
+            self._sym_bits = (0, bits[BLACK], bits[WHITE])
+        return self._sym_keys
+
+    def place(self, index: int, color: int) -> None:
+        """Put a stone of ``color`` on an empty cell"""
+        bit = 1 << index
+        self.bits[color] |= bit
+        self.move_count += 1
+        self.key ^= self.geometry.zobrist[color][index]
+
+        near = self._near
+        occupied = self.bits[BLACK] | self.bits[WHITE]
+        frontier = self.frontier & ~bit
+        for cell in self._neighbours[index]:
+            if not near[cell] and not (occupied >> cell & 1):
+                frontier |= 1 << cell
+            near[cell] += 1
+        self.frontier = frontier
+
+        for tracker in self.trackers:
+            tracker.on_place(index, color)
+
+    def remove(self, index: int) -> int:
+        """Take the stone off ``index`` and return its color"""
+        color = self.color_at(index)
+        if color:
+            bit = 1 << index
+            self.bits[color] &= ~bit
+            self.move_count -= 1
+            self.key ^= self.geometry.zobrist[color][index]
+
+            near = self._near
+            frontier = self.frontier
+            for cell in self._neighbours[index]:
+                near[cell] -= 1
+                if not near[cell]:
+                    frontier &= ~(1 << cell)
+            if near[index]:
+                frontier |= bit
+            self.frontier = frontier
+
+            for tracker in self.trackers:
+                tracker.on_remove(index, color)
+        return color
+
+    # ------------------------------------------------------------------
+    # Shift-and-mask pattern checks
+    # ------------------------------------------------------------------
+    def _runs(self, color: int, length: int) -> List[int]:
+        """Per direction, the start cells of ``length`` consecutive ``color`` stones"""
+        own = self.bits[color]
+        runs = []
+        for shift, start in zip(self.geometry.shifts, self.geometry.starts(length)):
+            mask = own & start
+            for k in range(1, length):
+                if not mask:
+                    break
+                mask &= own >> (k * shift)
+            runs.append(mask)
+        return runs
+
+    def has_five(self, color: int) -> bool:
+        """True if ``color`` has five (or more) in a row anywhere"""
+        if self.rules is not None:
+            return any(self.rules.is_win(self, index, color) for index in iter_bits(self.bits[color]))
+        return any(self._runs(color, 5))
+
+    def is_five_at(self, index: int, color: int) -> bool:
+        """True if the ``color`` stone on ``index`` makes a win (five in a row)"""
+        if self.rules is not None:
+            return self.rules.is_win(self, index, color)
+        if self.runs is not None:
+            return self.runs.is_win_at(index, color)
+        # Without a tracker, walk the four lines through the stone: a few
+        # bit tests instead of shifting the whole board
+        own = self.bits[color]
+        for back, ahead in self.geometry.steps():
+            total = 1
+            cell = back[index]
+            while cell >= 0 and own >> cell & 1:
+                total += 1
+                cell = back[cell]
+            cell = ahead[index]
+            while cell >= 0 and own >> cell & 1:
+                total += 1
+                cell = ahead[cell]
+            if total >= 5:
+                return True
+        return False
+
+    def winning_cells(self, color: int) -> int:
+        """Mask of empty cells where ``color`` would complete five in a row"""
+        own = self.bits[color]
+        empty = self.empty
+        result = 0
+        for shift, start in zip(self.geometry.shifts, self.geometry.starts(5)):
+            shifted = [own >> (k * shift) for k in range(5)]
+            for gap in range(5):
+                mask = start & (empty >> (gap * shift))
+                for k in range(5):
+                    if k != gap:
+                        mask &= shifted[k]
+                if mask:
+                    result |= mask << (gap * shift)
+        if self.rules is not None:
+            return self.rules.winning_cells(self, color, result)
+        return result
+
+    def match(self, pattern: str, color: int) -> List[int]:
+        """Per direction, the start cells where ``pattern`` occurs for ``color``.
+
+        ``x`` is a stone of ``color``, ``o`` an opponent stone and ``_`` an
+        empty cell.
+        """
+        layers = {"x": self.bits[color], "o": self.bits[opponent(color)], "_": self.empty}
+        length = len(pattern)
+        result = []
+        for shift, start in zip(self.geometry.shifts, self.geometry.starts(length)):
+            mask = start
+            for k, symbol in enumerate(pattern):
+                mask &= layers[symbol] >> (k * shift)
+                if not mask:
+                    break
+            result.append(mask)
+        return result
+
+    def count(self, pattern: str, color: int) -> int:
+        """Number of occurrences of ``pattern`` for ``color`` in all directions"""
+        return sum(mask.bit_count() for mask in self.match(pattern, color))
+
+    def shape_score(self, color: int) -> int:
+        """Weighted count of the ``SHAPE_WEIGHTS`` shapes owned by ``color``"""
+        own = self.bits[color]
+        empty = self.empty
+        geometry = self.geometry
+        score = 0
+        for direction, shift in enumerate(geometry.shifts):
+            own_layers = [own >> (k * shift) for k in range(6)]
+            empty_layers = [empty >> (k * shift) for k in range(6)]
+            for pattern, weight in SHAPE_WEIGHTS:
+                mask = geometry.starts(len(pattern))[direction]
+                for k, symbol in enumerate(pattern):
+                    mask &= own_layers[k] if symbol == "x" else empty_layers[k]
+                    if not mask:
+                        break
+                if mask:
+                    score += weight * mask.bit_count()
+        return score
+
+    def evaluate(self, color: int) -> int:
+        """Static score of the position from ``color``'s point of view"""
+        return self.shape_score(color) - self.shape_score(opponent(color))
+
+    def __repr__(self) -> str:
+        return f"Board(size={self.size}, moves={self.move_count})"
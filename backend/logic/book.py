@@ -0,0 +1,238 @@
+"""Opening book: a sorted binary file of (position key, move, weight) records.
+
+File layout (little endian)::
+
+    header   magic b"GMKB", version u16, board size u16, record count u32
+    records  key u64, move u16, weight u16      - sorted by key, then weight desc
+
+``OpeningBook`` memory-maps the file and binary-searches the records in
+place, so opening a book costs nothing at startup and every worker process
+shares the same pages. Books are built from move sequences - generated by
+the engine with ``generate_lines`` or imported from finished games - with
+``build_book`` and ``write_book``.
+
+Records are keyed by the canonical key of the position (smallest of its
+eight symmetric images, see ``logic.symmetry``) with the move in that
+orientation, so one record serves all eight rotations/reflections of an
+opening and ``probe`` maps the move back onto the board it was asked for.
+"""
+import mmap
+import os
+import struct
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from logic.board import Board, BLACK, WHITE, color_code, iter_bits, opponent
+from logic.rules import default_variant
+from logic.symmetry import restore_cell, transform_cell
+
+MAGIC = b"GMKB"
+VERSION = 2
+HEADER = struct.Struct("<4sHHI")
+RECORD = struct.Struct("<QHH")
+_KEY = struct.Struct("<Q")
+
+# Positions deeper than this many stones are not stored
+DEFAULT_MAX_PLIES = 10
+_MAX_WEIGHT = 0xFFFF
+
+BOOK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+class OpeningBook:
+    """Read-only, memory-mapped view of a book file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not an opening book (version {VERSION})")
+        if len(self._map) < HEADER.size + self.count * RECORD.size:
+            self._map.close()
+            raise ValueError(f"{path} is truncated")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _key_at(self, position: int) -> int:
+        return _KEY.unpack_from(self._map, HEADER.size + position * RECORD.size)[0]
+
+    def lookup(self, key: int) -> List[Tuple[int, int]]:
+        """``(move, weight)`` pairs stored for ``key``, best first"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        moves = []
+        while low < self.count:
+            stored, move, weight = RECORD.unpack_from(self._map, HEADER.size + low * RECORD.size)
+            if stored != key:
+                break
+            moves.append((move, weight))
+            low += 1
+        return moves
+
+    def probe(self, board: Board, color: Optional[int] = None) -> Optional[int]:
+        """Best book move for ``color`` (default: the side to move) on ``board``, if any.
+
+        Books are built from freestyle lines, so on a board with rules
+        attached the moves those rules forbid (Renju) are skipped.
+        """
+        if board.size != self.size:
+            return None
+        if color is None:
+            color = BLACK if board.move_count % 2 == 0 else WHITE
+        key, sym = board.canonical()
+        for move, _ in self.lookup(key):
+            move = restore_cell(move, sym, board.size)
+            if not board.is_empty(move):
+                continue
+            if board.rules is not None and not board.rules.is_legal(board, move, color):
+                continue
+            return move
+        return None
+
+
+def book_path(size: int) -> str:
+    return os.path.join(BOOK_DIR, f"opening_book_{size}.bin")
+
+
+@lru_cache(maxsize=None)
+def default_book(size: int) -> Optional[OpeningBook]:
+    """The book for ``size`` (``AI_BOOK_DIR`` or backend/data), or None if there is none"""
+    directory = os.getenv("AI_BOOK_DIR")
+    path = os.path.join(directory, f"opening_book_{size}.bin") if directory else book_path(size)
+    if not os.path.exists(path):
+        return None
+    return OpeningBook(path)
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+def build_book(lines: Iterable[Sequence[int]], size: int,
+               max_plies: int = DEFAULT_MAX_PLIES) -> Dict[int, Counter]:
+    """Count, for every position of the first ``max_plies`` moves, the moves played from it.
+
+    Each line is a sequence of cell indices, black first. Positions are
+    counted under their canonical key, so symmetric lines add up.
+    """
+    entries: Dict[int, Counter] = {}
+    for line in lines:
+        board = Board(size)
+        color = BLACK
+        for move in list(line)[:max_plies]:
+            if not board.is_empty(move):
+                break
+            key, sym = board.canonical()
+            entries.setdefault(key, Counter())[transform_cell(move, sym, size)] += 1
+            board.place(move, color)
+            if board.is_five_at(move, color):
+                break
+            color = opponent(color)
+    return entries
+
+
+def write_book(path: str, entries: Dict[int, Counter], size: int) -> int:
+    """Write ``entries`` as a book file; returns the number of records"""
+    records = []
+    for key, moves in entries.items():
+        for move, weight in moves.items():
+            records.append((key, -min(weight, _MAX_WEIGHT), move))
+    records.sort()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as handle:
+        handle.write(HEADER.pack(MAGIC, VERSION, size, len(records)))
+        for key, weight, move in records:
+            handle.write(RECORD.pack(key, move, -weight))
+    return len(records)
+
+
+def lines_from_games(games: Iterable[dict], size: int,
+                     variant: Optional[str] = None) -> List[List[int]]:
+    """Move sequences of ``games`` documents ({row, col, player} or {position, piece} moves).
+
+    Games played on another board size - or, when ``variant`` is given,
+    under another rule variant - are skipped.
+    """
+    lines = []
+    for game in games:
+        rows = game.get("board")
+        if rows and len(rows) != size:
+            continue
+        if variant is not None and (game.get("variant") or default_variant()) != variant:
+            continue
+        line = []
+        for move in game.get("moves") or []:
+            position = move.get("position") or move
+            row, col = position.get("row"), position.get("col")
+            if row is None or col is None or not color_code(move.get("player") or move.get("piece")):
+                break
+            line.append(row * size + col)
+        if line:
+            lines.append(line)
+    return lines
+
+
+def generate_lines(size: int, plies: int = 8, replies: int = 3, radius: int = 2,
+                   time_limit: float = 0.2) -> List[List[int]]:
+    """Engine-played opening lines.
+
+    Black opens on every cell within ``radius`` of the centre and then
+    tries its ``replies`` most promising moves (pattern evaluator), while
+    white always answers with the alpha-beta engine's choice. Positions
+    symmetric to one already expanded are skipped - the book stores them
+    under the same record anyway.
+    """
+    from logic.patterns import PatternEvaluator
+    from logic.search import SearchEngine
+    from logic.transposition import TranspositionTable
+
+    engine = SearchEngine(time_limit=time_limit, table=TranspositionTable(64))
+    center = size // 2
+    lines: List[List[int]] = []
+    seen = set()
+
+    def extend(board: Board, line: List[int], color: int) -> None:
+        key = board.canonical()[0]
+        if key in seen:
+            return
+        seen.add(key)
+        if len(line) >= plies:
+            lines.append(list(line))
+            return
+        if color == WHITE:
+            moves = [engine.search(board, WHITE).move]
+        else:
+            evaluator = PatternEvaluator(board)
+            moves = sorted(iter_bits(board.frontier), key=lambda cell: evaluator.move_score(cell, BLACK),
+                           reverse=True)[:replies]
+        for move in moves:
+            if move is None:
+                continue
+            board.place(move, color)
+            line.append(move)
+            if board.is_five_at(move, color):
+                lines.append(list(line))
+            else:
+                extend(board, line, opponent(color))
+            line.pop()
+            board.remove(move)
+
+    for row in range(center - radius, center + radius + 1):
+        for col in range(center - radius, center + radius + 1):
+            board = Board(size)
+            first = board.index(row, col)
+            board.place(first, BLACK)
+            extend(board, [first], WHITE)
+    return lines
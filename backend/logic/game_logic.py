@@ -1,12 +1,27 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 
-def check_win(board: List[List[Optional[str]]], row: int, col: int) -> Optional[str]:
+from logic.board import Board, COLOR_NAMES
+
+def check_win(board: Union[List[List[Optional[str]]], Board], row: int, col: int) -> Optional[str]:
     """Check whether the move at (row, col) produced a winner.
 
     Returns the color string ('black' or 'white') when there's a winner,
     or None otherwise. This signature matches the expectations used in
     the test-suite (check_win(board, row, col)).
+
+    A ``Board`` is checked with shift-and-mask instead of walking the grid,
+    or with a constant-time lookup when a ``logic.runs.RunTracker`` is
+    attached to it.
     """
+    if isinstance(board, Board):
+        if not board.in_bounds(row, col):
+            return None
+        index = board.index(row, col)
+        color = board.color_at(index)
+        if color and board.is_five_at(index, color):
+            return COLOR_NAMES[color]
+        return None
+
     # Basic validations
     if not board or not board[0]:
         return None
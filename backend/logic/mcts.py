@@ -0,0 +1,287 @@
+"""Monte Carlo tree search (PUCT) over a ``Board``.
+
+An alternative to the alpha-beta engine for the hard AI. Every playout
+walks down the tree picking the child with the best
+``Q + c * P * sqrt(N) / (1 + n)``, expands the leaf with the pattern
+evaluator's move scores as priors ``P``, plays a short tactical rollout
+(win if possible, block if forced, else a random frontier move) and scores
+the final position with the evaluator, squashed to a win probability.
+
+Immediate wins and forced blocks are the only children generated where
+they apply, so the tree never wastes playouts on moves that lose at once.
+
+With ``workers > 1`` the search is root-parallel: independent trees with
+different seeds are grown in a process pool and their root visit counts
+are summed, which turns spare cores directly into playing strength.
+"""
+import atexit
+import math
+import random
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from logic.board import Board, iter_bits, opponent
+from logic.patterns import PatternEvaluator, FORCED_WIN
+from logic.search import SearchResult
+
+# Evaluator score that maps to a ~73% win probability
+_VALUE_SCALE = 800.0
+
+_CLOCK_INTERVAL = 16
+
+
+class _Node:
+    """One position of the tree, reached by ``move`` of ``color``"""
+
+    __slots__ = ("move", "color", "prior", "visits", "value", "children", "terminal")
+
+    def __init__(self, move: Optional[int], color: int, prior: float = 1.0):
+        self.move = move
+        self.color = color
+        self.prior = prior
+        self.visits = 0
+        # Sum of playout results from ``color``'s point of view
+        self.value = 0.0
+        self.children: Optional[List["_Node"]] = None
+        self.terminal: Optional[float] = None
+
+
+class MCTSEngine:
+    """PUCT search bounded by a time and/or playout budget"""
+
+    def __init__(self, time_limit: Optional[float] = 0.3, playout_limit: Optional[int] = None,
+                 exploration: float = 1.5, max_children: int = 16, rollout_depth: int = 4,
+                 workers: int = 1, executor: Optional[Executor] = None, seed: Optional[int] = None):
+        if not time_limit and not playout_limit:
+            raise ValueError("MCTS needs a time or a playout budget")
+        self.time_limit = time_limit
+        self.playout_limit = playout_limit
+        self.exploration = exploration
+        # Only the best children by prior are kept at each node
+        self.max_children = max_children
+        self.rollout_depth = rollout_depth
+        self.workers = max(1, workers)
+        self.executor = executor
+        self.seed = seed
+
+    def search(self, board: Board, color: int) -> SearchResult:
+        """Most visited move for ``color``; ``score`` is its win rate in thousandths"""
+        started = time.perf_counter()
+        if board.move_count == 0:
+            center = board.size // 2
+            return SearchResult(board.index(center, center), completed=True)
+
+        if self.workers > 1:
+            executor = self.executor or _shared_pool(self.workers)
+            playouts = -(-self.playout_limit // self.workers) if self.playout_limit else None
+            futures = [
+                executor.submit(_grow_tree, board, color, self._settings(playouts, tree))
+                for tree in range(self.workers)
+            ]
+            trees = [future.result() for future in futures]
+        else:
+            trees = [_grow_tree(board, color, self._settings(self.playout_limit, 0))]
+
+        stats: Dict[int, List[float]] = {}
+        playouts = depth = 0
+        for children, tree_playouts, tree_depth in trees:
+            playouts += tree_playouts
+            depth = max(depth, tree_depth)
+            for move, visits, value in children:
+                entry = stats.setdefault(move, [0, 0.0])
+                entry[0] += visits
+                entry[1] += value
+        if not stats:
+            return SearchResult(None, completed=True, elapsed=time.perf_counter() - started)
+
+        move, (visits, value) = max(stats.items(), key=lambda item: item[1][0])
+        return SearchResult(
+            move,
+            score=round(1000 * value / visits) if visits else 500,
+            depth=depth,
+            nodes=playouts,
+            elapsed=time.perf_counter() - started,
+            completed=bool(self.playout_limit) and playouts >= self.playout_limit,
+        )
+
+    def _settings(self, playouts: Optional[int], tree: int) -> dict:
+        return {
+            "time_limit": self.time_limit,
+            "playout_limit": playouts,
+            "exploration": self.exploration,
+            "max_children": self.max_children,
+            "rollout_depth": self.rollout_depth,
+            "seed": None if self.seed is None else self.seed + tree,
+        }
+
+
+# ---------------------------------------------------------------------------
+# One tree (runs in the caller or in a pool worker)
+# ---------------------------------------------------------------------------
+def _grow_tree(board: Board, color: int, settings: dict) -> Tuple[List[Tuple[int, int, float]], int, int]:
+    """Grow one tree; returns ``([(move, visits, value)], playouts, max depth)`` for the root"""
+    return _Tree(board.copy(), settings).run(color)
+
+
+class _Tree:
+    def __init__(self, board: Board, settings: dict):
+        self.board = board
+        self.time_limit = settings["time_limit"]
+        self.playout_limit = settings["playout_limit"]
+        self.exploration = settings["exploration"]
+        self.max_children = settings["max_children"]
+        self.rollout_depth = settings["rollout_depth"]
+        self.rng = random.Random(settings["seed"])
+        self.max_depth = 0
+        self._evaluator: Optional[PatternEvaluator] = None
+
+    def run(self, color: int):
+        deadline = time.perf_counter() + self.time_limit if self.time_limit else 0.0
+        root = _Node(None, opponent(color))
+        self._evaluator = PatternEvaluator(self.board).attach()
+        playouts = 0
+        try:
+            while True:
+                if self.playout_limit and playouts >= self.playout_limit:
+                    break
+                if deadline and playouts % _CLOCK_INTERVAL == 0 and time.perf_counter() >= deadline:
+                    break
+                self._playout(root)
+                playouts += 1
+                if root.children is not None and len(root.children) <= 1:
+                    break  # a single legal choice (win or forced block)
+        finally:
+            self._evaluator.detach()
+            self._evaluator = None
+        children = [(child.move, child.visits, child.value) for child in root.children or ()]
+        return children, playouts, self.max_depth
+
+    def _playout(self, root: _Node) -> None:
+        board = self.board
+        path = [root]
+        node = root
+        # Selection
+        while node.children and node.terminal is None:
+            node = self._select(node)
+            board.place(node.move, node.color)
+            path.append(node)
+        self.max_depth = max(self.max_depth, len(path) - 1)
+
+        try:
+            if node.terminal is not None:
+                result = node.terminal
+            else:
+                self._expand(node)
+                if node.terminal is not None:
+                    result = node.terminal
+                else:
+                    result = self._rollout(opponent(node.color))
+                    # ``result`` is for the side to move; the node stores its mover's view
+                    result = 1.0 - result
+        finally:
+            for visited in reversed(path[1:]):
+                board.remove(visited.move)
+
+        # Backpropagation, flipping the point of view at every ply
+        for visited in reversed(path):
+            visited.visits += 1
+            visited.value += result
+            result = 1.0 - result
+
+    def _select(self, node: _Node) -> _Node:
+        scale = self.exploration * math.sqrt(node.visits)
+        best, best_score = None, -1.0
+        for child in node.children:
+            # Unvisited children start from a neutral value
+            q = child.value / child.visits if child.visits else 0.5
+            score = q + scale * child.prior / (1 + child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def _expand(self, node: _Node) -> None:
+        board = self.board
+        if node.move is not None and board.is_five_at(node.move, node.color):
+            node.terminal = 1.0
+            return
+        color = opponent(node.color)
+        wins = board.winning_cells(color)
+        if wins:
+            node.children = [_Node(next(iter_bits(wins)), color)]
+            return
+        forced = board.winning_cells(node.color)
+        cells = forced or board.frontier or board.empty
+        if not cells:
+            node.terminal = 0.5  # full board: draw
+            return
+
+        score = self._evaluator.move_score
+        scored = sorted(((score(cell, color), cell) for cell in iter_bits(cells)), reverse=True)
+        if board.rules is not None and board.rules.forbids(color):
+            scored = [entry for entry in scored if board.rules.forbidden(board, entry[1], color) is None]
+            if not scored:
+                node.terminal = 1.0  # every move left to the opponent is forbidden: it loses
+                return
+        scored = scored[:self.max_children]
+        total = sum(weight for weight, _ in scored) + len(scored)
+        node.children = [_Node(cell, color, (weight + 1) / total) for weight, cell in scored]
+
+    def _rollout(self, color: int) -> float:
+        """Result for ``color`` (to move) after a short tactical playout"""
+        board = self.board
+        played = []
+        result = None
+        try:
+            for _ in range(self.rollout_depth):
+                wins = board.winning_cells(color)
+                if wins:
+                    result = 1.0 if len(played) % 2 == 0 else 0.0
+                    break
+                blocks = board.winning_cells(opponent(color))
+                cells = list(iter_bits(blocks or board.frontier))
+                if board.rules is not None:
+                    cells = board.rules.legal_moves(board, color, cells)
+                if not cells:
+                    break
+                move = self.rng.choice(cells)
+                board.place(move, color)
+                played.append(move)
+                color = opponent(color)
+            if result is None:
+                value = _probability(self._evaluator.evaluate(color))
+                result = value if len(played) % 2 == 0 else 1.0 - value
+        finally:
+            for move in reversed(played):
+                board.remove(move)
+        return result
+
+
+def _probability(score: int) -> float:
+    """Squash an evaluator score into a win probability"""
+    if score >= FORCED_WIN:
+        return 1.0
+    if score <= -FORCED_WIN:
+        return 0.0
+    return 1.0 / (1.0 + math.exp(-score / _VALUE_SCALE))
+
+
+# ---------------------------------------------------------------------------
+# Process pool for root-parallel search
+# ---------------------------------------------------------------------------
+_pools: Dict[int, ProcessPoolExecutor] = {}
+
+
+def _shared_pool(workers: int) -> ProcessPoolExecutor:
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return pool
+
+
+@atexit.register
+def shutdown_pools() -> None:
+    """Stop the worker processes of the root-parallel search"""
+    while _pools:
+        _, pool = _pools.popitem()
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,218 @@
+"""Table-driven line patterns and an incremental position evaluator.
+
+A stone's pattern along one direction depends only on the nine cells
+centred on it (four on each side). Those cells are encoded as two 9-bit
+masks relative to the stone's color - own stones and blocked cells
+(opponent stones or the board edge) - and ``pattern_table()`` maps the
+18-bit code straight to a class (five, open four, four, open three, ...).
+
+``PatternEvaluator`` keeps, for every line of the board, the bit masks of
+both colors and the pattern counts they produce. Placing or removing a
+stone only re-reads the four lines through that cell, so the static
+evaluation is a handful of table lookups per move instead of a board scan.
+"""
+import itertools
+from functools import lru_cache
+from typing import List, Tuple
+
+from logic.board import BLACK, WHITE, DIRECTIONS, Board, iter_bits, opponent
+
+NONE, TWO, OPEN_TWO, THREE, OPEN_THREE, FOUR, OPEN_FOUR, FIVE = range(8)
+PATTERN_NAMES = ("none", "two", "open_two", "three", "open_three", "four", "open_four", "five")
+
+WINDOW = 9
+HALF = WINDOW // 2
+CENTER_BIT = 1 << HALF
+WINDOW_MASK = (1 << WINDOW) - 1
+
+# Per-stone weights of the static evaluation (every stone of a shape
+# reports the shape, so a four is counted four times)
+STONE_WEIGHTS = (1, 5, 30, 60, 400, 600, 5000, 100000)
+# Weights used to rank a candidate move by the pattern it would create
+MOVE_WEIGHTS = (0, 2, 10, 20, 200, 500, 5000, 100000)
+
+# Returned by evaluate() when the side to move wins by force next ply
+FORCED_WIN = 1_000_000
+
+
+def _classify(cells: str, memo: dict) -> int:
+    """Class of the centre stone of a 9-cell string ('x' own, '_' empty, '#' blocked)"""
+    known = memo.get(cells)
+    if known is not None:
+        return known
+
+    if "xxxxx" in cells:
+        result = FIVE
+    else:
+        empties = [i for i, cell in enumerate(cells) if cell == "_"]
+        wins = sum(1 for i in empties if "xxxxx" in cells[:i] + "x" + cells[i + 1:])
+        if wins >= 2:
+            result = OPEN_FOUR
+        elif wins == 1:
+            result = FOUR
+        else:
+            # A shape is as strong as the best shape one more stone makes of it
+            children = {_classify(cells[:i] + "x" + cells[i + 1:], memo) for i in empties}
+            if OPEN_FOUR in children:
+                result = OPEN_THREE
+            elif FOUR in children:
+                result = THREE
+            elif OPEN_THREE in children:
+                result = OPEN_TWO
+            elif THREE in children:
+                result = TWO
+            else:
+                result = NONE
+    memo[cells] = result
+    return result
+
+
+@lru_cache(maxsize=None)
+def pattern_table() -> bytearray:
+    """Lookup table indexed by ``own_bits | blocked_bits << 9`` of a 9-cell window"""
+    table = bytearray(1 << (2 * WINDOW))
+    memo: dict = {}
+    for combo in itertools.product("x_#", repeat=WINDOW - 1):
+        cells = combo[:HALF] + ("x",) + combo[HALF:]
+        own = blocked = 0
+        for offset, cell in enumerate(cells):
+            if cell == "x":
+                own |= 1 << offset
+            elif cell == "#":
+                blocked |= 1 << offset
+        table[own | blocked << WINDOW] = _classify("".join(cells), memo)
+    return table
+
+
+class LineTables:
+    """Every line of a board of one size, and the lines through each cell"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.lines: List[Tuple[int, ...]] = []
+        # Per cell: (line id, position on the line) for each direction
+        self.cell_lines: List[List[Tuple[int, int]]] = [[] for _ in range(size * size)]
+        for dr, dc in DIRECTIONS:
+            for row in range(size):
+                for col in range(size):
+                    if 0 <= row - dr < size and 0 <= col - dc < size:
+                        continue  # not the first cell of its line
+                    cells = []
+                    r, c = row, col
+                    while 0 <= r < size and 0 <= c < size:
+                        cells.append(r * size + c)
+                        r, c = r + dr, c + dc
+                    if len(cells) < 5:
+                        continue  # too short to ever hold five
+                    line_id = len(self.lines)
+                    self.lines.append(tuple(cells))
+                    for position, cell in enumerate(cells):
+                        self.cell_lines[cell].append((line_id, position))
+        # Lines are padded with HALF blocked cells on both ends, so a window
+        # around any cell reads the edge as blocked
+        self.walls = [
+            ((1 << HALF) - 1) | (((1 << HALF) - 1) << (len(cells) + HALF))
+            for cells in self.lines
+        ]
+
+
+@lru_cache(maxsize=None)
+def line_tables(size: int) -> LineTables:
+    return LineTables(size)
+
+
+class PatternEvaluator:
+    """Per-line pattern counts for both colors, updated on every move"""
+
+    def __init__(self, board: Board):
+        self.board = board
+        self.table = pattern_table()
+        self.tables = line_tables(board.size)
+        line_count = len(self.tables.lines)
+        # line_bits[color][line]: stones of ``color`` on the (padded) line
+        self.line_bits = [[0] * line_count for _ in range(3)]
+        self.line_counts = [[(0,) * 8] * line_count for _ in range(3)]
+        self.counts = [[0] * 8 for _ in range(3)]
+        for color in (BLACK, WHITE):
+            for index in iter_bits(board.bits[color]):
+                for line, position in self.tables.cell_lines[index]:
+                    self.line_bits[color][line] |= 1 << (position + HALF)
+        for line in range(line_count):
+            self._score_line(line)
+
+    # -- Board tracker protocol -------------------------------------------
+    def attach(self) -> "PatternEvaluator":
+        self.board.trackers.append(self)
+        return self
+
+    def detach(self) -> None:
+        if self in self.board.trackers:
+            self.board.trackers.remove(self)
+
+    def on_place(self, index: int, color: int) -> None:
+        line_bits = self.line_bits[color]
+        for line, position in self.tables.cell_lines[index]:
+            line_bits[line] |= 1 << (position + HALF)
+            self._score_line(line)
+
+    def on_remove(self, index: int, color: int) -> None:
+        line_bits = self.line_bits[color]
+        for line, position in self.tables.cell_lines[index]:
+            line_bits[line] &= ~(1 << (position + HALF))
+            self._score_line(line)
+
+    # ---------------------------------------------------------------------
+    def _score_line(self, line: int) -> None:
+        table = self.table
+        wall = self.tables.walls[line]
+        black, white = self.line_bits[BLACK][line], self.line_bits[WHITE][line]
+        for color, own, blocked in ((BLACK, black, white | wall), (WHITE, white, black | wall)):
+            old = self.line_counts[color][line]
+            new = [0] * 8
+            for bit in iter_bits(own):
+                start = bit - HALF
+                new[table[(own >> start & WINDOW_MASK) | (blocked >> start & WINDOW_MASK) << WINDOW]] += 1
+            totals = self.counts[color]
+            for kind in range(8):
+                if old[kind] != new[kind]:
+                    totals[kind] += new[kind] - old[kind]
+            self.line_counts[color][line] = tuple(new)
+
+    def move_patterns(self, index: int, color: int) -> List[int]:
+        """Pattern classes a ``color`` stone on the empty ``index`` would form, per line"""
+        table = self.table
+        own_bits = self.line_bits[color]
+        other_bits = self.line_bits[opponent(color)]
+        walls = self.tables.walls
+        result = []
+        for line, position in self.tables.cell_lines[index]:
+            own = (own_bits[line] >> position & WINDOW_MASK) | CENTER_BIT
+            blocked = (other_bits[line] | walls[line]) >> position & WINDOW_MASK
+            result.append(table[own | blocked << WINDOW])
+        return result
+
+    def move_score(self, index: int, color: int) -> int:
+        """Attack value of playing ``index`` plus the value of denying it to the opponent"""
+        attack = sum(MOVE_WEIGHTS[kind] for kind in self.move_patterns(index, color))
+        defence = sum(MOVE_WEIGHTS[kind] for kind in self.move_patterns(index, opponent(color)))
+        return attack * 2 + defence
+
+    def evaluate(self, color: int) -> int:
+        """Static score from the point of view of ``color``, the side to move"""
+        mine = self.counts[color]
+        theirs = self.counts[opponent(color)]
+        if mine[FIVE]:
+            return FORCED_WIN
+        if theirs[FIVE]:
+            return -FORCED_WIN
+        if mine[FOUR] or mine[OPEN_FOUR]:
+            return FORCED_WIN  # completes five right now
+        if theirs[OPEN_FOUR]:
+            return -FORCED_WIN  # two winning cells, only one can be blocked
+        score = 0
+        for kind in range(8):
+            score += STONE_WEIGHTS[kind] * (mine[kind] - theirs[kind])
+        if mine[OPEN_THREE] and not theirs[FOUR]:
+            # Turning the three into an open four cannot be stopped
+            score += FORCED_WIN // 10
+        return score
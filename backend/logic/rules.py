@@ -0,0 +1,266 @@
+"""Game rules: board size and winning/forbidden-move variant.
+
+Three variants are supported:
+
+    freestyle  five or more in a row wins (the historical behaviour)
+    standard   exactly five wins; an overline (six or more) does not
+    renju      black must make exactly five and may not play an overline,
+               a double four or a double three; white wins with five or more
+
+A ``Rules`` object owns the tables every rule check needs - the shared
+``Geometry`` of its size, the line indexes and pattern table of the
+incremental evaluator, the run neighbour tables and, per direction and
+cell, the window of cells a forbidden-move check reads. They are built
+once per (size, variant) by ``get_rules`` and shared by the routers, the
+AI and the engines; the per-size tables are also shared across variants.
+
+Attaching rules to a ``Board`` (``rules.attach(board)`` or
+``rules.new_board()``) makes its ``is_five_at``/``winning_cells`` follow the
+variant, which is how the search, MCTS and threat solver respect it
+without code of their own. Freestyle boards keep ``board.rules = None``
+and the plain shift-and-mask fast path.
+
+The Renju check is the usual non-recursive approximation: a three only
+counts as open if one more stone makes a straight four, without checking
+whether that stone would itself be forbidden.
+"""
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from logic.board import Board, BLACK, DIRECTIONS, get_geometry, iter_bits
+from logic.patterns import line_tables, pattern_table
+from logic.runs import WIN_LENGTH, neighbour_tables
+
+FREESTYLE = "freestyle"
+STANDARD = "standard"
+RENJU = "renju"
+VARIANTS = (FREESTYLE, STANDARD, RENJU)
+
+MIN_SIZE = WIN_LENGTH
+# Cells read on each side of a move by the forbidden-move check: a five
+# through the move spans four of them, the fifth tells an overline apart
+REACH = WIN_LENGTH
+
+OVERLINE = "overline"
+DOUBLE_FOUR = "double_four"
+DOUBLE_THREE = "double_three"
+
+_EMPTY, _OWN, _BLOCKED = 0, 1, 2
+
+
+def default_size() -> int:
+    return int(os.getenv("BOARD_SIZE", "15"))
+
+
+def default_variant() -> str:
+    return os.getenv("GAME_VARIANT", FREESTYLE)
+
+
+@lru_cache(maxsize=None)
+def window_tables(size: int) -> Tuple[Tuple[Tuple[int, ...], ...], ...]:
+    """Per direction and cell, the ``2 * REACH + 1`` cells centred on it (-1 off the board)"""
+    tables = []
+    for dr, dc in DIRECTIONS:
+        per_cell = []
+        for index in range(size * size):
+            row, col = divmod(index, size)
+            window = []
+            for k in range(-REACH, REACH + 1):
+                r, c = row + k * dr, col + k * dc
+                window.append(r * size + c if 0 <= r < size and 0 <= c < size else -1)
+            per_cell.append(tuple(window))
+        tables.append(tuple(per_cell))
+    return tuple(tables)
+
+
+def _run(cells: List[int], position: int) -> Tuple[int, int]:
+    """First and last position of the run of own stones through ``position``"""
+    start = end = position
+    while start > 0 and cells[start - 1] == _OWN:
+        start -= 1
+    while end < len(cells) - 1 and cells[end + 1] == _OWN:
+        end += 1
+    return start, end
+
+
+def _five_cells(cells: List[int]) -> List[int]:
+    """Empty positions that complete exactly five through the window's centre"""
+    result = []
+    for position, cell in enumerate(cells):
+        if cell != _EMPTY:
+            continue
+        cells[position] = _OWN
+        start, end = _run(cells, REACH)
+        cells[position] = _EMPTY
+        if end - start + 1 == WIN_LENGTH and start <= position <= end:
+            result.append(position)
+    return result
+
+
+def _fours(cells: List[int]) -> int:
+    """Number of fours through the centre (a straight four counts once)"""
+    wins = _five_cells(cells)
+    if len(wins) == 2 and wins[1] - wins[0] == WIN_LENGTH:
+        return 1
+    return len(wins)
+
+
+def _is_open_three(cells: List[int]) -> bool:
+    """True if one more stone turns the line through the centre into a straight four"""
+    for position, cell in enumerate(cells):
+        if cell != _EMPTY:
+            continue
+        cells[position] = _OWN
+        wins = _five_cells(cells)
+        cells[position] = _EMPTY
+        if len(wins) == 2 and wins[1] - wins[0] == WIN_LENGTH:
+            return True
+    return False
+
+
+class Rules:
+    """Board size, variant and the precomputed tables of both"""
+
+    __slots__ = ("size", "variant", "geometry", "lines", "neighbours", "patterns", "windows", "exact")
+
+    def __init__(self, size: int, variant: str = FREESTYLE):
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown rule variant: {variant}")
+        if size < MIN_SIZE:
+            raise ValueError(f"Board size must be at least {MIN_SIZE}")
+        self.size = size
+        self.variant = variant
+        self.geometry = get_geometry(size)
+        self.lines = line_tables(size)
+        self.neighbours = neighbour_tables(size)
+        self.patterns = pattern_table()
+        self.windows = window_tables(size) if variant == RENJU else ()
+        # exact[color]: whether ``color`` needs exactly five (overlines do not win)
+        self.exact = (False, variant != FREESTYLE, variant == STANDARD)
+
+    def __reduce__(self):
+        return get_rules, (self.size, self.variant)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"size": self.size, "variant": self.variant}
+
+    # ------------------------------------------------------------------
+    # Boards
+    # ------------------------------------------------------------------
+    def attach(self, board: Board) -> Board:
+        """Make ``board`` follow these rules (freestyle boards need nothing)"""
+        if board.size != self.size:
+            raise ValueError(f"Board of size {board.size} used with {self.size}x{self.size} rules")
+        board.rules = self if self.variant != FREESTYLE else None
+        return board
+
+    def new_board(self) -> Board:
+        return self.attach(Board(self.size))
+
+    def empty_rows(self) -> List[List[Optional[str]]]:
+        """Empty grid in the list-of-lists shape stored in Mongo"""
+        return [[None for _ in range(self.size)] for _ in range(self.size)]
+
+    def board_from_rows(self, rows: Sequence[Sequence[Any]]) -> Board:
+        return self.attach(Board.from_rows(rows))
+
+    def in_bounds(self, row: int, col: int) -> bool:
+        return 0 <= row < self.size and 0 <= col < self.size
+
+    # ------------------------------------------------------------------
+    # Wins
+    # ------------------------------------------------------------------
+    def run_lengths(self, board: Board, index: int, color: int) -> List[int]:
+        """Per direction, the run of ``color`` through ``index`` (counting a stone there)"""
+        if board.runs is not None:
+            return board.runs.runs_through(index, color)
+        own = board.bits[color]
+        lengths = []
+        for back, ahead in self.neighbours:
+            total = 1
+            for step in (back, ahead):
+                cell = step[index]
+                while cell >= 0 and own >> cell & 1:
+                    total += 1
+                    cell = step[cell]
+            lengths.append(total)
+        return lengths
+
+    def is_win(self, board: Board, index: int, color: int) -> bool:
+        """True if the ``color`` stone on ``index`` wins under this variant"""
+        lengths = self.run_lengths(board, index, color)
+        if self.exact[color]:
+            return WIN_LENGTH in lengths
+        return max(lengths) >= WIN_LENGTH
+
+    def winning_cells(self, board: Board, color: int, candidates: int) -> int:
+        """Keep the cells of ``candidates`` (five-making cells) that win under this variant"""
+        if not self.exact[color]:
+            return candidates
+        for index in iter_bits(candidates):
+            if WIN_LENGTH not in self.run_lengths(board, index, color):
+                candidates &= ~(1 << index)
+        return candidates
+
+    # ------------------------------------------------------------------
+    # Forbidden moves
+    # ------------------------------------------------------------------
+    def forbids(self, color: int) -> bool:
+        """True if some moves of ``color`` may be forbidden"""
+        return self.variant == RENJU and color == BLACK
+
+    def forbidden(self, board: Board, index: int, color: int) -> Optional[str]:
+        """Why ``color`` may not play the empty ``index`` (None when allowed)"""
+        if not self.forbids(color):
+            return None
+        lengths = self.run_lengths(board, index, color)
+        if WIN_LENGTH in lengths:
+            return None  # a five wins even if it also makes a forbidden shape
+        if max(lengths) > WIN_LENGTH:
+            return OVERLINE
+        own, other = board.bits[color], board.bits[3 - color]
+        fours = threes = 0
+        for per_cell in self.windows:
+            cells = [
+                _BLOCKED if cell < 0 or other >> cell & 1 else _OWN if own >> cell & 1 else _EMPTY
+                for cell in per_cell[index]
+            ]
+            cells[REACH] = _OWN
+            line_fours = _fours(cells)
+            if line_fours:
+                fours += line_fours
+            elif _is_open_three(cells):
+                threes += 1
+        if fours >= 2:
+            return DOUBLE_FOUR
+        if threes >= 2:
+            return DOUBLE_THREE
+        return None
+
+    def is_legal(self, board: Board, index: int, color: int) -> bool:
+        return board.is_empty(index) and self.forbidden(board, index, color) is None
+
+    def legal_moves(self, board: Board, color: int, moves: Iterable[int]) -> List[int]:
+        """``moves`` without the ones forbidden to ``color``"""
+        if not self.forbids(color):
+            return list(moves)
+        return [move for move in moves if self.forbidden(board, move, color) is None]
+
+    def __repr__(self) -> str:
+        return f"Rules(size={self.size}, variant={self.variant!r})"
+
+
+@lru_cache(maxsize=None)
+def _cached_rules(size: int, variant: str) -> Rules:
+    return Rules(size, variant)
+
+
+def get_rules(size: Optional[int] = None, variant: Optional[str] = None) -> Rules:
+    """Shared rules for ``size``/``variant`` (defaults: ``BOARD_SIZE``, ``GAME_VARIANT``)"""
+    return _cached_rules(int(size or default_size()), variant or default_variant())
+
+
+def rules_for(game: Dict[str, Any]) -> Rules:
+    """Rules of a ``games`` document: its grid size and stored variant"""
+    return get_rules(len(game.get("board") or []) or None, game.get("variant"))
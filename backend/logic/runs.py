@@ -0,0 +1,130 @@
+"""Incremental run lengths: win detection without rescanning the board.
+
+For every color and direction the tracker stores, at both ends of each
+run of consecutive stones, the length of that run. A new stone can only
+touch the end of a run on either side, so placing it merges the two runs
+with a few array lookups and writes, and the length of the run through
+the new stone - the only thing a win check needs - is known at once.
+Removing a stone (search unmake) splits its runs by walking them, which
+is bounded by the run length.
+
+``RunTracker(board).attach()`` keeps it in sync through the board's
+tracker protocol and makes ``Board.is_five_at`` a constant-time lookup.
+"""
+from typing import List, Tuple
+
+from logic.board import Board, BLACK, WHITE, DIRECTIONS, get_geometry, iter_bits
+
+WIN_LENGTH = 5
+
+
+def neighbour_tables(size: int) -> Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], ...]:
+    """Per direction, ``(back, ahead)``: the previous/next cell of every cell, -1 off the board"""
+    return get_geometry(size).steps()
+
+
+class RunTracker:
+    """Per-color, per-direction run lengths of a ``Board``, updated on every move"""
+
+    def __init__(self, board: Board):
+        self.board = board
+        self.tables = neighbour_tables(board.size)
+        self.shifts = board.geometry.shifts
+        cells = board.geometry.cells
+        # ends[color][direction][cell]: length of the run that ends (or
+        # starts) on ``cell``; only meaningful on the two ends of a run
+        self.ends = [[[0] * cells for _ in DIRECTIONS] for _ in range(3)]
+        # Longest run through the last stone placed, the one a win check asks about
+        self.last_index = -1
+        self.last_length = 0
+        for color in (BLACK, WHITE):
+            for index in iter_bits(board.bits[color]):
+                self._join(index, color)
+
+    # -- Board tracker protocol -------------------------------------------
+    def attach(self) -> "RunTracker":
+        self.board.trackers.append(self)
+        self.board.runs = self
+        return self
+
+    def detach(self) -> None:
+        if self in self.board.trackers:
+            self.board.trackers.remove(self)
+        if self.board.runs is self:
+            self.board.runs = None
+
+    def on_place(self, index: int, color: int) -> None:
+        self.last_index = index
+        self.last_length = self._join(index, color)
+
+    def on_remove(self, index: int, color: int) -> None:
+        # Any removal may have split the run through the last stone
+        self.last_index = -1
+        own = self.board.bits[color]
+        for (back, ahead), shift, lengths in zip(self.tables, self.shifts, self.ends[color]):
+            left = 0
+            cell = back[index]
+            while cell >= 0 and own >> cell & 1:
+                left += 1
+                cell = back[cell]
+            if left:
+                lengths[index - shift] = lengths[index - left * shift] = left
+            right = 0
+            cell = ahead[index]
+            while cell >= 0 and own >> cell & 1:
+                right += 1
+                cell = ahead[cell]
+            if right:
+                lengths[index + shift] = lengths[index + right * shift] = right
+
+    # ---------------------------------------------------------------------
+    def _join(self, index: int, color: int) -> int:
+        """Merge the stone on ``index`` with its neighbouring runs; longest run through it"""
+        own = self.board.bits[color]
+        longest = 0
+        for (back, ahead), shift, lengths in zip(self.tables, self.shifts, self.ends[color]):
+            # A cell next to the (previously empty) index is always the end of its run
+            cell = back[index]
+            left = lengths[cell] if cell >= 0 and own >> cell & 1 else 0
+            cell = ahead[index]
+            right = lengths[cell] if cell >= 0 and own >> cell & 1 else 0
+            total = left + 1 + right
+            lengths[index - left * shift] = lengths[index + right * shift] = total
+            if total > longest:
+                longest = total
+        return longest
+
+    def runs_through(self, index: int, color: int) -> List[int]:
+        """Per direction, the run of ``color`` through ``index``.
+
+        For an empty cell this is the run a ``color`` stone there would
+        make, read from the neighbouring run ends in constant time; for a
+        ``color`` stone the runs are walked.
+        """
+        own = self.board.bits[color]
+        occupied = own >> index & 1
+        result = []
+        for (back, ahead), lengths in zip(self.tables, self.ends[color]):
+            if occupied:
+                total = 1
+                for step in (back, ahead):
+                    cell = step[index]
+                    while cell >= 0 and own >> cell & 1:
+                        total += 1
+                        cell = step[cell]
+            else:
+                cell = back[index]
+                total = 1 + (lengths[cell] if cell >= 0 and own >> cell & 1 else 0)
+                cell = ahead[index]
+                total += lengths[cell] if cell >= 0 and own >> cell & 1 else 0
+            result.append(total)
+        return result
+
+    def longest_run(self, index: int, color: int) -> int:
+        """Longest run of ``color`` through ``index`` (constant time for the last stone placed)"""
+        if index == self.last_index and self.board.bits[color] >> index & 1:
+            return self.last_length
+        return max(self.runs_through(index, color))
+
+    def is_win_at(self, index: int, color: int) -> bool:
+        return self.longest_run(index, color) >= WIN_LENGTH
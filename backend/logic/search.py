@@ -0,0 +1,340 @@
+"""Negamax alpha-beta search over a ``Board``.
+
+The engine deepens iteratively (depth 1, 2, 3, ...) and keeps the best
+move of the last finished iteration, so it always has an answer ready.
+Every call is bounded by a wall-clock and a node budget: once either runs
+out the current iteration is abandoned and the best move found so far is
+returned.
+"""
+import time
+from typing import List, Optional
+
+from logic.board import Board, iter_bits, opponent
+from logic.patterns import PatternEvaluator, MOVE_WEIGHTS, OPEN_THREE
+from logic.symmetry import restore_cell, transform_cell
+from logic.transposition import EXACT, LOWER, UPPER, NO_MOVE, TranspositionTable
+from logic.zobrist import SIDE_KEYS, variant_key
+
+WIN_SCORE = 10_000_000
+INFINITY = WIN_SCORE + 1
+# Scores beyond this are "win in N plies" and get re-based when cached
+_MATE_BOUND = WIN_SCORE - 1000
+
+# Checking the clock on every node is measurable; poll it every N nodes.
+# Interior nodes cost up to half a millisecond (move ordering), so the
+# interval has to stay small for the time limit to hold
+_CLOCK_INTERVAL = 4
+
+# Move score (attack * 2 + defence) of a move that makes or stops an open three
+_THREAT_SCORE = MOVE_WEIGHTS[OPEN_THREE]
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time or node budget is exhausted"""
+
+
+class SearchStats:
+    """Move-ordering counters of one search, to measure how well it prunes"""
+
+    __slots__ = ("tt_hits", "cutoffs", "first_move_cutoffs", "killer_cutoffs")
+
+    def __init__(self):
+        # Nodes answered from the transposition table without searching
+        self.tt_hits = 0
+        # Beta cutoffs, and how many of them the first move produced
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.killer_cutoffs = 0
+
+    def to_dict(self, nodes: int = 0, depth: int = 0) -> dict:
+        return {
+            "tt_hits": self.tt_hits,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoff_rate": round(self.first_move_cutoffs / self.cutoffs, 3) if self.cutoffs else 0.0,
+            "killer_cutoffs": self.killer_cutoffs,
+            # nodes ~ b ** depth for a tree of effective branching factor b
+            "effective_branching": round(nodes ** (1 / depth), 2) if nodes and depth else 0.0,
+        }
+
+
+class SearchResult:
+    """Outcome of one ``SearchEngine.search`` call"""
+
+    __slots__ = ("move", "score", "depth", "nodes", "elapsed", "completed", "stats")
+
+    def __init__(self, move: Optional[int], score: int = 0, depth: int = 0,
+                 nodes: int = 0, elapsed: float = 0.0, completed: bool = False,
+                 stats: Optional[SearchStats] = None):
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+        # False when the budget cut the search short
+        self.completed = completed
+        self.stats = stats or SearchStats()
+
+    def to_dict(self) -> dict:
+        return {
+            "move": self.move,
+            "score": self.score,
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "elapsed_ms": round(self.elapsed * 1000, 2),
+            "completed": self.completed,
+            "stats": self.stats.to_dict(self.nodes, self.depth),
+        }
+
+
+def _to_table(score: int, ply: int) -> int:
+    """Make a win score relative to the stored node instead of the root"""
+    if score > _MATE_BOUND:
+        return score + ply
+    if score < -_MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _from_table(score: int, ply: int) -> int:
+    if score > _MATE_BOUND:
+        return score - ply
+    if score < -_MATE_BOUND:
+        return score + ply
+    return score
+
+
+class SearchEngine:
+    """Iterative-deepening negamax with alpha-beta pruning"""
+
+    def __init__(self, max_depth: int = 8, time_limit: float = 0.3,
+                 node_limit: Optional[int] = None, max_branching: int = 12,
+                 table: Optional[TranspositionTable] = None, killers: bool = True,
+                 history: bool = True, threat_ordering: bool = True):
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        # Only the most promising candidates are searched at each node
+        self.max_branching = max_branching
+        # Positions reached through different move orders share one entry
+        self.table = table
+        # Move-ordering heuristics, switchable to measure their effect
+        self.use_killers = killers
+        self.use_history = history
+        self.threat_ordering = threat_ordering
+        self.nodes = 0
+        self.stats = SearchStats()
+        self._deadline = 0.0
+        self._evaluator: Optional[PatternEvaluator] = None
+        # SIDE_KEYS with the variant of the searched board folded in
+        self._side_keys = SIDE_KEYS
+        # Per ply, the last two moves that caused a beta cutoff there
+        self._killers: List[List[int]] = []
+        # history[color][cell]: depth-weighted count of cutoffs by that move
+        self._history: List[List[int]] = []
+
+    def search(self, board: Board, color: int) -> SearchResult:
+        """Return the best move for ``color`` found within the budget"""
+        started = time.perf_counter()
+        self.nodes = 0
+        self.stats = SearchStats()
+        self._deadline = started + self.time_limit if self.time_limit else 0.0
+        if self.table is not None:
+            self.table.new_search()
+        self._killers = [[NO_MOVE, NO_MOVE] for _ in range(self.max_depth + 1)]
+        self._history = [[0] * board.geometry.cells for _ in range(3)]
+        # The table is shared by every game of the process: keep the
+        # variants' entries apart
+        variant = variant_key(board.rules.variant if board.rules is not None else None)
+        self._side_keys = tuple(side ^ variant for side in SIDE_KEYS)
+
+        if board.move_count == 0:
+            center = board.size // 2
+            return SearchResult(board.index(center, center), completed=True)
+
+        # Leaf scores come from pattern counts kept up to date on every make/unmake
+        self._evaluator = PatternEvaluator(board).attach()
+        moves = self._ordered_moves(board, color, 0)
+        if len(moves) <= 1:
+            self._evaluator.detach()
+            self._evaluator = None
+            return SearchResult(moves[0] if moves else None, completed=True,
+                                elapsed=time.perf_counter() - started)
+
+        result = SearchResult(moves[0], stats=self.stats)
+        try:
+            for depth in range(1, self.max_depth + 1):
+                try:
+                    best_move, best_score = self._search_root(board, color, depth, moves)
+                except SearchTimeout:
+                    result.completed = False
+                    break
+                result.move, result.score, result.depth = best_move, best_score, depth
+                result.completed = True
+                # Search the previous best first on the next iteration
+                moves.remove(best_move)
+                moves.insert(0, best_move)
+                if abs(best_score) >= WIN_SCORE - self.max_depth:
+                    break
+            else:
+                result.completed = True
+        finally:
+            self._evaluator.detach()
+            self._evaluator = None
+
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def _search_root(self, board: Board, color: int, depth: int, moves: List[int]):
+        alpha, beta = -INFINITY, INFINITY
+        best_move, best_score = moves[0], -INFINITY
+        for move in moves:
+            board.place(move, color)
+            try:
+                if board.is_five_at(move, color):
+                    score = WIN_SCORE
+                else:
+                    score = -self._negamax(board, opponent(color), depth - 1, -beta, -alpha, 1)
+            finally:
+                # Also unwinds the board when SearchTimeout aborts the iteration
+                board.remove(move)
+            if score > best_score:
+                best_move, best_score = move, score
+            if score > alpha:
+                alpha = score
+        return best_move, best_score
+
+    def _negamax(self, board: Board, color: int, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if self.node_limit and self.nodes >= self.node_limit:
+            raise SearchTimeout()
+        if self.nodes % _CLOCK_INTERVAL == 0:
+            self._check_budget()
+
+        if depth <= 0:
+            return self._evaluator.evaluate(color)
+
+        table = self.table
+        # Symmetric positions share one entry; its move is stored in the
+        # canonical orientation
+        canonical, sym = board.canonical()
+        key = canonical ^ self._side_keys[color]
+        hash_move = NO_MOVE
+        if table is not None:
+            entry = table.probe(key)
+            if entry is not None:
+                stored_depth, flag, stored_score, hash_move = entry
+                if hash_move != NO_MOVE:
+                    hash_move = restore_cell(hash_move, sym, board.size)
+                if stored_depth >= depth:
+                    stored_score = _from_table(stored_score, ply)
+                    if (flag == EXACT or (flag == LOWER and stored_score >= beta)
+                            or (flag == UPPER and stored_score <= alpha)):
+                        self.stats.tt_hits += 1
+                        return stored_score
+
+        moves = self._ordered_moves(board, color, ply)
+        if not moves:
+            return 0
+        if hash_move != NO_MOVE and hash_move in moves:
+            moves.remove(hash_move)
+            moves.insert(0, hash_move)
+
+        original_alpha = alpha
+        best = -INFINITY
+        best_move = NO_MOVE
+        for number, move in enumerate(moves):
+            board.place(move, color)
+            try:
+                if board.is_five_at(move, color):
+                    score = WIN_SCORE - ply
+                else:
+                    score = -self._negamax(board, opponent(color), depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.remove(move)
+            if score > best:
+                best = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self._record_cutoff(color, move, depth, ply, number)
+                        break
+
+        if table is not None:
+            if best <= original_alpha:
+                flag = UPPER
+            elif best >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            if best_move != NO_MOVE:
+                best_move = transform_cell(best_move, sym, board.size)
+            table.store(key, depth, flag, _to_table(best, ply), best_move)
+        return best
+
+    def _check_budget(self) -> None:
+        if self._deadline and time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+        if self.node_limit and self.nodes >= self.node_limit:
+            raise SearchTimeout()
+
+    def _record_cutoff(self, color: int, move: int, depth: int, ply: int, number: int) -> None:
+        stats = self.stats
+        stats.cutoffs += 1
+        if number == 0:
+            stats.first_move_cutoffs += 1
+        killers = self._killers[ply]
+        if move in killers:
+            stats.killer_cutoffs += 1
+        elif self.use_killers:
+            killers[1], killers[0] = killers[0], move
+        if self.use_history:
+            self._history[color][move] += depth * depth
+
+    def _ordered_moves(self, board: Board, color: int, ply: int) -> List[int]:
+        """Candidate moves for ``color``, most promising first.
+
+        An immediate win is the only move worth trying; if the opponent
+        threatens five, only the blocking cells are. Otherwise moves that
+        make or stop an open three or better come first (pattern
+        evaluator), then this ply's killer moves, then the rest by history
+        score and local activity. Moves the board's rules forbid to
+        ``color`` are left out.
+        """
+        wins = board.winning_cells(color)
+        if wins:
+            return [next(iter_bits(wins))]
+        rules = board.rules
+        blocks = board.winning_cells(opponent(color))
+        if blocks:
+            if rules is not None:
+                return rules.legal_moves(board, color, iter_bits(blocks))
+            return list(iter_bits(blocks))
+
+        candidates = board.frontier
+        if not candidates:
+            candidates = board.empty
+        occupied = board.occupied
+        own = board.bits[color]
+        near = board.geometry.rings(1)
+        history = self._history[color] if self.use_history else None
+        threat_score = self._evaluator.move_score if self.threat_ordering and self._evaluator else None
+        killers = self._killers[ply] if self.use_killers and ply < len(self._killers) else ()
+
+        scored = []
+        for cell in iter_bits(candidates):
+            # Cheap proxy for activity: stones around the cell, own stones counted twice
+            activity = (occupied & near[cell]).bit_count() + (own & near[cell]).bit_count()
+            threat = threat_score(cell, color) if threat_score else 0
+            if threat >= _THREAT_SCORE:
+                rank = 2
+            elif cell in killers:
+                rank = 1
+            else:
+                rank = 0
+            scored.append((rank, threat, history[cell] if history else 0, activity, cell))
+        scored.sort(reverse=True)
+        if rules is not None and rules.forbids(color):
+            return rules.legal_moves(board, color, (entry[-1] for entry in scored))[:self.max_branching]
+        return [entry[-1] for entry in scored[:self.max_branching]]
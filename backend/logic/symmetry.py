@@ -0,0 +1,66 @@
+"""The eight symmetries of a square board (rotations and reflections).
+
+A position and its seven rotated/mirrored copies are the same position for
+the game, so caches keyed by position (transposition table, opening book,
+pondering/analysis results) store them once, under the canonical key - the
+smallest of the eight Zobrist keys, which ``Board`` keeps up to date
+incrementally. Moves are stored in the canonical orientation and mapped
+back with ``restore_cell``.
+
+Symmetry ``s`` moves the stone on cell ``i`` to ``permutations(size)[s][i]``.
+"""
+from functools import lru_cache
+from typing import Callable, Tuple
+
+IDENTITY = 0
+
+NAMES = ("identity", "rot90", "rot180", "rot270", "flip_rows", "flip_cols", "transpose", "anti_transpose")
+
+_TRANSFORMS: Tuple[Callable[[int, int, int], Tuple[int, int]], ...] = (
+    lambda row, col, last: (row, col),
+    lambda row, col, last: (col, last - row),
+    lambda row, col, last: (last - row, last - col),
+    lambda row, col, last: (last - col, row),
+    lambda row, col, last: (row, last - col),
+    lambda row, col, last: (last - row, col),
+    lambda row, col, last: (col, row),
+    lambda row, col, last: (last - col, last - row),
+)
+
+COUNT = len(_TRANSFORMS)
+
+
+@lru_cache(maxsize=None)
+def permutations(size: int) -> Tuple[Tuple[int, ...], ...]:
+    """Per symmetry, the image of every cell index"""
+    last = size - 1
+    built = []
+    for transform in _TRANSFORMS:
+        image = []
+        for index in range(size * size):
+            row, col = transform(*divmod(index, size), last)
+            image.append(row * size + col)
+        built.append(tuple(image))
+    return tuple(built)
+
+
+@lru_cache(maxsize=None)
+def inverse_permutations(size: int) -> Tuple[Tuple[int, ...], ...]:
+    """Per symmetry, the cell each cell index comes from"""
+    built = []
+    for image in permutations(size):
+        inverse = [0] * len(image)
+        for index, target in enumerate(image):
+            inverse[target] = index
+        built.append(tuple(inverse))
+    return tuple(built)
+
+
+def transform_cell(index: int, symmetry: int, size: int) -> int:
+    """Map a cell of the original board into the orientation ``symmetry``"""
+    return permutations(size)[symmetry][index]
+
+
+def restore_cell(index: int, symmetry: int, size: int) -> int:
+    """Map a cell of orientation ``symmetry`` back onto the original board"""
+    return inverse_permutations(size)[symmetry][index]
@@ -0,0 +1,143 @@
+"""Live threats of a game: fours, open threes and the cells that answer them.
+
+``ThreatMap(board).attach()`` keeps a ``PatternEvaluator`` in step with the
+board and, for every line holding a threat, the cells that matter on it:
+
+    fours        cells that complete five (one for a four, two for an
+                 open four)
+    open threes  cells that turn the three into an open four, which are
+                 also where the opponent has to block it
+
+A move only changes the four lines through its cell, so those are marked
+dirty and rescanned on the next query; every other line keeps its cached
+cells. A query therefore costs a few line scans and a walk over the lines
+that actually hold a threat, instead of trying every empty cell of the
+board the way ``GameLogic._find_winning_move`` does.
+"""
+from typing import Any, Dict, List, Set, Tuple
+
+from logic.board import BLACK, WHITE, COLOR_NAMES, Board, iter_bits, opponent
+from logic.patterns import PatternEvaluator, HALF, CENTER_BIT, WINDOW, WINDOW_MASK, OPEN_FOUR, FIVE
+
+# Stones a line needs before it can hold an open three / a four
+_MIN_THREE = 3
+_MIN_FOUR = 4
+
+
+class ThreatMap:
+    """Per-line threat cells of both colors, refreshed lazily on the lines a move touched"""
+
+    def __init__(self, board: Board):
+        self.board = board
+        self.evaluator = PatternEvaluator(board)
+        self.tables = self.evaluator.tables
+        # threats[color][line]: (five-making cells, open-four-making cells)
+        # as board masks, for the lines where either is non-empty
+        self.threats: List[Dict[int, Tuple[int, int]]] = [{}, {}, {}]
+        self._dirty: Set[int] = set(range(len(self.tables.lines)))
+
+    # -- Board tracker protocol -------------------------------------------
+    def attach(self) -> "ThreatMap":
+        self.board.trackers.append(self)
+        return self
+
+    def detach(self) -> None:
+        if self in self.board.trackers:
+            self.board.trackers.remove(self)
+
+    def on_place(self, index: int, color: int) -> None:
+        self.evaluator.on_place(index, color)
+        for line, _ in self.tables.cell_lines[index]:
+            self._dirty.add(line)
+
+    def on_remove(self, index: int, color: int) -> None:
+        self.evaluator.on_remove(index, color)
+        for line, _ in self.tables.cell_lines[index]:
+            self._dirty.add(line)
+
+    # ---------------------------------------------------------------------
+    def _refresh(self) -> None:
+        for line in self._dirty:
+            for color in (BLACK, WHITE):
+                fives, fours = self._scan_line(line, color)
+                if fives or fours:
+                    self.threats[color][line] = (fives, fours)
+                else:
+                    self.threats[color].pop(line, None)
+        self._dirty.clear()
+
+    def _scan_line(self, line: int, color: int) -> Tuple[int, int]:
+        evaluator = self.evaluator
+        own_bits = evaluator.line_bits[color][line]
+        stones = bin(own_bits).count("1")
+        if stones < _MIN_THREE:
+            return 0, 0
+        blocked_bits = evaluator.line_bits[opponent(color)][line] | self.tables.walls[line]
+        table = evaluator.table
+        fives = fours = 0
+        for position, cell in enumerate(self.tables.lines[line]):
+            if (own_bits | blocked_bits) >> (position + HALF) & 1:
+                continue
+            own = (own_bits >> position & WINDOW_MASK) | CENTER_BIT
+            blocked = blocked_bits >> position & WINDOW_MASK
+            kind = table[own | blocked << WINDOW]
+            if kind == FIVE and stones >= _MIN_FOUR:
+                fives |= 1 << cell
+            elif kind == OPEN_FOUR:
+                fours |= 1 << cell
+        return fives, fours
+
+    def winning_cells(self, color: int) -> int:
+        """Mask of the cells where ``color`` wins with its next stone"""
+        self._refresh()
+        mask = 0
+        for fives, _ in self.threats[color].values():
+            mask |= fives
+        rules = self.board.rules
+        return rules.winning_cells(self.board, color, mask) if rules is not None and mask else mask
+
+    def groups(self, color: int) -> Tuple[List[int], List[int]]:
+        """Per line, the completion cells of each four and the open-four cells of each open three"""
+        self._refresh()
+        fours = [fives for fives, _ in self.threats[color].values() if fives]
+        threes = [cells for fives, cells in self.threats[color].values() if cells and not fives]
+        rules = self.board.rules
+        if rules is not None:
+            fours = [mask for mask in (rules.winning_cells(self.board, color, mask) for mask in fours) if mask]
+        if rules is not None and rules.forbids(color):
+            threes = [
+                legal for legal in (
+                    sum(1 << cell for cell in iter_bits(cells) if rules.is_legal(self.board, cell, color))
+                    for cells in threes
+                ) if legal
+            ]
+        return fours, threes
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Threats of both colors, with the cells each side must block, as (row, col) lists"""
+        coords = self.board.coords
+
+        def cells(mask: int) -> List[List[int]]:
+            return [list(coords(cell)) for cell in iter_bits(mask)]
+
+        summary: Dict[str, Any] = {}
+        winning = {color: self.winning_cells(color) for color in (BLACK, WHITE)}
+        groups = {color: self.groups(color) for color in (BLACK, WHITE)}
+        for color in (BLACK, WHITE):
+            other = opponent(color)
+            fours, threes = groups[color]
+            # A five next move beats any three; otherwise every open three
+            # must be answered before it becomes an open four
+            if winning[other]:
+                must_block = winning[other]
+            else:
+                must_block = 0
+                for mask in groups[other][1]:
+                    must_block |= mask
+            summary[COLOR_NAMES[color]] = {
+                "winning": cells(winning[color]),
+                "fours": [cells(mask) for mask in fours],
+                "open_threes": [cells(mask) for mask in threes],
+                "must_block": cells(must_block),
+            }
+        return summary
@@ -0,0 +1,226 @@
+"""Threat-space search: forced wins by continuous fours (VCF) or by threes and fours (VCT).
+
+The attacker only ever plays threats - moves that make a four, or (VCT)
+an open three - and the defender only answers them: a four leaves exactly
+one cell to block, a three leaves the cells that would turn it into a four
+plus any counter-four of the defender. Both sides therefore have a handful
+of moves per node and the solver reaches sequences far deeper than the
+full-width alpha-beta search can.
+
+A line is returned only when every defence was refuted, so a found win is
+forced (within the threat model: the defender is not assumed to find quiet
+moves that defuse a three from afar).
+"""
+import time
+from typing import Dict, List, Optional
+
+from logic.board import Board, iter_bits, opponent
+from logic.patterns import PatternEvaluator, FOUR, OPEN_THREE, MOVE_WEIGHTS
+from logic.search import SearchTimeout
+
+VCF = "vcf"
+VCT = "vct"
+
+_CLOCK_INTERVAL = 16
+
+
+class ThreatResult:
+    """Outcome of one ``ThreatSolver.solve`` call"""
+
+    __slots__ = ("kind", "color", "line", "nodes", "elapsed", "completed")
+
+    def __init__(self, kind: str, color: int, line: Optional[List[int]] = None,
+                 nodes: int = 0, elapsed: float = 0.0, completed: bool = True):
+        self.kind = kind
+        self.color = color
+        # Winning line as cell indices, attacker and defender moves alternating
+        self.line = line or []
+        self.nodes = nodes
+        self.elapsed = elapsed
+        # False when the budget ran out before the tree was exhausted
+        self.completed = completed
+
+    @property
+    def found(self) -> bool:
+        return bool(self.line)
+
+    @property
+    def move(self) -> Optional[int]:
+        return self.line[0] if self.line else None
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "found": self.found,
+            "move": self.move,
+            "line": list(self.line),
+            "nodes": self.nodes,
+            "elapsed_ms": round(self.elapsed * 1000, 2),
+            "completed": self.completed,
+        }
+
+
+class ThreatSolver:
+    """Narrow-width solver for forced wins, bounded by depth, time and nodes"""
+
+    def __init__(self, vcf_depth: int = 12, vct_depth: int = 6,
+                 time_limit: float = 0.1, node_limit: Optional[int] = None):
+        # Depths count attacker moves
+        self.vcf_depth = vcf_depth
+        self.vct_depth = vct_depth
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.nodes = 0
+        self._deadline = 0.0
+        self._threes = False
+        self._evaluator: Optional[PatternEvaluator] = None
+        # Attacker-to-move positions already refuted, with the depth tried
+        self._refuted: Dict[int, int] = {}
+
+    def vcf(self, board: Board, color: int) -> ThreatResult:
+        return self.solve(board, color, VCF)
+
+    def vct(self, board: Board, color: int) -> ThreatResult:
+        return self.solve(board, color, VCT)
+
+    def solve(self, board: Board, color: int, kind: str = VCF) -> ThreatResult:
+        """Look for a forced win of ``color`` (to move) on ``board``.
+
+        The board is modified during the search and restored before
+        returning.
+        """
+        if kind not in (VCF, VCT):
+            raise ValueError(f"Unknown threat search: {kind}")
+        started = time.perf_counter()
+        self.nodes = 0
+        self._deadline = started + self.time_limit if self.time_limit else 0.0
+        self._threes = kind == VCT
+        self._refuted = {}
+        depth = self.vct_depth if kind == VCT else self.vcf_depth
+
+        result = ThreatResult(kind, color)
+        self._evaluator = PatternEvaluator(board).attach()
+        try:
+            # Deepen gradually so the shortest forced win is found first
+            for limit in range(1, depth + 1):
+                line = self._attack(board, color, limit)
+                if line:
+                    result.line = line
+                    break
+        except SearchTimeout:
+            result.completed = False
+        finally:
+            self._evaluator.detach()
+            self._evaluator = None
+            self._refuted = {}
+
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def _check_budget(self) -> None:
+        if self.node_limit and self.nodes >= self.node_limit:
+            raise SearchTimeout()
+        # Checking the clock is the expensive part; poll it every N nodes
+        if self.nodes % _CLOCK_INTERVAL == 0 and self._deadline and time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+
+    def _attack(self, board: Board, color: int, depth: int) -> Optional[List[int]]:
+        """Winning line for ``color`` to move, or None"""
+        self.nodes += 1
+        self._check_budget()
+
+        wins = board.winning_cells(color)
+        if wins:
+            return [next(iter_bits(wins))]
+        if depth <= 0:
+            return None
+        # Refutations hold for every symmetric image of the position
+        key = board.canonical()[0]
+        if self._refuted.get(key, -1) >= depth:
+            return None
+
+        for move in self._threats(board, color):
+            board.place(move, color)
+            try:
+                line = self._defend(board, color, depth)
+            finally:
+                board.remove(move)
+            if line is not None:
+                return [move] + line
+
+        self._refuted[key] = depth
+        return None
+
+    def _defend(self, board: Board, color: int, depth: int) -> Optional[List[int]]:
+        """Winning continuation after an attacker threat if no defence holds"""
+        defender = opponent(color)
+        wins = board.winning_cells(color)
+        if wins & (wins - 1):
+            # Open four or double four: only one cell can be blocked
+            return [next(iter_bits(wins))]
+
+        if wins:
+            replies = [next(iter_bits(wins))]
+        else:
+            replies = self._three_defences(board, color)
+            if not replies:
+                return None
+
+        line = None
+        for reply in replies:
+            board.place(reply, defender)
+            try:
+                follow = self._attack(board, color, depth - 1)
+            finally:
+                board.remove(reply)
+            if follow is None:
+                return None
+            if line is None:
+                line = [reply] + follow
+        return line
+
+    def _threats(self, board: Board, color: int) -> List[int]:
+        """Attacker threat moves: fours first, then open threes when solving VCT"""
+        forced = board.winning_cells(opponent(color))
+        if forced & (forced - 1):
+            return []  # the defender has two fives to make; blocking one loses
+        # With a defender four on the board the block is the only legal threat
+        cells = forced or board.frontier
+        patterns = self._evaluator.move_patterns
+        fours, threes = [], []
+        for cell in iter_bits(cells):
+            kinds = patterns(cell, color)
+            best = max(kinds)
+            # Moves making several threats at once come first
+            weight = sum(MOVE_WEIGHTS[kind] for kind in kinds)
+            if best >= FOUR:
+                fours.append((weight, cell))
+            elif best == OPEN_THREE and self._threes:
+                threes.append((weight, cell))
+        fours.sort(reverse=True)
+        threes.sort(reverse=True)
+        moves = [cell for _, cell in fours + threes]
+        if board.rules is not None:
+            return board.rules.legal_moves(board, color, moves)
+        return moves
+
+    def _three_defences(self, board: Board, color: int) -> List[int]:
+        """Cells that stop a three: its four cells, plus defender counter-fours"""
+        defender = opponent(color)
+        patterns = self._evaluator.move_patterns
+        blocks, counters = [], []
+        for cell in iter_bits(board.frontier):
+            if max(patterns(cell, color)) >= FOUR:
+                blocks.append(cell)
+            elif max(patterns(cell, defender)) >= FOUR:
+                counters.append(cell)
+        if not blocks:
+            return []  # not a real threat
+        return blocks + counters
+
+
+def find_forced_win(board: Board, color: int, kind: str = VCF,
+                    time_limit: float = 0.1, node_limit: Optional[int] = None) -> ThreatResult:
+    """Standalone entry point: run one threat search on a copy of ``board``"""
+    return ThreatSolver(time_limit=time_limit, node_limit=node_limit).solve(board.copy(), color, kind)
@@ -0,0 +1,98 @@
+"""Fixed-size transposition table for the alpha-beta search.
+
+Entries live in flat ``array`` columns, so the memory footprint is fixed at
+construction time (``AI_TT_MB`` megabytes per worker by default) and never
+grows. Each key maps to exactly one slot; when two positions compete for a
+slot the deeper search wins, except that entries left over from an older
+search are always replaced.
+"""
+import os
+from array import array
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+EXACT = 0
+LOWER = 1  # score is a lower bound (fail high)
+UPPER = 2  # score is an upper bound (fail low)
+
+NO_MOVE = -1
+
+# keys(8) + scores(4) + depths(1) + flags(1) + moves(2) + ages(1)
+ENTRY_BYTES = 17
+
+
+class TranspositionTable:
+    """Depth-preferred, single-slot hash table keyed by Zobrist hash"""
+
+    def __init__(self, size_mb: float = 16):
+        capacity = max(1, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        # Round down to a power of two so the slot is ``key & mask``
+        self.capacity = 1 << (capacity.bit_length() - 1)
+        self.mask = self.capacity - 1
+        self.keys = array("Q", bytes(8 * self.capacity))
+        self.scores = array("i", bytes(4 * self.capacity))
+        self.depths = array("b", bytes(self.capacity))
+        self.flags = array("b", bytes(self.capacity))
+        self.moves = array("h", bytes(2 * self.capacity))
+        self.ages = array("B", bytes(self.capacity))
+        self.age = 1
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self.capacity * ENTRY_BYTES
+
+    def new_search(self) -> None:
+        """Mark existing entries as stale so they are replaced first"""
+        self.age = self.age % 255 + 1
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, int, int]]:
+        """Return ``(depth, flag, score, move)`` stored for ``key``, if any"""
+        slot = key & self.mask
+        stored = self.keys[slot]
+        if stored == key and self.ages[slot]:
+            self.hits += 1
+            return self.depths[slot], self.flags[slot], self.scores[slot], self.moves[slot]
+        if self.ages[slot]:
+            self.collisions += 1
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, flag: int, score: int, move: int = NO_MOVE) -> None:
+        slot = key & self.mask
+        age = self.ages[slot]
+        if age and age == self.age and self.keys[slot] != key and self.depths[slot] > depth:
+            # Depth-preferred: keep the deeper entry from this search
+            return
+        self.keys[slot] = key
+        self.scores[slot] = score
+        self.depths[slot] = min(depth, 127)
+        self.flags[slot] = flag
+        self.moves[slot] = move
+        self.ages[slot] = self.age
+        self.stores += 1
+
+    def clear(self) -> None:
+        self.ages = array("B", bytes(self.capacity))
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def stats(self) -> Dict[str, float]:
+        probes = self.hits + self.misses
+        return {
+            "capacity": self.capacity,
+            "size_bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "hit_rate": round(self.hits / probes, 4) if probes else 0.0,
+        }
+
+
+@lru_cache(maxsize=None)
+def shared_table() -> TranspositionTable:
+    """The per-process table, sized by ``AI_TT_MB``"""
+    return TranspositionTable(float(os.getenv("AI_TT_MB", "16")))
@@ -0,0 +1,170 @@
+"""NumPy backend for the "medium" AI.
+
+Reproduces ``GameLogic._strategic_cell``/``_cell_score`` for every cell
+at once: the board becomes an int8 array (1 own, -1 opponent, 0 empty,
+2 outside the board) and, per direction, run lengths and open ends come
+from four shifted views of that array. Works on a single ``(N, N)`` board or a stack ``(B, N, N)``.
+
+NumPy is optional; ``HAS_NUMPY`` tells callers whether to use this module
+or the pure-Python methods on ``GameLogic``.
+"""
+from typing import List, Optional, Sequence
+
+from logic.board import Board, DIRECTIONS, opponent
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - GameLogic falls back to pure Python
+    np = None
+
+HAS_NUMPY = np is not None
+
+# Same reach as the Python evaluator: up to four cells on each side
+_REACH = 4
+_PAD = _REACH + 1
+_WALL = 2
+
+
+def mask_to_array(mask: int, size: int) -> "np.ndarray":
+    """Boolean ``(size, size)`` array with True where ``mask`` has a bit set"""
+    cells = size * size
+    raw = np.frombuffer(mask.to_bytes((cells + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:cells].reshape(size, size).astype(bool)
+
+
+def relative_cells(board: Board, color: int) -> "np.ndarray":
+    """int8 array of ``board`` seen by ``color``: 1 own, -1 opponent, 0 empty"""
+    own = mask_to_array(board.bits[color], board.size)
+    other = mask_to_array(board.bits[opponent(color)], board.size)
+    return own.astype(np.int8) - other.astype(np.int8)
+
+
+def _direction_runs(cells: "np.ndarray", value: int):
+    """Yield ``(count, open_ends)`` arrays per direction for stones equal to ``value``.
+
+    ``count`` includes the (empty) cell itself, like ``GameLogic._cell_score``.
+    """
+    size = cells.shape[-1]
+    pad = [(0, 0)] * (cells.ndim - 2) + [(_PAD, _PAD), (_PAD, _PAD)]
+    padded = np.pad(cells, pad, constant_values=_WALL)
+    own = padded == value
+    empty = padded == 0
+
+    def view(layer: "np.ndarray", dr: int, dc: int) -> "np.ndarray":
+        return layer[..., _PAD + dr:_PAD + dr + size, _PAD + dc:_PAD + dc + size]
+
+    for dx, dy in DIRECTIONS:
+        count = np.ones(cells.shape, dtype=np.int8)
+        open_ends = np.zeros(cells.shape, dtype=np.int8)
+        for sign in (1, -1):
+            # The first non-own cell ends the run; it is an open end if empty
+            running = view(own, sign * dx, sign * dy)
+            open_ends += view(empty, sign * dx, sign * dy)
+            count += running
+            for step in range(2, _REACH + 1):
+                open_ends += running & view(empty, sign * step * dx, sign * step * dy)
+                running = running & view(own, sign * step * dx, sign * step * dy)
+                count += running
+        yield count, open_ends
+
+
+def _score_table() -> "np.ndarray":
+    """``GameLogic._cell_score`` points for one direction, indexed by [count, open_ends]"""
+    table = np.zeros((2 * _REACH + 2, 3), dtype=np.int32)
+    for count in range(1, 2 * _REACH + 2):
+        for open_ends in range(3):
+            if count >= 4:
+                table[count, open_ends] = 1000
+            elif count == 3 and open_ends >= 1:
+                table[count, open_ends] = 100
+            elif count == 2 and open_ends >= 1:
+                table[count, open_ends] = 10
+            else:
+                table[count, open_ends] = count
+    return table
+
+
+_SCORES = _score_table() if HAS_NUMPY else None
+
+
+def winning_cells(cells: "np.ndarray", value: int = 1) -> "np.ndarray":
+    """Boolean array of empty cells where ``value`` would make five in a row"""
+    wins = np.zeros(cells.shape, dtype=bool)
+    for count, _ in _direction_runs(cells, value):
+        wins |= count >= 5
+    return wins & (cells == 0)
+
+
+def strategic_scores(cells: "np.ndarray") -> "np.ndarray":
+    """``GameLogic._cell_score`` for every cell, from the point of view of value 1"""
+    score = np.zeros(cells.shape, dtype=np.int32)
+    for count, open_ends in _direction_runs(cells, 1):
+        score += _SCORES[count, open_ends]
+    return score
+
+
+def _first(mask: "np.ndarray") -> Optional[int]:
+    flat = mask.reshape(-1)
+    if not flat.any():
+        return None
+    return int(flat.argmax())
+
+
+def _rule_wins(board: Board, wins: "np.ndarray", color: int) -> "np.ndarray":
+    """``wins`` (five-making cells of ``color``) narrowed by the board's rules, if any"""
+    if board.rules is None:
+        return wins
+    mask = 0
+    for cell in np.flatnonzero(wins):
+        mask |= 1 << int(cell)
+    return mask_to_array(board.rules.winning_cells(board, color, mask), board.size)
+
+
+def strategic_move(board: Board, color: int, candidates: Optional[int] = None) -> Optional[int]:
+    """Medium AI move (win, else block, else best score) as a cell index.
+
+    ``candidates`` is a cell mask (the board frontier by default; pass
+    ``GameLogic._candidate_cells`` to leave out moves the rules forbid).
+    Wins and blocks follow the board's rules, and ties are broken in
+    raster order exactly like the Python implementation.
+    """
+    if candidates is None:
+        candidates = board.frontier
+    if not candidates:
+        return None
+    allowed = mask_to_array(candidates, board.size)
+    cells = relative_cells(board, color)
+
+    move = _first(_rule_wins(board, winning_cells(cells, 1), color) & allowed)
+    if move is None:
+        move = _first(_rule_wins(board, winning_cells(cells, -1), opponent(color)) & allowed)
+    if move is None:
+        scores = np.where(allowed, strategic_scores(cells), -1)
+        move = int(scores.reshape(-1).argmax())
+    return move
+
+
+def strategic_moves(boards: Sequence[Board], color: int,
+                    candidates: Optional[Sequence[int]] = None) -> List[Optional[int]]:
+    """``strategic_move`` for many boards of one size, scored as a single stack"""
+    if not boards:
+        return []
+    size = boards[0].size
+    if candidates is None:
+        candidates = [board.frontier for board in boards]
+    allowed = np.stack([mask_to_array(mask, size) for mask in candidates])
+    cells = np.stack([relative_cells(board, color) for board in boards])
+
+    wins = winning_cells(cells, 1)
+    blocks = winning_cells(cells, -1)
+    scores = np.where(allowed, strategic_scores(cells), -1)
+
+    moves: List[Optional[int]] = []
+    for position, board in enumerate(boards):
+        move = _first(_rule_wins(board, wins[position], color) & allowed[position])
+        if move is None:
+            move = _first(_rule_wins(board, blocks[position], opponent(color)) & allowed[position])
+        if move is None and allowed[position].any():
+            move = int(scores[position].reshape(-1).argmax())
+        moves.append(move)
+    return moves
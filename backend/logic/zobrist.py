@@ -0,0 +1,43 @@
+"""Zobrist hashing for ``Board`` positions.
+
+Each (color, cell) pair owns a random 64-bit key and a position hashes to
+the XOR of the keys of its stones, so placing or removing a stone updates
+the hash with a single XOR. The tables are generated from a fixed seed:
+every worker process, and every file written with these keys (opening
+book, caches), agrees on the same hash for the same position.
+"""
+import random
+from functools import lru_cache
+from typing import Optional, Tuple
+
+KEY_BITS = 64
+_SEED = 0x60C0
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size: int) -> Tuple[Tuple[int, ...], ...]:
+    """Return the key table indexed as ``keys[color][cell]`` for ``size``"""
+    rng = random.Random(_SEED * 1000 + size)
+    cells = size * size
+    empty = tuple(0 for _ in range(cells))
+    black = tuple(rng.getrandbits(KEY_BITS) for _ in range(cells))
+    white = tuple(rng.getrandbits(KEY_BITS) for _ in range(cells))
+    return (empty, black, white)
+
+
+# XOR-ed into a key when the side to move matters (search results)
+_side_rng = random.Random(_SEED)
+SIDE_KEYS = (0, _side_rng.getrandbits(KEY_BITS), _side_rng.getrandbits(KEY_BITS))
+
+
+@lru_cache(maxsize=None)
+def variant_key(variant: Optional[str]) -> int:
+    """Key XOR-ed into search results found under ``variant``'s rules.
+
+    Freestyle boards carry no rules (``variant`` None) and keep a key of 0,
+    so tables shared by every game of a process never mix up a position's
+    results across variants.
+    """
+    if variant is None:
+        return 0
+    return random.Random(f"{_SEED}:{variant}").getrandbits(KEY_BITS)
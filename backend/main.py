@@ -7,6 +7,7 @@ import admin
 import symbols
 import admin
 import player
+import sys
 
 
 
@@ -38,7 +39,7 @@ def gameMode():
 
 #encerra o jogo indicando o vencedor ou empate
 def gameEnding(moves):
-	if (moves < 361):
+	if (moves < dungeonMaster.size ** 2):
 		print(f'                           {currentPlayer} wins!                           ')
 		print("                        Thank you for playing.                              ")
 		print("                      Please, never come back  =)                           ")
@@ -53,6 +54,12 @@ def gameEnding(moves):
 
 #-------- GAME INIT  -------------
 
+#com argumentos na linha de comando, roda a simulação sem terminal (ver simulate.py)
+if (len(sys.argv) > 1):
+	import simulate
+	simulate.main()
+	sys.exit()
+
 dungeonMaster = admin.Admin()
 gameMatrix = dungeonMaster.createTable()
 mode = gameMode()
@@ -93,7 +100,7 @@ else:	#mode == '2'
 gameLoop = True
 currentPlayer = p2
 moves = 0
-while (gameLoop and moves < 361):
+while (gameLoop and moves < dungeonMaster.size ** 2):
 	if (currentPlayer == p2):
 		currentPlayer = p1
 	else:
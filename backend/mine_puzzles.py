@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Gera quebra-cabeças "vença em N" a partir das partidas terminadas no MongoDB
+
+    python mine_puzzles.py --workers 4                 # continua de onde parou
+    python mine_puzzles.py --restart --min-moves 3     # recomeça do início
+    python mine_puzzles.py --name vct --kind vct --limit 10000
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from dotenv import load_dotenv
+
+from logic.threats import VCF, VCT
+from services.puzzles import mine_puzzles
+
+load_dotenv()
+
+
+async def run(args) -> dict:
+    from database import connect_to_mongo, close_mongo_connection
+
+    await connect_to_mongo()
+    try:
+        return await mine_puzzles(
+            name=args.name, chunk_size=args.chunk_size, workers=args.workers, limit=args.limit,
+            restart=args.restart, kind=args.kind, min_moves=args.min_moves,
+            time_limit=args.time_limit, node_limit=args.node_limit,
+        )
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mine forced-win puzzles from finished games")
+    parser.add_argument("--name", default="default", help="checkpoint name; a run resumes its own checkpoint")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start over")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="solver processes")
+    parser.add_argument("--chunk-size", type=int, default=500, help="games read and checkpointed at a time")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many games")
+    parser.add_argument("--kind", choices=(VCF, VCT), default=VCF, help="threat search run on every position")
+    parser.add_argument("--min-moves", type=int, default=2, help="shortest win kept, in attacker moves")
+    parser.add_argument("--time-limit", type=float, default=0.05, help="solver seconds per position")
+    parser.add_argument("--node-limit", type=int, default=20000, help="solver nodes per position")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+    print(f"🧩 {summary['processed']} games mined in {summary['elapsed_s']}s "
+          f"({summary['games_per_second']} games/s)")
+    print(json.dumps(summary, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from datetime import datetime
 from enum import Enum
 from bson import ObjectId
 from models.user import PyObjectId
+from logic.rules import get_rules
 
 class GameStatus(str, Enum):
     WAITING = "waiting"
@@ -43,7 +44,8 @@ class Player(BaseModel):
     is_online: bool = True
 
 class GameBase(BaseModel):
-    board: List[List[Optional[str]]] = Field(default_factory=lambda: [[None for _ in range(19)] for _ in range(19)])
+    board: List[List[Optional[str]]] = Field(default_factory=lambda: get_rules().empty_rows())
+    variant: str = Field(default_factory=lambda: get_rules().variant)  # "freestyle", "standard", "renju"
     current_player: PieceColor = PieceColor.BLACK
     status: GameStatus = GameStatus.WAITING
     game_mode: str = "pvp"  # "pvp" or "pve"
@@ -1,4 +1,5 @@
 from symbols import *
+import random
 
 #A classe Player define a identidade de cada jogador (1, 2 ou IA), qual a sua peça, 
 #e um método para requisitar uma jogada
@@ -24,3 +25,59 @@ class Player:
 		coord2 = input("Input column coordinate: ")
 
 		return [coord1, coord2]
+
+
+#Jogadores automáticos, usados pela simulação sem terminal (simulate.py): em vez de
+#pedir coordenadas, escolhem a jogada olhando o tabuleiro interno do Admin
+
+#escolhe ao acaso uma casa livre (e permitida pela variante de regras); tem o
+#próprio gerador de números, para que uma partida possa ser repetida pela semente
+class RandomPlayer(Player):
+
+	def __init__(self, id, seed=None):
+		super().__init__(id)
+		self.name = 'random'
+		self.random = random.Random(seed)
+
+	def __str__(self):
+		return (f'{self.name} (player {self.id})')
+
+	def chooseMove(self, admin, matrix):
+		from logic.board import iter_bits
+		board = admin.boardFor(matrix)
+		cells = list(iter_bits(board.empty))
+		self.random.shuffle(cells)
+		for cell in cells:
+			c1, c2 = board.coords(cell)
+			if (admin.checkAllowedInsertion(self, c1, c2, matrix)):
+				return c1, c2
+		return board.coords(cells[0])
+
+
+#joga com a IA do backend numa das dificuldades (easy, medium, hard, ...), que
+#pode ter campos ajustados como na arena: "hard:max_depth=3"
+class EnginePlayer(Player):
+
+	def __init__(self, id, difficulty='medium'):
+		super().__init__(id)
+		from services.arena import parse_contender
+		from services.game_logic import GameLogic
+		self.name = difficulty
+		self.profile = parse_contender(difficulty)
+		self.logic = GameLogic(rules=None)
+
+	def __str__(self):
+		return (f'{self.name} (player {self.id})')
+
+	def chooseMove(self, admin, matrix):
+		from logic.board import BLACK, WHITE
+		board = admin.boardFor(matrix)
+		color = BLACK if self.piece == p1piece else WHITE
+		return board.coords(self.logic.get_ai_cell(board, self.profile, color))
+
+
+#cria um jogador automático a partir do nome dado na linha de comando
+def makePlayer(spec, id, seed=None):
+	if (spec == 'random'):
+		return RandomPlayer(id, seed)
+	return EnginePlayer(id, spec)
@@ -9,8 +9,11 @@ from datetime import datetime, timedelta
 from bson import ObjectId
 import logging
 
+from database import get_collection
 from models.user import User
 from routers.auth import get_current_user
+from services.ai_service import ai_service
+from services.analysis_service import analysis_service
 
 logger = logging.getLogger(__name__)
 
@@ -508,6 +511,24 @@ async def get_dashboard_stats(
     }
 
 
+@router.get("/stats/ai")
+async def get_ai_stats(admin_user: User = Depends(require_admin)):
+    """Métricas do pool de workers da IA (fila, tempo de espera e de cálculo)"""
+    return ai_service.stats()
+
+
+@router.get("/stats/analysis")
+async def get_analysis_stats(admin_user: User = Depends(require_admin)):
+    """Métricas da análise de partidas (fila persistente, cache e workers)"""
+    stats = analysis_service.stats()
+    jobs_collection = await get_collection("analysis_jobs")
+    stats["jobs"] = {
+        state: await jobs_collection.count_documents({"status": state})
+        for state in ("queued", "running", "done", "failed")
+    }
+    return stats
+
+
 @router.get("/logs")
 async def get_admin_logs(
     page: int = Query(default=1, ge=1),
@@ -1,5 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-import os
+from fastapi import APIRouter, HTTPException, Depends, Response, status
 from typing import Optional
 from datetime import datetime
 from bson import ObjectId
@@ -8,17 +7,19 @@ from pydantic import BaseModel
 from routers.auth import get_current_user
 from database import get_collection
 from models.user import UserPublic
-from .websocket_games import game_manager
+from .websocket_games import game_manager, threats_message
 from utils.serialize import to_jsonable
+from services.ai_service import ai_service
+from services.analysis_service import analysis_service
+from logic.board import COLOR_CODES
+from logic.rules import VARIANTS, get_rules, rules_for
 
 router = APIRouter()
 
-# Configurable board size (default 15)
-BOARD_SIZE = int(os.getenv('BOARD_SIZE', '15'))
-
 class CreateGameRequest(BaseModel):
     mode: str  # "pvp-local", "pvp-online", "pve"
-    difficulty: Optional[str] = "medium"  # "easy", "medium", "hard"
+    difficulty: Optional[str] = "medium"  # a tier of the AI profiles: "easy", "medium", "hard", ...
+    variant: Optional[str] = None  # "freestyle", "standard", "renju" (default GAME_VARIANT)
 
 class GameResponse(BaseModel):
     id: str
@@ -56,15 +57,23 @@ async def create_game(request: CreateGameRequest, current_user: UserPublic = Dep
                 detail=f"Invalid game mode. Must be one of: {valid_modes}"
             )
         
-        # Validar dificuldade para jogos PvE
+        # Validar dificuldade para jogos PvE (tiers carregados em ai_profiles)
         if request.mode == "pve":
-            valid_difficulties = ["easy", "medium", "hard"]
+            valid_difficulties = sorted(ai_service.profiles)
             if request.difficulty not in valid_difficulties:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Invalid difficulty. Must be one of: {valid_difficulties}"
                 )
         
+        # Validar variante de regras (tamanho do tabuleiro vem de BOARD_SIZE)
+        if request.variant is not None and request.variant not in VARIANTS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid variant. Must be one of: {list(VARIANTS)}"
+            )
+        rules = get_rules(variant=request.variant)
+
         games_collection = await get_collection("games")
         print(f"✅ Got games collection")
         
@@ -76,7 +85,8 @@ async def create_game(request: CreateGameRequest, current_user: UserPublic = Dep
             "mode": request.mode,
             "difficulty": request.difficulty,
             "status": initial_status,
-            "board": [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)],
+            "board": rules.empty_rows(),
+            "variant": rules.variant,
             "current_player": "black",
             "players": {
                 "black": {
@@ -234,6 +244,87 @@ async def get_game(game_id: str, current_user: UserPublic = Depends(get_current_
             detail="Failed to retrieve game"
         )
 
+@router.get("/{game_id}/analysis")
+async def get_game_analysis(
+    game_id: str,
+    response: Response,
+    current_user: UserPublic = Depends(get_current_user)
+):
+    """Move-by-move analysis of a finished game.
+
+    Analyses are computed in the background: the first request queues the
+    game and answers 202 with the job status; once done, the stored
+    annotation is returned.
+    """
+    analysis = await analysis_service.get_analysis(game_id)
+    if analysis is not None:
+        return to_jsonable(analysis)
+
+    games_collection = await get_collection("games")
+    try:
+        oid = ObjectId(game_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game not found"
+        )
+    game = await games_collection.find_one({"_id": oid}, {"status": 1})
+    if not game:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game not found"
+        )
+    if game.get("status") != "finished":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Only finished games can be analysed"
+        )
+
+    job = await analysis_service.enqueue(game_id)
+    response.status_code = status.HTTP_202_ACCEPTED
+    return {"game_id": game_id, "status": job["status"], "attempts": job.get("attempts", 0)}
+
+@router.get("/{game_id}/threats")
+async def get_game_threats(
+    game_id: str,
+    hint: bool = False,
+    current_user: UserPublic = Depends(get_current_user)
+):
+    """Open threes, fours, winning and must-block cells of both colors.
+
+    Anyone may watch the threats of a game; ``hint=true`` also asks the
+    engine for a move, which only the player to move may do, a limited
+    number of times per game.
+    """
+    games_collection = await get_collection("games")
+    try:
+        oid = ObjectId(game_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game not found"
+        )
+    game = await games_collection.find_one({"_id": oid})
+    if not game:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game not found"
+        )
+
+    hint_for = None
+    if hint:
+        players = game.get("players") or {}
+        hint_for = next(
+            (color for color in ("black", "white") if (players.get(color) or {}).get("id") == current_user.id),
+            None
+        )
+        if hint_for is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only players can ask for hints"
+            )
+    return await threats_message(game_id, game, hint_for)
+
 @router.post("/{game_id}/move")
 async def make_move(
     game_id: str, 
@@ -264,32 +355,50 @@ async def make_move(
         # This is a simplified version - you'd want more comprehensive game logic
         
         board = game["board"]
+        rules = rules_for(game)
+        if not rules.in_bounds(move.row, move.col):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Position out of bounds"
+            )
         if board[move.row][move.col] is not None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Position already occupied"
             )
         
-        # Update board
         current_player = game["current_player"]
+        state = rules.board_from_rows(board)
+        index = state.index(move.row, move.col)
+        forbidden = rules.forbidden(state, index, COLOR_CODES[current_player])
+        if forbidden:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Forbidden move: {forbidden}"
+            )
+
+        # Update board
         board[move.row][move.col] = current_player
+        state.place(index, COLOR_CODES[current_player])
+        winner = current_player if state.is_five_at(index, COLOR_CODES[current_player]) else None
         
         # Switch player
         next_player = "white" if current_player == "black" else "black"
         
         # Update game
+        update = {
+            "board": board,
+            "current_player": next_player,
+            "updated_at": datetime.utcnow()
+        }
+        if winner:
+            update.update({"status": "finished", "winner": winner})
         await games_collection.update_one(
             {"_id": ObjectId(game_id)},
-            {
-                "$set": {
-                    "board": board,
-                    "current_player": next_player,
-                    "updated_at": datetime.utcnow()
-                }
-            }
+            {"$set": update}
         )
         
-        return {"success": True, "current_player": next_player}
+        return {"success": True, "current_player": next_player, "winner": winner}
         
     except HTTPException:
         raise
@@ -342,4 +451,5 @@ async def leave_game(game_id: str, current_user: UserPublic = Depends(get_curren
     # In a real scenario, you might want to handle this differently,
     # e.g., mark the game as abandoned, declare the other player the winner, etc.
     # For now, we'll just acknowledge the request.
+    ai_service.cancel_game(game_id)
     return {"success": True, "message": "You have left the game."}
\ No newline at end of file
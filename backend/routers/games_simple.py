@@ -7,6 +7,8 @@ from pydantic import BaseModel
 from routers.auth import get_current_user
 from database import get_collection
 from models.user import UserPublic
+from logic.board import COLOR_CODES
+from logic.rules import get_rules, rules_for
 
 router = APIRouter()
 
@@ -29,13 +31,15 @@ async def create_game(request: CreateGameRequest, current_user: UserPublic = Dep
     """Create a new game with specified mode and difficulty"""
     try:
         games_collection = await get_collection("games")
+        rules = get_rules()
         
         # Create game document
         game_doc = {
             "mode": request.mode,
             "difficulty": request.difficulty,
             "status": "waiting",
-            "board": [[None for _ in range(19)] for _ in range(19)],
+            "board": rules.empty_rows(),
+            "variant": rules.variant,
             "current_player": "black",
             "players": {
                 "black": {
@@ -159,14 +163,28 @@ async def make_move(
         # This is a simplified version - you'd want more comprehensive game logic
         
         board = game["board"]
+        rules = rules_for(game)
+        if not rules.in_bounds(move.row, move.col):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Position out of bounds"
+            )
         if board[move.row][move.col] is not None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Position already occupied"
             )
         
-        # Update board
         current_player = game["current_player"]
+        state = rules.board_from_rows(board)
+        forbidden = rules.forbidden(state, state.index(move.row, move.col), COLOR_CODES[current_player])
+        if forbidden:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Forbidden move: {forbidden}"
+            )
+
+        # Update board
         board[move.row][move.col] = current_player
         
         # Switch player
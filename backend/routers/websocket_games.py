@@ -1,15 +1,34 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
+import asyncio
 import json
+import logging
+import os
+import time
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 import copy
+from collections import OrderedDict
 from database import get_collection
 from models.user import UserPublic
-from logic.game_logic import check_win
-import os
-
-BOARD_SIZE = int(os.getenv('BOARD_SIZE', '15'))
+from logic.board import Board, COLOR_CODES
+from logic.rules import get_rules, rules_for
+from logic.runs import RunTracker
+from logic.threat_map import ThreatMap
+from services.ai_service import ai_service, AIMoveCancelled, AIMoveTimeout, AIServiceBusy
+
+logger = logging.getLogger(__name__)
+
+# Engine hints each player may ask for in one game, and the tier computing them
+HINTS_PER_GAME = int(os.getenv("HINTS_PER_GAME", "3"))
+HINT_DIFFICULTY = os.getenv("HINT_DIFFICULTY", "hard")
+# PvE: retries of an AI reply the service turned down (busy or timed out),
+# and the wait before the first one (doubled for each further retry)
+AI_REPLY_RETRIES = int(os.getenv("AI_REPLY_RETRIES", "3"))
+AI_REPLY_RETRY_DELAY = float(os.getenv("AI_REPLY_RETRY_DELAY", "0.5"))
+# Tracked boards kept in memory; the least recently used go first
+MAX_TRACKED_BOARDS = int(os.getenv("MAX_TRACKED_BOARDS", "1024"))
 
 router = APIRouter()
 
@@ -20,6 +39,13 @@ class GameConnectionManager:
         self.active_connections: List[WebSocket] = []
         self.online_players: Dict[str, dict] = {}
         self.waiting_queue: List[str] = []
+        # Per game, a board kept in step with the moves; its run-length
+        # tracker makes each move's win check a lookup
+        self.boards: "OrderedDict[str, Board]" = OrderedDict()
+        # PvE: the AI reply being computed for each game
+        self.ai_tasks: Dict[str, asyncio.Task] = {}
+        # PvE games whose AI reply gave up; the next message restarts it
+        self.ai_stalled: Set[str] = set()
 
     async def connect_to_lobby(self, websocket: WebSocket, user_id: str, user_public: dict):
         self.active_connections.append(websocket)
@@ -112,6 +138,38 @@ class GameConnectionManager:
             
             if not self.game_rooms[game_id]:
                 del self.game_rooms[game_id]
+                self.boards.pop(game_id, None)
+
+    def board_state(self, game_id: str, game: dict) -> Board:
+        """Tracked board of ``game``, reused while it matches the stored moves.
+
+        Only active games are kept; a finished or abandoned game gets a
+        board that lives as long as the request.
+        """
+        board = self.boards.get(game_id)
+        if board is None or board.move_count != len(game.get("moves") or []):
+            rules = rules_for(game)
+            board = rules.attach(Board.from_document(game, rules.size))
+            RunTracker(board).attach()
+            if game.get("status") != "active":
+                self.boards.pop(game_id, None)
+                return board
+            self.boards[game_id] = board
+            while len(self.boards) > MAX_TRACKED_BOARDS:
+                self.boards.popitem(last=False)
+        elif game.get("status") != "active":
+            self.boards.pop(game_id, None)
+        else:
+            self.boards.move_to_end(game_id)
+        return board
+
+    def threat_map(self, game_id: str, game: dict) -> ThreatMap:
+        """Threats of ``game``, tracked on its board from the first request on"""
+        board = self.board_state(game_id, game)
+        for tracker in board.trackers:
+            if isinstance(tracker, ThreatMap):
+                return tracker
+        return ThreatMap(board).attach()
 
     def _remove_connection(self, websocket: WebSocket):
         try:
@@ -221,6 +279,187 @@ class GameConnectionManager:
 
 game_manager = GameConnectionManager()
 
+
+def ai_color(game: dict) -> Optional[str]:
+    """Color played by the server AI in ``game`` (None outside PvE); the AI plays white"""
+    if game.get("mode") == "pve" and (game.get("players", {}).get("white") or {}).get("id") == "ai":
+        return "white"
+    return None
+
+
+def request_ai_reply(game_id: str, game: dict, state: Board) -> None:
+    """Compute and push the AI reply of a PvE game without blocking the socket loop"""
+    if game_id in game_manager.ai_tasks:
+        return
+    game_manager.ai_stalled.discard(game_id)
+    task = asyncio.ensure_future(run_ai_reply(game_id, game, state))
+    game_manager.ai_tasks[game_id] = task
+    task.add_done_callback(lambda done: game_manager.ai_tasks.pop(game_id, None))
+
+
+def resume_ai_reply(game_id: str, game: dict) -> bool:
+    """Restart the AI reply of a PvE game left on the AI's turn.
+
+    That happens when a reply gave up or failed, or when the server
+    restarted while it was being computed; it is called on (re)connection
+    and on the game's messages.
+    """
+    game_manager.ai_stalled.discard(game_id)
+    color = ai_color(game)
+    if color is None or game.get("status") != "active" or game.get("current_player") != color:
+        return False
+    if game_id in game_manager.ai_tasks:
+        return False
+    request_ai_reply(game_id, game, game_manager.board_state(game_id, game))
+    return True
+
+
+async def run_ai_reply(game_id: str, game: dict, state: Board) -> None:
+    """``play_ai_reply``, retried while the service is busy or times out.
+
+    A reply that still fails is reported to the players and left for
+    ``resume_ai_reply``, so the game never waits on a move nobody computes.
+    """
+    delay = AI_REPLY_RETRY_DELAY
+    for attempt in range(AI_REPLY_RETRIES + 1):
+        try:
+            await play_ai_reply(game_id, game, state)
+            return
+        except AIMoveCancelled:
+            return
+        except (AIServiceBusy, AIMoveTimeout) as error:
+            if attempt < AI_REPLY_RETRIES:
+                logger.info("AI reply for game %s failed (%s), retrying in %.1fs", game_id, error, delay)
+                await asyncio.sleep(delay)
+                delay *= 2
+                continue
+            logger.warning("AI reply for game %s failed after %d attempts: %s", game_id, attempt + 1, error)
+            message = str(error)
+        except Exception:
+            logger.exception("AI reply for game %s failed", game_id)
+            message = "AI move failed"
+        break
+    game_manager.ai_stalled.add(game_id)
+    await game_manager.send_game_event(game_id, "ai_error", {"message": message})
+
+
+async def play_ai_reply(game_id: str, game: dict, state: Board) -> None:
+    """Ask the AI service for the move, store it and broadcast it with its timing.
+
+    Errors of the service (busy, timed out, cancelled) are raised to the
+    caller, ``run_ai_reply``.
+    """
+    color = ai_color(game)
+    difficulty = game.get("difficulty") or "medium"
+    code = COLOR_CODES[color]
+    requested = time.perf_counter()
+    # The service pickles the board later, on another thread: send a snapshot
+    ai_move = await ai_service.get_move(state.copy(), difficulty, game_id=game_id)
+
+    row, col = ai_move.position.row, ai_move.position.col
+    index = state.index(row, col)
+    if not state.is_empty(index):
+        # The cached board is out of step with the game: rebuild it on the retry
+        game_manager.boards.pop(game_id, None)
+        raise RuntimeError(f"AI returned occupied cell ({row}, {col})")
+
+    state.place(index, code)
+    rows = state.to_rows()
+    next_player = "white" if color == "black" else "black"
+    won = state.is_five_at(index, code)
+    update = {"board": rows, "current_player": next_player, "updated_at": datetime.utcnow()}
+    if won or state.is_full():
+        update.update({"status": "finished", "winner": color if won else None})
+    games_collection = await get_collection("games")
+    await games_collection.update_one(
+        {"_id": ObjectId(game_id)},
+        {
+            "$set": update,
+            "$push": {
+                "moves": {
+                    "row": row,
+                    "col": col,
+                    "player": color,
+                    "timestamp": datetime.utcnow()
+                }
+            }
+        }
+    )
+
+    timing = ai_move.to_dict()
+    del timing["row"], timing["col"]
+    timing["total_ms"] = round((time.perf_counter() - requested) * 1000, 2)
+    await game_manager.broadcast_to_game(game_id, {
+        "type": "ai_move",
+        "game_id": game_id,
+        "move": {"row": row, "col": col, "player": color, "next_player": next_player},
+        "timing": timing,
+        "timestamp": datetime.utcnow().isoformat()
+    })
+
+    if "status" in update:
+        ai_service.cancel_game(game_id)
+        game_manager.boards.pop(game_id, None)
+        await game_manager.send_game_event(game_id, "game_end", {
+            "winner": update["winner"],
+            "winning_player_id": "ai" if won else None,
+            "message": "AI wins!" if won else "It's a draw!"
+        })
+    else:
+        # Search the human's likely replies while they think
+        ai_service.start_pondering(game_id, state, difficulty)
+
+
+async def request_hint(game_id: str, game: dict, color: str) -> dict:
+    """Suggested move for ``color``, counted against its hints for the game"""
+    if game.get("status") != "active" or game.get("current_player") != color:
+        return {"error": "Hints are only given on your turn"}
+    games_collection = await get_collection("games")
+    field = f"hints.{color}"
+    # Counted atomically, so parallel requests cannot exceed the cap
+    counted = await games_collection.find_one_and_update(
+        {"_id": ObjectId(game_id), field: {"$not": {"$gte": HINTS_PER_GAME}}},
+        {"$inc": {field: 1}},
+        projection={"hints": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if counted is None:
+        return {"error": "Hint limit reached", "hints_left": 0}
+    hints_left = HINTS_PER_GAME - counted["hints"][color]
+
+    state = game_manager.board_state(game_id, game)
+    code = COLOR_CODES[color]
+    winning = game_manager.threat_map(game_id, game).winning_cells(code)
+    if winning:
+        # A win on the board needs no search
+        row, col = state.coords((winning & -winning).bit_length() - 1)
+        return {"row": row, "col": col, "hints_left": hints_left, "timing": None}
+    try:
+        hint = await ai_service.get_move(state.copy(), HINT_DIFFICULTY, color=code)
+    except (AIServiceBusy, AIMoveTimeout) as error:
+        # Not the player's fault: give the hint back
+        await games_collection.update_one({"_id": ObjectId(game_id)}, {"$inc": {field: -1}})
+        return {"error": str(error), "hints_left": hints_left + 1}
+    timing = hint.to_dict()
+    del timing["row"], timing["col"]
+    return {"row": hint.position.row, "col": hint.position.col, "hints_left": hints_left, "timing": timing}
+
+
+async def threats_message(game_id: str, game: dict, hint_for: Optional[str] = None) -> dict:
+    """Current threats of both colors, plus a hint for ``hint_for`` when asked"""
+    threats = game_manager.threat_map(game_id, game)
+    message = {
+        "type": "threats",
+        "game_id": game_id,
+        "move_count": threats.board.move_count,
+        "current_player": game.get("current_player"),
+        "threats": threats.to_dict(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    if hint_for is not None:
+        message["hint"] = await request_hint(game_id, game, hint_for)
+    return message
+
 async def get_user_from_token(token: str) -> Optional[UserPublic]:
     try:
         from routers.auth import SECRET_KEY, ALGORITHM
@@ -336,10 +575,12 @@ async def websocket_lobby_token_endpoint(websocket: WebSocket):
                         if p1 and p2:
                             games_collection = await get_collection("games")
                             now = datetime.utcnow()
+                            rules = get_rules()
                             game_doc = {
                                 "mode": "pvp-online",
                                 "status": "active",
-                                "board": [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)],
+                                "board": rules.empty_rows(),
+                                "variant": rules.variant,
                                 "current_player": "black",
                                 "players": {
                                     "black": {
@@ -497,12 +738,19 @@ async def websocket_game_endpoint(
                     move["timestamp"] = move["timestamp"].isoformat()
         
         await game_manager.send_game_state(game_id, game)
+        # A reply lost to a restart or a failure is computed again
+        resume_ai_reply(game_id, game)
         
         while True:
             data = await websocket.receive_text()
             message_data = json.loads(data)
             
             message_type = message_data.get("type")
+
+            if game_id in game_manager.ai_stalled:
+                stalled_game = await games_collection.find_one({"_id": ObjectId(game_id)})
+                if stalled_game:
+                    resume_ai_reply(game_id, stalled_game)
             
             if message_type == "move":
                 row = message_data.get("row")
@@ -536,13 +784,26 @@ async def websocket_game_endpoint(
                         player_color = "white"
                     
                     if current_game.get("current_player") != player_color:
+                        resume_ai_reply(game_id, current_game)
                         await websocket.send_text(json.dumps({
                             "type": "error",
                             "message": "Not your turn"
                         }))
                         continue
                     
+                    state = game_manager.board_state(game_id, current_game)
+                    index = state.index(row, col)
+                    forbidden = state.rules.forbidden(state, index, COLOR_CODES[player_color]) if state.rules else None
+                    if forbidden:
+                        await websocket.send_text(json.dumps({
+                            "type": "error",
+                            "message": "Forbidden move",
+                            "reason": forbidden
+                        }))
+                        continue
+
                     board[row][col] = player_color
+                    state.place(index, COLOR_CODES[player_color])
                     next_player = "white" if player_color == "black" else "black"
                     
                     await games_collection.update_one(
@@ -572,11 +833,13 @@ async def websocket_game_endpoint(
                     }
                     await game_manager.send_game_move(game_id, move_data, user.id)
                     
-                    if check_win(board, row, col):
+                    if state.is_five_at(index, COLOR_CODES[player_color]):
                         await games_collection.update_one(
                             {"_id": ObjectId(game_id)},
                             {"$set": {"status": "finished", "winner": player_color}}
                         )
+                        ai_service.cancel_game(game_id)
+                        game_manager.boards.pop(game_id, None)
                         win_data = {
                             "winner": player_color,
                             "winning_player_id": user.id,
@@ -631,6 +894,9 @@ async def websocket_game_endpoint(
                                         move["timestamp"] = move["timestamp"].isoformat()
                             
                             await game_manager.send_game_state(game_id, updated_game)
+
+                        if ai_color(current_game) == next_player:
+                            request_ai_reply(game_id, current_game, state)
                     
                 else:
                     await websocket.send_text(json.dumps({
@@ -638,6 +904,24 @@ async def websocket_game_endpoint(
                         "message": "Invalid move position"
                     }))
             
+            elif message_type == "threats":
+                current_game = await games_collection.find_one({"_id": ObjectId(game_id)})
+                if not current_game:
+                    await websocket.send_text(json.dumps({
+                        "type": "error",
+                        "message": "Game not found"
+                    }))
+                    continue
+                hint_for = None
+                if message_data.get("hint"):
+                    players = current_game.get("players", {})
+                    hint_for = next(
+                        (color for color in ("black", "white") if (players.get(color) or {}).get("id") == user.id),
+                        None
+                    )
+                message = await threats_message(game_id, current_game, hint_for)
+                await websocket.send_text(json.dumps(message))
+
             elif message_type == "chat":
                 chat_data = {
                     "user_id": user.id,
@@ -655,6 +939,7 @@ async def websocket_game_endpoint(
     
     except WebSocketDisconnect:
         game_manager.disconnect_from_game(websocket, game_id, user.id)
+        ai_service.stop_pondering(game_id)
         
         disconnect_data = {
             "user_id": user.id,
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Arena de autojogo: IA contra IA, para medir força e velocidade
+
+    python run_arena.py hard medium --games 40 --workers 4
+    python run_arena.py hard "hard:engine=mcts,time_limit=0.2" --out results/mcts.json
+    python run_arena.py hard "hard:max_depth=6" --out new.json --baseline old.json
+"""
+import argparse
+import json
+import os
+
+from dotenv import load_dotenv
+
+from services.arena import compare, run_arena
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play AI against AI and report strength and speed")
+    parser.add_argument("first", help='difficulty, optionally with overrides: "hard:time_limit=0.1"')
+    parser.add_argument("second")
+    parser.add_argument("--games", type=int, default=20, help="games played (in color-swapped pairs)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="games played at once")
+    parser.add_argument("--size", type=int, default=None, help="board size (default BOARD_SIZE)")
+    parser.add_argument("--variant", default=None, help="freestyle, standard or renju (default GAME_VARIANT)")
+    parser.add_argument("--opening-plies", type=int, default=2, help="random moves opening every pair")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true", help="trace peak memory per game (slower)")
+    parser.add_argument("--out", default=None, help="write the JSON report here")
+    parser.add_argument("--baseline", default=None, help="earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    report = run_arena(args.first, args.second, games=args.games, workers=args.workers, size=args.size,
+                       variant=args.variant, opening_plies=args.opening_plies, seed=args.seed,
+                       memory=args.memory)
+    summary = report["summary"]
+    print(f"🏁 {args.first} vs {args.second}: +{summary['wins']} ={summary['draws']} -{summary['losses']} "
+          f"score {summary['score']:.3f} {summary['score_ci95']} Elo {summary['elo']} "
+          f"({report['elapsed_s']}s)")
+    for name, stats in summary["contenders"].items():
+        print(f"   {name}: {stats['nodes_per_second']} nodes/s, avg {stats['avg_latency_ms']} ms, "
+              f"p99 {stats['p99_latency_ms']} ms")
+    if summary["avg_memory_per_game_kb"] is not None:
+        print(f"   memory: {summary['avg_memory_per_game_kb']} KB per game")
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"✅ Report written to {args.out}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            print(json.dumps(compare(json.load(handle), report), indent=2))
+
+
+if __name__ == "__main__":
+    main()
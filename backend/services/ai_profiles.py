@@ -0,0 +1,168 @@
+"""Difficulty profiles: what the AI may spend on a move, per tier.
+
+A difficulty is not a code path but a budget for the same pipeline
+(opening book -> threat solver -> engine):
+
+    engine             "heuristic" (one-ply pattern scorer, batched with
+                       NumPy), "search" (alpha-beta) or "mcts"
+    max_depth          alpha-beta depth limit
+    time_limit         engine seconds per move
+    node_limit         alpha-beta node budget (None: unlimited)
+    playouts           MCTS playout budget (None: time only)
+    noise              probability of playing a random nearby move instead
+    book               consult the opening book
+    threat_solver      run the VCF/VCT solver before the engine
+    threat_time_limit  solver seconds per move
+
+The built-in tiers below read the historical ``AI_*`` variables; a JSON
+file named by ``AI_PROFILES_FILE`` overrides fields of existing tiers or
+adds new ones, e.g. ``{"hard": {"time_limit": 0.5}, "expert": {...}}``.
+
+``with_budget`` and ``scaled`` derive cheaper copies, which is how the AI
+service caps a move's CPU and sheds depth and time under load.
+"""
+import json
+import logging
+import math
+import os
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("heuristic", "search", "mcts")
+
+_FIELDS = ("engine", "max_depth", "time_limit", "node_limit", "playouts", "noise",
+           "book", "threat_solver", "threat_time_limit")
+
+
+class DifficultyProfile:
+    """Budget and features of one difficulty tier"""
+
+    __slots__ = ("name",) + _FIELDS
+
+    def __init__(self, name: str, engine: str = "heuristic", max_depth: int = 8,
+                 time_limit: float = 0.3, node_limit: Optional[int] = None,
+                 playouts: Optional[int] = None, noise: float = 0.0, book: bool = False,
+                 threat_solver: bool = False, threat_time_limit: float = 0.1):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown AI engine for '{name}': {engine}")
+        if not 0.0 <= noise <= 1.0:
+            raise ValueError(f"Noise of '{name}' must be between 0 and 1")
+        self.name = name
+        self.engine = engine
+        self.max_depth = max(1, int(max_depth))
+        self.time_limit = float(time_limit)
+        self.node_limit = int(node_limit) if node_limit else None
+        self.playouts = int(playouts) if playouts else None
+        self.noise = float(noise)
+        self.book = bool(book)
+        self.threat_solver = bool(threat_solver)
+        self.threat_time_limit = float(threat_time_limit)
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> "DifficultyProfile":
+        unknown = set(data) - set(_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields in profile '{name}': {', '.join(sorted(unknown))}")
+        return cls(name, **data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in ("name",) + _FIELDS}
+
+    def replace(self, **changes: Any) -> "DifficultyProfile":
+        data = self.to_dict()
+        data.update(changes)
+        return DifficultyProfile(**data)
+
+    @property
+    def move_budget(self) -> float:
+        """Worst-case seconds of one move (solver plus engine)"""
+        if self.engine == "heuristic":
+            return 0.0
+        return self.time_limit + (self.threat_time_limit if self.threat_solver else 0.0)
+
+    def with_budget(self, budget: Optional[float]) -> "DifficultyProfile":
+        """Copy whose solver and engine fit in ``budget`` seconds (never more than the tier's own)"""
+        if not budget or self.engine == "heuristic" or budget >= self.move_budget:
+            return self
+        threat = min(self.threat_time_limit, budget / 4) if self.threat_solver else self.threat_time_limit
+        engine_time = budget - threat if self.threat_solver else budget
+        return self.replace(time_limit=engine_time, threat_time_limit=threat)
+
+    def scaled(self, factor: float) -> "DifficultyProfile":
+        """Copy with budgets multiplied by ``factor`` (< 1) and one ply less per halving"""
+        if factor >= 1.0 or self.engine == "heuristic":
+            return self
+        shed = int(round(-math.log2(max(factor, 1e-3))))
+        return self.replace(
+            max_depth=max(1, self.max_depth - shed),
+            time_limit=self.time_limit * factor,
+            node_limit=max(1, int(self.node_limit * factor)) if self.node_limit else None,
+            playouts=max(1, int(self.playouts * factor)) if self.playouts else None,
+            threat_time_limit=self.threat_time_limit * factor,
+        )
+
+    def __repr__(self) -> str:
+        return f"DifficultyProfile({self.name!r}, engine={self.engine!r})"
+
+
+def _flag(name: str, default: str = "1") -> bool:
+    return os.getenv(name, default) != "0"
+
+
+def default_profiles() -> Dict[str, Dict[str, Any]]:
+    """Built-in tiers; the hard tier keeps its ``AI_HARD_*`` environment knobs"""
+    hard_time = float(os.getenv("AI_HARD_TIME_LIMIT", "0.3"))
+    threat_time = float(os.getenv("AI_THREAT_TIME_LIMIT", "0.1"))
+    return {
+        # Random nearby moves
+        "easy": {"engine": "heuristic", "noise": 1.0},
+        # Best one-ply move by pattern score
+        "medium": {"engine": "heuristic"},
+        "hard": {
+            "engine": "mcts" if os.getenv("AI_HARD_BACKEND", "search") == "mcts" else "search",
+            "max_depth": int(os.getenv("AI_HARD_MAX_DEPTH", "8")),
+            "time_limit": hard_time,
+            "node_limit": int(os.getenv("AI_HARD_NODE_LIMIT", "0")) or None,
+            "playouts": int(os.getenv("AI_MCTS_PLAYOUTS", "0")) or None,
+            "book": _flag("AI_OPENING_BOOK"),
+            "threat_solver": _flag("AI_THREAT_SOLVER"),
+            "threat_time_limit": threat_time,
+        },
+        # Same pipeline with Monte Carlo tree search as the engine
+        "mcts": {
+            "engine": "mcts",
+            "time_limit": hard_time,
+            "playouts": int(os.getenv("AI_MCTS_PLAYOUTS", "0")) or None,
+            "book": _flag("AI_OPENING_BOOK"),
+            "threat_solver": _flag("AI_THREAT_SOLVER"),
+            "threat_time_limit": threat_time,
+        },
+    }
+
+
+# Parsed profile files by path, with the mtime they were read at
+_file_cache: Dict[str, Tuple[float, Dict[str, Dict[str, Any]]]] = {}
+
+
+def _read_overrides(path: str) -> Dict[str, Dict[str, Any]]:
+    """Contents of a profile file, parsed again only when it changes"""
+    mtime = os.path.getmtime(path)
+    cached = _file_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, encoding="utf-8") as handle:
+        overrides = json.load(handle)
+    _file_cache[path] = (mtime, overrides)
+    logger.info("AI difficulty profiles loaded from %s", path)
+    return overrides
+
+
+def load_profiles(path: Optional[str] = None) -> Dict[str, DifficultyProfile]:
+    """Built-in tiers merged with the JSON file at ``path`` / ``AI_PROFILES_FILE``"""
+    tiers = default_profiles()
+    path = path or os.getenv("AI_PROFILES_FILE")
+    if path:
+        for name, fields in _read_overrides(path).items():
+            tiers.setdefault(name, {}).update(fields)
+    return {name: DifficultyProfile.from_dict(name, fields) for name, fields in tiers.items()}
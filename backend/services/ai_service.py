@@ -0,0 +1,579 @@
+"""Off-event-loop execution of AI moves.
+
+``GameLogic.get_ai_move`` is synchronous and, on hard mode, CPU-bound for
+hundreds of milliseconds. Called from a request handler it would stall
+every websocket and HTTP request served by the same event loop, so moves
+are computed in a ``ProcessPoolExecutor`` behind an async facade:
+
+    move = await ai_service.get_move(board, "hard", budget=0.5, game_id=game_id)
+
+The service bounds the number of outstanding requests, enforces a
+per-request deadline, lets a finished game cancel its pending requests and
+keeps queue-wait and compute-time metrics. Easy and medium requests that
+arrive within a few milliseconds of each other are sent to one worker as
+a batch (scored as one stacked NumPy array), which amortises the IPC and
+the per-call overhead at peak load.
+
+While the human is thinking, the service ponders: the AI replies to the
+most likely human moves are computed ahead and kept per game, keyed by
+the Zobrist key of the resulting position, so the real request is often
+served from that cache or joins a search already under way. Pondering
+runs on its own pool of lower-priority processes, at most one job per
+process, so a real move never waits behind ponder work.
+
+Each request runs with the budget of its difficulty profile (see
+``services.ai_profiles``), lowered to the caller's ``budget`` if given.
+When the queue backs up beyond ``AI_SHED_QUEUE`` requests per worker,
+search budgets and depth are scaled down in proportion so the backlog
+drains instead of growing.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from logic.board import Board, BLACK, WHITE, iter_bits
+from logic.patterns import PatternEvaluator, pattern_table
+from logic.rules import Rules, get_rules
+from logic.symmetry import restore_cell, transform_cell
+from models.game import Position
+from services.game_logic import GameLogic, BoardLike
+from services.ai_profiles import DifficultyProfile, load_profiles
+
+logger = logging.getLogger(__name__)
+
+# Samples kept for the latency percentiles
+_SAMPLES = 1000
+
+
+class AIServiceBusy(Exception):
+    """Raised when the request queue is full"""
+
+
+class AIMoveTimeout(Exception):
+    """Raised when a move is not ready before its deadline"""
+
+
+class AIMoveCancelled(Exception):
+    """Raised when the game ended while its move was pending"""
+
+
+class AIMove:
+    """A computed AI move and how long it waited and ran"""
+
+    __slots__ = ("position", "difficulty", "queue_time", "compute_time", "depth", "nodes", "pondered")
+
+    def __init__(self, position: Position, difficulty: str, queue_time: float = 0.0,
+                 compute_time: float = 0.0, depth: int = 0, nodes: int = 0,
+                 pondered: bool = False):
+        self.position = position
+        self.difficulty = difficulty
+        self.queue_time = queue_time
+        self.compute_time = compute_time
+        self.depth = depth
+        self.nodes = nodes
+        # Computed on the opponent's time
+        self.pondered = pondered
+
+    def to_dict(self) -> dict:
+        return {
+            "row": self.position.row,
+            "col": self.position.col,
+            "difficulty": self.difficulty,
+            "queue_ms": round(self.queue_time * 1000, 2),
+            "compute_ms": round(self.compute_time * 1000, 2),
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "pondered": self.pondered,
+        }
+
+
+# -- Worker process side ---------------------------------------------------
+_worker_logic: Optional[GameLogic] = None
+
+
+def _init_worker() -> None:
+    """Build the per-process engine and lookup tables before the first move"""
+    global _worker_logic
+    _worker_logic = GameLogic()
+    pattern_table()
+
+
+def _init_ponder_worker(nice: int) -> None:
+    """Pondering processes run below the move workers"""
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+    _init_worker()
+
+
+def _compute_batch(boards: List[Board], profile: DifficultyProfile,
+                   expires: List[float], color: int = WHITE) -> List[Optional[Dict[str, Any]]]:
+    """Run ``get_ai_cells`` in a worker; None for requests that expired in the queue"""
+    started = time.time()
+    live = [position for position, expiry in enumerate(expires) if not expiry or started < expiry]
+    results: List[Optional[Dict[str, Any]]] = [None] * len(boards)
+    if not live:
+        return results
+
+    logic = _worker_logic or GameLogic()
+    logic.last_search = None
+    # Plain cell indexes cross the process boundary; the Position is built by the caller
+    cells = logic.get_ai_cells([boards[position] for position in live], profile, color)
+    search = logic.last_search
+    finished = time.time()
+    for position, cell in zip(live, cells):
+        row, col = boards[position].coords(cell)
+        results[position] = {
+            "row": row,
+            "col": col,
+            "started": started,
+            "finished": finished,
+            "depth": search.depth if search else 0,
+            "nodes": search.nodes if search else 0,
+        }
+    return results
+
+
+def _likely_replies(board: Board, count: int) -> List[int]:
+    """The ``count`` human (black) moves the pattern evaluator rates highest"""
+    evaluator = PatternEvaluator(board)
+    cells = sorted(iter_bits(board.frontier), key=lambda cell: evaluator.move_score(cell, BLACK), reverse=True)
+    return cells[:count]
+
+
+# -- Event loop side -------------------------------------------------------
+def _rules(rows: BoardLike, rules: Optional[Rules]) -> Rules:
+    """``rules`` (the game's) for the size of the grid ``rows``"""
+    if rules is None:
+        return get_rules(len(rows))
+    return rules if rules.size == len(rows) else get_rules(len(rows), rules.variant)
+
+
+def _percentiles(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {"avg_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        "avg_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50_ms": round(ordered[last // 2] * 1000, 2),
+        "p95_ms": round(ordered[int(last * 0.95)] * 1000, 2),
+        "max_ms": round(ordered[last] * 1000, 2),
+    }
+
+
+class _Request:
+    """One pending ``get_move`` call"""
+
+    __slots__ = ("board", "difficulty", "budget", "expires", "submitted", "future", "job", "batch", "color")
+
+    def __init__(self, board: Board, difficulty: str, budget: Optional[float],
+                 expires: float, submitted: float, future: asyncio.Future, color: int = WHITE):
+        self.board = board
+        self.color = color
+        self.difficulty = difficulty
+        self.budget = budget
+        self.expires = expires
+        self.submitted = submitted
+        self.future = future
+        # Executor future of the batch this request was sent in, and the
+        # requests sharing it
+        self.job: Optional[asyncio.Future] = None
+        self.batch: List["_Request"] = []
+
+
+class _Ponder:
+    """Background search of one game while the human is thinking"""
+
+    __slots__ = ("difficulty", "budget", "task", "results", "running_key", "running_job")
+
+    def __init__(self, difficulty: str, budget: Optional[float]):
+        self.difficulty = difficulty
+        self.budget = budget
+        self.task: Optional[asyncio.Future] = None
+        # Worker results keyed by the canonical key of the position after the reply
+        self.results: Dict[int, Dict[str, Any]] = {}
+        self.running_key: Optional[int] = None
+        self.running_job: Optional[asyncio.Future] = None
+
+
+class AIService:
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 deadline: Optional[float] = None, batch_window: Optional[float] = None,
+                 max_batch: Optional[int] = None, ponder_moves: Optional[int] = None):
+        self.workers = workers or int(os.getenv("AI_WORKERS", "0")) or max(1, (os.cpu_count() or 2) - 1)
+        # Requests queued or running; beyond this new requests are rejected
+        self.max_queue = max_queue or int(os.getenv("AI_MAX_QUEUE", "64"))
+        # Seconds from submission until a request is given up on
+        self.deadline = deadline or float(os.getenv("AI_MOVE_DEADLINE", "5"))
+        # Cheap requests arriving within this window (the maximum latency
+        # batching may add) are sent to one worker together
+        if batch_window is None:
+            batch_window = float(os.getenv("AI_BATCH_WINDOW_MS", "3")) / 1000
+        self.batch_window = batch_window
+        self.max_batch = max_batch or int(os.getenv("AI_MAX_BATCH", "32"))
+        # Human replies searched ahead while waiting (0 disables pondering)
+        if ponder_moves is None:
+            ponder_moves = int(os.getenv("AI_PONDER_MOVES", "4"))
+        self.ponder_moves = ponder_moves
+        # Processes of the pondering pool, and how much lower their priority is
+        self.ponder_workers = int(os.getenv("AI_PONDER_WORKERS", "0")) or self.workers
+        self.ponder_nice = int(os.getenv("AI_PONDER_NICE", "5"))
+        self.profiles = load_profiles()
+        # Queued requests per worker beyond which budgets are scaled down,
+        # and the smallest fraction of its budget a move is left with
+        self.shed_queue = float(os.getenv("AI_SHED_QUEUE", "2"))
+        self.min_budget_factor = float(os.getenv("AI_MIN_BUDGET_FACTOR", "0.25"))
+        self._ponders: Dict[str, _Ponder] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._ponder_executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        # Jobs submitted to the pondering pool and not finished yet
+        self._ponder_jobs = 0
+        self._waiting: List[_Request] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._games: Dict[str, Set[_Request]] = {}
+        self._queue_waits: Deque[float] = deque(maxlen=_SAMPLES)
+        self._compute_times: Deque[float] = deque(maxlen=_SAMPLES)
+        self._batch_sizes: Deque[int] = deque(maxlen=_SAMPLES)
+        self.counters = {
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "cancelled": 0,
+            "failed": 0,
+            "batches": 0,
+            "ponder_jobs": 0,
+            "ponder_hits": 0,
+            "ponder_misses": 0,
+            "shed": 0,
+        }
+
+    def start(self) -> None:
+        if self._executor is None:
+            logger.info(f"Starting AI worker pool with {self.workers} processes")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+    def stop(self) -> None:
+        for game_id in list(self._ponders):
+            self.stop_pondering(game_id)
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for request in self._waiting:
+            request.future.cancel()
+        self._waiting = []
+        if self._executor is not None:
+            logger.info("Stopping AI worker pool...")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._ponder_executor is not None:
+            self._ponder_executor.shutdown(wait=False, cancel_futures=True)
+            self._ponder_executor = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def load_factor(self) -> float:
+        """Fraction of their budget moves get now: 1.0 unless the queue is backed up"""
+        backlog = self._pending / self.workers
+        if backlog <= self.shed_queue:
+            return 1.0
+        return max(self.min_budget_factor, self.shed_queue / backlog)
+
+    def _profile(self, difficulty: str, budget: Optional[float], shed: bool = True) -> DifficultyProfile:
+        """Profile a request runs with: its tier, capped by ``budget`` and by the load"""
+        profile = (self.profiles.get(difficulty) or self.profiles["medium"]).with_budget(budget)
+        factor = self.load_factor() if shed else 1.0
+        if factor < 1.0 and profile.engine != "heuristic":
+            self.counters["shed"] += 1
+            profile = profile.scaled(factor)
+        return profile
+
+    async def get_move(self, board: BoardLike, difficulty: str = "medium",
+                       budget: Optional[float] = None, game_id: Optional[str] = None,
+                       deadline: Optional[float] = None, color: int = WHITE,
+                       rules: Optional[Rules] = None) -> AIMove:
+        """Compute the move of ``color`` (the AI plays white) for ``board`` in the worker pool.
+
+        ``budget`` is the compute time in seconds given to the engine,
+        ``deadline`` the total time allowed including the queue wait.
+        A list-of-lists ``board`` is read under ``rules``, the game's own
+        rules (default: ``BOARD_SIZE``/``GAME_VARIANT``).
+        """
+        if self._pending >= self.max_queue:
+            self.counters["rejected"] += 1
+            raise AIServiceBusy(f"AI queue is full ({self.max_queue} pending)")
+        self.start()
+
+        bitboard = board if isinstance(board, Board) else _rules(board, rules).board_from_rows(board)
+        timeout = deadline or self.deadline
+        submitted = time.time()
+        loop = asyncio.get_running_loop()
+
+        # The human has moved: pondering is over, but its work may be reused
+        joined = None
+        ponder = self._ponders.get(game_id) if game_id is not None and color == WHITE else None
+        if ponder is not None:
+            same_search = ponder.difficulty == difficulty and ponder.budget == budget
+            if same_search and ponder.running_key == bitboard.key:
+                joined = ponder.running_job
+            self.stop_pondering(game_id, keep=joined)
+            key, sym = bitboard.canonical()
+            hit = ponder.results.get(key) if same_search else None
+            if hit is not None:
+                self.counters["ponder_hits"] += 1
+                self.counters["completed"] += 1
+                self._queue_waits.append(0.0)
+                self._compute_times.append(0.0)
+                row, col = bitboard.coords(restore_cell(hit["cell"], sym, bitboard.size))
+                return AIMove(Position(row=row, col=col), difficulty,
+                              depth=hit["depth"], nodes=hit["nodes"], pondered=True)
+            self.counters["ponder_hits" if joined is not None else "ponder_misses"] += 1
+
+        request = _Request(bitboard, difficulty, budget, submitted + timeout, submitted, loop.create_future(), color)
+        self._pending += 1
+        self.counters["submitted"] += 1
+        if game_id is not None:
+            self._games.setdefault(game_id, set()).add(request)
+        if joined is not None:
+            # Wait for the pondering search of this very position
+            request.job, request.batch = joined, [request]
+            joined.add_done_callback(lambda done: self._deliver([request], done))
+        else:
+            self._enqueue(request, loop)
+
+        cancelled = False
+        try:
+            result = await asyncio.wait_for(asyncio.shield(request.future), timeout)
+        except asyncio.TimeoutError:
+            self.counters["timed_out"] += 1
+            self._drop(request)
+            raise AIMoveTimeout(f"AI move not ready after {timeout:.2f}s")
+        except asyncio.CancelledError:
+            if not request.future.cancelled():
+                # The caller itself was cancelled
+                self._drop(request)
+                raise
+            cancelled = True
+        except Exception:
+            self.counters["failed"] += 1
+            raise
+        finally:
+            self._pending -= 1
+            if game_id is not None:
+                requests = self._games.get(game_id)
+                if requests is not None:
+                    requests.discard(request)
+                    if not requests:
+                        del self._games[game_id]
+        if cancelled:
+            self.counters["cancelled"] += 1
+            raise AIMoveCancelled(f"Game {game_id} ended")
+
+        if result is None:
+            self.counters["timed_out"] += 1
+            raise AIMoveTimeout("AI move expired while queued")
+
+        # A joined pondering search may have started before this request
+        started = max(result["started"], submitted)
+        queue_time = started - submitted
+        compute_time = result["finished"] - started
+        self._queue_waits.append(queue_time)
+        self._compute_times.append(compute_time)
+        self.counters["completed"] += 1
+        return AIMove(
+            Position(row=result["row"], col=result["col"]),
+            difficulty,
+            queue_time=queue_time,
+            compute_time=compute_time,
+            depth=result["depth"],
+            nodes=result["nodes"],
+            pondered=joined is not None,
+        )
+
+    def cancel_game(self, game_id: str) -> int:
+        """Cancel the pending requests of a finished game; returns how many.
+
+        Requests still queued never run; one already running finishes
+        within its budget and its result is dropped.
+        """
+        self.stop_pondering(game_id)
+        requests = self._games.pop(game_id, set())
+        for request in requests:
+            self._drop(request)
+        return len(requests)
+
+    # -- Pondering ---------------------------------------------------------
+    def start_pondering(self, game_id: str, board: BoardLike, difficulty: str = "hard",
+                        budget: Optional[float] = None, rules: Optional[Rules] = None) -> bool:
+        """Search the likely human replies to ``board`` (human to move) in the background.
+
+        Pondering does not start, and stops, while real requests keep
+        every worker busy or every pondering process is taken.
+        """
+        self.stop_pondering(game_id)
+        if not self.ponder_moves or not self._may_ponder():
+            return False
+        self.start()
+        if self._ponder_executor is None:
+            self._ponder_executor = ProcessPoolExecutor(
+                max_workers=self.ponder_workers, initializer=_init_ponder_worker, initargs=(self.ponder_nice,)
+            )
+        bitboard = board.copy() if isinstance(board, Board) else _rules(board, rules).board_from_rows(board)
+        ponder = _Ponder(difficulty, budget)
+        ponder.task = asyncio.ensure_future(self._ponder(bitboard, ponder))
+        self._ponders[game_id] = ponder
+        return True
+
+    def stop_pondering(self, game_id: str, keep: Optional[asyncio.Future] = None) -> None:
+        """Cancel a game's pondering (game over, disconnect or the human moved)"""
+        ponder = self._ponders.pop(game_id, None)
+        if ponder is None:
+            return
+        if ponder.task is not None:
+            ponder.task.cancel()
+        if ponder.running_job is not None and ponder.running_job is not keep:
+            ponder.running_job.cancel()
+
+    def is_pondering(self, game_id: str) -> bool:
+        ponder = self._ponders.get(game_id)
+        return ponder is not None and not ponder.task.done()
+
+    async def _ponder(self, board: Board, ponder: _Ponder) -> None:
+        try:
+            await self._ponder_replies(board, ponder)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Pondering failed: {e}")
+
+    def _may_ponder(self) -> bool:
+        """Whether a ponder job may start: no backlog of real requests, and a
+        pondering process free, so ponder jobs never queue"""
+        return self._pending < self.workers and self._ponder_jobs < self.ponder_workers
+
+    def _submit_ponder(self, loop: asyncio.AbstractEventLoop, *args: Any) -> asyncio.Future:
+        job = loop.run_in_executor(self._ponder_executor, *args)
+        self._ponder_jobs += 1
+
+        def finished(done: asyncio.Future) -> None:
+            self._ponder_jobs -= 1
+        job.add_done_callback(finished)
+        return job
+
+    async def _ponder_replies(self, board: Board, ponder: _Ponder) -> None:
+        loop = asyncio.get_running_loop()
+        if not self._may_ponder():
+            return
+        replies = await self._submit_ponder(loop, _likely_replies, board, self.ponder_moves)
+        for reply in replies:
+            if not self._may_ponder():
+                break  # real requests need the CPU, or the pool is taken
+            position = board.copy()
+            position.place(reply, BLACK)
+            if position.is_five_at(reply, BLACK):
+                continue
+            job = self._submit_ponder(
+                loop, _compute_batch, [position],
+                self._profile(ponder.difficulty, ponder.budget, shed=False), [0.0]
+            )
+            ponder.running_key, ponder.running_job = position.key, job
+            self.counters["ponder_jobs"] += 1
+            # Shielded: a request that joined this search keeps it alive
+            # even when pondering is cancelled
+            results = await asyncio.shield(job)
+            ponder.running_key = ponder.running_job = None
+            # Cached under the canonical key so a symmetric position hits too
+            key, sym = position.canonical()
+            result = results[0]
+            result["cell"] = transform_cell(position.index(result["row"], result["col"]), sym, position.size)
+            ponder.results[key] = result
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self._batch_sizes
+        return {
+            "workers": self.workers,
+            "ponder_workers": self.ponder_workers,
+            "ponder_running": self._ponder_jobs,
+            "pending": self._pending,
+            "max_queue": self.max_queue,
+            "batch_window_ms": round(self.batch_window * 1000, 2),
+            "load_factor": round(self.load_factor(), 3),
+            **self.counters,
+            "avg_batch_size": round(sum(batches) / len(batches), 2) if batches else 0.0,
+            "queue_wait": _percentiles(self._queue_waits),
+            "compute": _percentiles(self._compute_times),
+        }
+
+    # -- Batching ----------------------------------------------------------
+    def _enqueue(self, request: _Request, loop: asyncio.AbstractEventLoop) -> None:
+        tier = self.profiles.get(request.difficulty) or self.profiles["medium"]
+        if tier.engine != "heuristic" or not self.batch_window:
+            # Searches are long; batching them would only serialise them
+            self._submit([request], loop)
+            return
+        self._waiting.append(request)
+        if len(self._waiting) >= self.max_batch:
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush, loop)
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Send the requests collected during the window, one job per group"""
+        self._flush_handle = None
+        waiting, self._waiting = self._waiting, []
+        groups: Dict[tuple, List[_Request]] = {}
+        for request in waiting:
+            if not request.future.done():
+                key = (request.difficulty, request.budget, request.board.size, request.color)
+                groups.setdefault(key, []).append(request)
+        for requests in groups.values():
+            for start in range(0, len(requests), self.max_batch):
+                self._submit(requests[start:start + self.max_batch], loop)
+
+    def _submit(self, requests: List[_Request], loop: asyncio.AbstractEventLoop) -> None:
+        first = requests[0]
+        job = loop.run_in_executor(
+            self._executor, _compute_batch,
+            [request.board for request in requests], self._profile(first.difficulty, first.budget),
+            [request.expires for request in requests], first.color,
+        )
+        for request in requests:
+            request.job = job
+            request.batch = requests
+        self.counters["batches"] += 1
+        self._batch_sizes.append(len(requests))
+        job.add_done_callback(lambda done: self._deliver(requests, done))
+
+    @staticmethod
+    def _deliver(requests: List[_Request], job: asyncio.Future) -> None:
+        if job.cancelled():
+            for request in requests:
+                request.future.cancel()
+            return
+        error = job.exception()
+        for position, request in enumerate(requests):
+            if request.future.done():
+                continue
+            if error is not None:
+                request.future.set_exception(error)
+            else:
+                request.future.set_result(job.result()[position])
+
+    def _drop(self, request: _Request) -> None:
+        """Cancel one request, and its job once no request of the job is left"""
+        request.future.cancel()
+        if request in self._waiting:
+            self._waiting.remove(request)
+        job = request.job
+        if job is not None and not job.done() and all(other.future.done() for other in request.batch):
+            job.cancel()
+
+
+ai_service = AIService()
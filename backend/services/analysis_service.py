@@ -0,0 +1,416 @@
+"""Post-game analysis: every move of a finished game rated by the engine.
+
+Each ply is searched twice - once for the best move of the position, once
+for the reply to the move actually played - and the move is labelled by
+how much it gave away:
+
+    best         the engine's choice, or as good as it
+    good         lost less than ``ANALYSIS_GOOD_LOSS``
+    inaccuracy   lost less than ``ANALYSIS_BLUNDER_LOSS``
+    blunder      lost more, or turned a safe position into a forced loss
+    missed_win   a forced win (found by the engine or the VCF solver) was
+                 on the board and the move let it go
+
+That takes seconds per game, far too long for a request, so analyses run
+as jobs. Jobs live in the ``analysis_jobs`` collection - they survive
+restarts and are shared by every server process - and are claimed one at
+a time by ``ANALYSIS_WORKERS`` runners feeding a process pool of the same
+size, separate from (and niced below) the AI move pool. Runners also hold
+back while live moves keep every AI worker busy.
+
+Finished games are picked up from ``games`` by a periodic sweep, or on
+demand by ``enqueue``. The annotation of a game is stored once in the
+``analyses`` collection, keyed by game id, and the most recent ones are
+kept in memory, so showing an analysis again costs a dict lookup.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from database import get_collection
+from logic.board import COLOR_CODES, COLOR_NAMES, Board, opponent
+from logic.patterns import FORCED_WIN
+from logic.rules import get_rules
+from logic.search import SearchEngine, WIN_SCORE
+from logic.threats import ThreatSolver
+from logic.transposition import TranspositionTable
+from services.ai_service import ai_service
+
+logger = logging.getLogger(__name__)
+
+BEST = "best"
+GOOD = "good"
+INACCURACY = "inaccuracy"
+BLUNDER = "blunder"
+MISSED_WIN = "missed_win"
+LABELS = (BEST, GOOD, INACCURACY, BLUNDER, MISSED_WIN)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Scores beyond this are forced wins (or losses) seen by the search or
+# recognised by the evaluator
+_WINNING = FORCED_WIN // 2
+
+
+# -- Worker process side ---------------------------------------------------
+def _init_worker(nice: int) -> None:
+    """Run analyses below the AI move workers"""
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+
+
+def _label(loss: int, best_score: int, played_score: int, had_win: bool, good_loss: int,
+           blunder_loss: int) -> str:
+    if had_win and played_score < _WINNING:
+        return MISSED_WIN
+    if loss <= 0:
+        return BEST
+    if played_score <= -_WINNING < best_score:
+        return BLUNDER
+    if loss < good_loss:
+        return GOOD
+    if loss < blunder_loss:
+        return INACCURACY
+    return BLUNDER
+
+
+def _clamp(score: int) -> int:
+    return max(-WIN_SCORE, min(WIN_SCORE, score))
+
+
+def _evaluate(engine: SearchEngine, board: Board, color: int, forced: int = 8) -> Tuple[int, Optional[int], int, int]:
+    """``(score, move, depth, nodes)`` of the position with ``color`` to move.
+
+    Positions decided by a five on the board are scored directly, and a
+    forced block is played out: the search has nothing to compare on a
+    single-move root and scores it 0, which would hide exactly the moves
+    that decide the game.
+    """
+    wins = board.winning_cells(color)
+    if wins:
+        return WIN_SCORE, (wins & -wins).bit_length() - 1, 0, 0
+    threats = board.winning_cells(opponent(color))
+    block = (threats & -threats).bit_length() - 1
+    if threats & (threats - 1) or (threats and board.rules is not None
+                                   and board.rules.forbidden(board, block, color)):
+        # Two fives to stop, or the only block is forbidden: lost
+        return -WIN_SCORE, block, 0, 0
+    if threats and forced > 0 and engine.max_depth > 1:
+        # The block takes one ply of the search's horizon
+        board.place(block, color)
+        engine.max_depth -= 1
+        try:
+            score, _, depth, nodes = _evaluate(engine, board, opponent(color), forced - 1)
+        finally:
+            engine.max_depth += 1
+            board.remove(block)
+        return -score, block, depth + 1, nodes
+    result = engine.search(board, color)
+    return _clamp(result.score), result.move, result.depth, engine.nodes
+
+
+def analyze_moves(moves: Sequence[Tuple[int, int, str]], size: int, variant: Optional[str] = None,
+                  max_depth: int = 6, time_limit: float = 0.2, threat_time_limit: float = 0.05,
+                  good_loss: int = 150, blunder_loss: int = 1000) -> Dict[str, Any]:
+    """Label every ``(row, col, player)`` move of a game; stops at the first invalid move"""
+    started = time.perf_counter()
+    rules = get_rules(size, variant)
+    board = rules.new_board()
+    table = TranspositionTable()
+    engine = SearchEngine(max_depth=max_depth, time_limit=time_limit, table=table)
+    reply_engine = SearchEngine(time_limit=time_limit, table=table)
+    solver = ThreatSolver(time_limit=threat_time_limit)
+
+    annotated: List[Dict[str, Any]] = []
+    nodes = 0
+    for ply, (row, col, player) in enumerate(moves):
+        color = COLOR_CODES.get(player)
+        if color is None or not board.in_bounds(row, col) or not board.is_empty(board.index(row, col)):
+            logger.warning(f"Analysis stopped at invalid move {ply}: ({row}, {col}, {player})")
+            break
+        cell = board.index(row, col)
+
+        forced = solver.vcf(board, color)
+        best_score, best_move, best_depth, searched = _evaluate(engine, board, color)
+        nodes += searched + solver.nodes
+        board.place(cell, color)
+        if board.is_five_at(cell, color):
+            played_score = WIN_SCORE
+        elif cell == best_move:
+            played_score = best_score
+        elif board.is_full():
+            played_score = 0
+        else:
+            # One ply shallower than the search that picked the best move, so
+            # both scores see the same horizon
+            reply_engine.max_depth = max(1, best_depth - 1)
+            reply_score, _, _, searched = _evaluate(reply_engine, board, opponent(color))
+            nodes += searched
+            played_score = -reply_score
+        best_score = max(best_score, played_score)
+        had_win = forced.found or best_score >= _WINNING
+
+        label = _label(best_score - played_score, best_score, played_score, had_win, good_loss, blunder_loss)
+        best_cell = forced.move if forced.found and label == MISSED_WIN else best_move
+        annotated.append({
+            "ply": ply,
+            "player": player,
+            "move": [row, col],
+            "best": list(board.coords(best_cell)) if best_cell is not None else None,
+            "label": label,
+            "score": played_score,
+            "loss": best_score - played_score,
+        })
+
+    summary = {}
+    for player in COLOR_NAMES.values():
+        own = [move["label"] for move in annotated if move["player"] == player]
+        counts = {label: own.count(label) for label in LABELS}
+        summary[player] = {
+            **counts,
+            "moves": len(own),
+            "accuracy": round(100 * (counts[BEST] + counts[GOOD]) / len(own), 1) if own else None,
+        }
+    return {
+        "size": size,
+        "variant": rules.variant,
+        "engine": {"max_depth": max_depth, "time_limit": time_limit, "threat_time_limit": threat_time_limit},
+        "moves": annotated,
+        "summary": summary,
+        "nodes": nodes,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def game_moves(game: Dict[str, Any]) -> List[Tuple[int, int, str]]:
+    """``(row, col, player)`` of every move stored in a ``games`` document"""
+    return [(move.get("row"), move.get("col"), move.get("player")) for move in game.get("moves") or []]
+
+
+# -- Event loop side -------------------------------------------------------
+class AnalysisService:
+    def __init__(self, workers: Optional[int] = None, cache_size: Optional[int] = None,
+                 poll_interval: Optional[float] = None, sweep_interval: Optional[float] = None):
+        # Games analysed at once (one process each)
+        self.workers = workers or int(os.getenv("ANALYSIS_WORKERS", "1"))
+        self.cache_size = cache_size or int(os.getenv("ANALYSIS_CACHE_SIZE", "256"))
+        # Seconds an idle runner waits before looking for a job again
+        self.poll_interval = poll_interval or float(os.getenv("ANALYSIS_POLL_INTERVAL", "5"))
+        # Seconds between sweeps of ``games`` for finished, unanalysed games (0 disables)
+        if sweep_interval is None:
+            sweep_interval = float(os.getenv("ANALYSIS_SWEEP_INTERVAL", "300"))
+        self.sweep_interval = sweep_interval
+        self.sweep_batch = int(os.getenv("ANALYSIS_SWEEP_BATCH", "100"))
+        self.max_attempts = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))
+        # A running job not finished after this many seconds is taken to be
+        # orphaned by a crashed process and is queued again
+        self.stale_after = float(os.getenv("ANALYSIS_STALE_AFTER", "900"))
+        self.nice = int(os.getenv("ANALYSIS_NICE", "10"))
+        self.settings = {
+            "max_depth": int(os.getenv("ANALYSIS_DEPTH", "6")),
+            "time_limit": float(os.getenv("ANALYSIS_TIME_LIMIT", "0.2")),
+            "threat_time_limit": float(os.getenv("ANALYSIS_THREAT_TIME_LIMIT", "0.05")),
+            "good_loss": int(os.getenv("ANALYSIS_GOOD_LOSS", "150")),
+            "blunder_loss": int(os.getenv("ANALYSIS_BLUNDER_LOSS", "1000")),
+        }
+        self.running = False
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._last_sweep = 0.0
+        self.counters = {
+            "enqueued": 0,
+            "completed": 0,
+            "failed": 0,
+            "retried": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "deferred": 0,
+        }
+
+    async def start(self) -> None:
+        """Run the job runners until ``stop``"""
+        self.running = True
+        logger.info(f"Starting analysis service with {self.workers} workers...")
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self.nice,))
+        try:
+            await self.requeue_stale()
+            await asyncio.gather(*(self._run() for _ in range(self.workers)))
+        finally:
+            self._shutdown()
+
+    def stop(self) -> None:
+        self.running = False
+        logger.info("Stopping analysis service...")
+
+    def _shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # -- Results -----------------------------------------------------------
+    def _remember(self, game_id: str, analysis: Dict[str, Any]) -> None:
+        self._cache[game_id] = analysis
+        self._cache.move_to_end(game_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def get_analysis(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """Stored annotation of a game, or None if it was not analysed yet"""
+        analysis = self._cache.get(game_id)
+        if analysis is not None:
+            self._cache.move_to_end(game_id)
+            self.counters["cache_hits"] += 1
+            return analysis
+        self.counters["cache_misses"] += 1
+        analyses = await get_collection("analyses")
+        analysis = await analyses.find_one({"_id": game_id})
+        if analysis is not None:
+            analysis["game_id"] = analysis.pop("_id")
+            self._remember(game_id, analysis)
+        return analysis
+
+    # -- Queue -------------------------------------------------------------
+    async def enqueue(self, game_id: str) -> Dict[str, Any]:
+        """Queue the analysis of a finished game (once); its job document"""
+        jobs = await get_collection("analysis_jobs")
+        now = datetime.utcnow()
+        result = await jobs.update_one(
+            {"_id": game_id},
+            {"$setOnInsert": {"status": QUEUED, "attempts": 0, "created_at": now, "updated_at": now}},
+            upsert=True,
+        )
+        if result.upserted_id is not None:
+            self.counters["enqueued"] += 1
+        return await jobs.find_one({"_id": game_id})
+
+    async def job_status(self, game_id: str) -> Optional[Dict[str, Any]]:
+        jobs = await get_collection("analysis_jobs")
+        return await jobs.find_one({"_id": game_id})
+
+    async def requeue_stale(self) -> int:
+        """Queue again the jobs left running by a process that died"""
+        jobs = await get_collection("analysis_jobs")
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        result = await jobs.update_many(
+            {"status": RUNNING, "started_at": {"$lt": cutoff}},
+            {"$set": {"status": QUEUED, "updated_at": datetime.utcnow()}},
+        )
+        if result.modified_count:
+            logger.info(f"Requeued {result.modified_count} stale analysis jobs")
+        return result.modified_count
+
+    async def sweep_finished(self) -> int:
+        """Queue finished games that were never analysed; how many"""
+        games = await get_collection("games")
+        cursor = games.find({"status": "finished", "analysis": {"$exists": False}}, {"_id": 1})
+        count = 0
+        async for game in cursor.limit(self.sweep_batch):
+            game_id = str(game["_id"])
+            await self.enqueue(game_id)
+            await games.update_one({"_id": game["_id"]}, {"$set": {"analysis": QUEUED}})
+            count += 1
+        return count
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        """Take the oldest queued job; atomic, so each job runs in one process only"""
+        jobs = await get_collection("analysis_jobs")
+        now = datetime.utcnow()
+        return await jobs.find_one_and_update(
+            {"status": QUEUED},
+            {"$set": {"status": RUNNING, "started_at": now, "updated_at": now}, "$inc": {"attempts": 1}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _live_play_busy(self) -> bool:
+        return ai_service.pending >= ai_service.workers
+
+    async def _run(self) -> None:
+        while self.running:
+            try:
+                if self._live_play_busy():
+                    self.counters["deferred"] += 1
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                job = await self._claim()
+                if job is None:
+                    if self.sweep_interval and time.time() - self._last_sweep >= self.sweep_interval:
+                        self._last_sweep = time.time()
+                        if await self.sweep_finished():
+                            continue
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                await self.process(job)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in analysis runner: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def process(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Analyse the game of a claimed job and store the result"""
+        game_id = job["_id"]
+        jobs = await get_collection("analysis_jobs")
+        games = await get_collection("games")
+        try:
+            game = await games.find_one({"_id": ObjectId(game_id)})
+            if game is None:
+                raise ValueError("game not found")
+            size = len(game.get("board") or []) or None
+            rules = get_rules(size, game.get("variant"))
+            loop = asyncio.get_running_loop()
+            analysis = await loop.run_in_executor(
+                self._executor, partial(analyze_moves, game_moves(game), rules.size, rules.variant, **self.settings)
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            retry = job.get("attempts", 1) < self.max_attempts
+            self.counters["retried" if retry else "failed"] += 1
+            logger.warning(f"Analysis of game {game_id} failed: {e}")
+            await jobs.update_one({"_id": game_id}, {"$set": {
+                "status": QUEUED if retry else FAILED, "error": str(e), "updated_at": datetime.utcnow(),
+            }})
+            if not retry:
+                await self._mark_game(games, game_id, FAILED)
+            return None
+
+        analysis["analyzed_at"] = datetime.utcnow()
+        analyses = await get_collection("analyses")
+        await analyses.replace_one({"_id": game_id}, {"_id": game_id, **analysis}, upsert=True)
+        await jobs.update_one({"_id": game_id}, {"$set": {"status": DONE, "updated_at": datetime.utcnow()}})
+        await self._mark_game(games, game_id, DONE)
+        analysis["game_id"] = game_id
+        self._remember(game_id, analysis)
+        self.counters["completed"] += 1
+        logger.info(f"Analysed game {game_id}: {len(analysis['moves'])} moves in {analysis['elapsed_ms']} ms")
+        return analysis
+
+    @staticmethod
+    async def _mark_game(games, game_id: str, status: str) -> None:
+        await games.update_one({"_id": ObjectId(game_id)}, {"$set": {"analysis": status}})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "cached": len(self._cache),
+            "settings": dict(self.settings),
+            **self.counters,
+        }
+
+
+analysis_service = AnalysisService()
@@ -0,0 +1,305 @@
+"""Self-play arena: engine against engine, for strength and throughput.
+
+Two contenders - any difficulty profile, optionally with fields
+overridden (``"hard:engine=mcts,time_limit=0.1"``) - play ``games`` games
+against each other, spread over a process pool:
+
+    report = run_arena("hard", "hard:max_depth=4", games=40, workers=4)
+
+Games come in pairs sharing a random opening with the colors swapped, so
+neither side profits from a lucky opening or from moving first. The
+report holds, for the first contender, wins/draws/losses, the score with
+a 95% confidence interval and the Elo difference it implies, and for each
+contender the search nodes per second and the average and p99 move
+latency. ``memory=True`` also records the peak Python allocation of every
+game with ``tracemalloc`` (which slows play, so latencies of such a run
+are not comparable with one without it).
+
+``report`` is plain JSON; ``compare`` sets two reports side by side, e.g.
+the same match before and after an engine change.
+"""
+import json
+import logging
+import math
+import os
+import random
+import subprocess
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+from logic.board import BLACK, WHITE, COLOR_NAMES, opponent
+from logic.rules import get_rules
+from services.ai_profiles import DifficultyProfile, load_profiles
+from services.game_logic import GameLogic
+
+logger = logging.getLogger(__name__)
+
+# Two-sided 95% normal quantile
+_Z95 = 1.96
+
+_worker_logic: Optional[GameLogic] = None
+
+
+def parse_contender(spec: str, profiles: Optional[Dict[str, DifficultyProfile]] = None) -> DifficultyProfile:
+    """Profile of ``"tier"`` or ``"tier:field=value,..."`` (values read as JSON when they parse)"""
+    profiles = profiles or load_profiles()
+    name, _, overrides = spec.partition(":")
+    if name not in profiles:
+        raise ValueError(f"Unknown difficulty: {name}")
+    changes: Dict[str, Any] = {}
+    for item in filter(None, overrides.split(",")):
+        field, _, value = item.partition("=")
+        try:
+            changes[field.strip()] = json.loads(value)
+        except ValueError:
+            changes[field.strip()] = value.strip()
+    if not changes:
+        return profiles[name]
+    unknown = set(changes) - set(profiles[name].to_dict())
+    if unknown:
+        raise ValueError(f"Unknown fields in '{spec}': {', '.join(sorted(unknown))}")
+    return profiles[name].replace(name=spec, **changes)
+
+
+def random_opening(size: int, plies: int, seed: int, variant: Optional[str] = None) -> List[int]:
+    """``plies`` random legal moves within two cells of the centre, black first"""
+    rng = random.Random(seed)
+    board = get_rules(size, variant).new_board()
+    center = size // 2
+    near = [
+        (center + dr) * size + center + dc
+        for dr in range(-2, 3) for dc in range(-2, 3)
+    ]
+    moves: List[int] = []
+    color = BLACK
+    while len(moves) < min(plies, len(near)):
+        cell = rng.choice(near)
+        if board.is_empty(cell) and (board.rules is None or board.rules.is_legal(board, cell, color)):
+            board.place(cell, color)
+            moves.append(cell)
+            color = opponent(color)
+    return moves
+
+
+def _init_worker() -> None:
+    global _worker_logic
+    _worker_logic = GameLogic()
+
+
+def play_game(black: DifficultyProfile, white: DifficultyProfile, size: int, variant: Optional[str],
+              opening: Sequence[int], seed: int, memory: bool = False) -> Dict[str, Any]:
+    """Play one game to the end; the moves and per-side timing of it"""
+    logic = _worker_logic or GameLogic()
+    random.seed(seed)
+    if memory:
+        tracemalloc.start()
+    board = get_rules(size, variant).new_board()
+    profiles = {BLACK: black, WHITE: white}
+    sides = {color: {"moves": 0, "nodes": 0, "search_time": 0.0, "latencies": []} for color in profiles}
+
+    moves = list(opening)
+    color = BLACK
+    winner = None
+    for cell in opening:
+        board.place(cell, color)
+        color = opponent(color)
+    try:
+        while not board.is_full():
+            logic.last_search = None
+            started = time.perf_counter()
+            cell = logic.get_ai_cell(board, profiles[color], color)
+            elapsed = time.perf_counter() - started
+            side = sides[color]
+            side["moves"] += 1
+            side["latencies"].append(elapsed)
+            if logic.last_search is not None:
+                side["nodes"] += logic.last_search.nodes
+                side["search_time"] += logic.last_search.elapsed
+            if not board.is_empty(cell):
+                winner = opponent(color)  # an illegal move forfeits the game
+                break
+            board.place(cell, color)
+            moves.append(cell)
+            if board.is_five_at(cell, color):
+                winner = color
+                break
+            color = opponent(color)
+    finally:
+        peak = tracemalloc.get_traced_memory()[1] if memory else None
+        if memory:
+            tracemalloc.stop()
+    return {
+        "moves": moves,
+        "winner": COLOR_NAMES.get(winner),
+        "black": {"profile": black.name, **sides[BLACK]},
+        "white": {"profile": white.name, **sides[WHITE]},
+        "peak_memory_kb": round(peak / 1024, 1) if peak is not None else None,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+    }
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(math.ceil(fraction * len(ordered))) - 1)] if ordered else 0.0
+
+
+def _elo(score: float) -> Optional[float]:
+    """Elo difference implied by an expected ``score`` (None at 0 or 1)"""
+    if not 0.0 < score < 1.0:
+        return None
+    return round(-400 * math.log10(1 / score - 1), 1)
+
+
+def _wilson(score: float, count: int) -> Tuple[float, float]:
+    """95% Wilson interval of a match score over ``count`` games.
+
+    Unlike the normal approximation it keeps a width at 0% and 100%, so a
+    short lopsided match does not claim certainty; draws count as half
+    a win, which only makes the interval a little wider.
+    """
+    if not count:
+        return 0.0, 1.0
+    z2 = _Z95 * _Z95
+    center = (score + z2 / (2 * count)) / (1 + z2 / count)
+    margin = _Z95 / (1 + z2 / count) * math.sqrt(score * (1 - score) / count + z2 / (4 * count * count))
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def summarize(games: Sequence[Dict[str, Any]], first: str, second: str) -> Dict[str, Any]:
+    """Match result of ``first`` against ``second`` and per-contender speed"""
+    scores = []
+    wins = draws = losses = 0
+    for game in games:
+        first_color = "black" if game["black"]["profile"] == first else "white"
+        if game["winner"] is None:
+            draws += 1
+            scores.append(0.5)
+        elif game["winner"] == first_color:
+            wins += 1
+            scores.append(1.0)
+        else:
+            losses += 1
+            scores.append(0.0)
+    count = len(scores)
+    score = sum(scores) / count if count else 0.0
+    low, high = _wilson(score, count)
+
+    contenders = {}
+    for name in (first, second):
+        sides = [game[color] for game in games for color in ("black", "white") if game[color]["profile"] == name]
+        latencies = sorted(latency for side in sides for latency in side["latencies"])
+        nodes = sum(side["nodes"] for side in sides)
+        search_time = sum(side["search_time"] for side in sides)
+        contenders[name] = {
+            "moves": len(latencies),
+            "nodes": nodes,
+            "nodes_per_second": round(nodes / search_time) if search_time else 0,
+            "avg_latency_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            "p99_latency_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        }
+
+    memory = [game["peak_memory_kb"] for game in games if game.get("peak_memory_kb") is not None]
+    rss = [game["peak_rss_kb"] for game in games if game.get("peak_rss_kb") is not None]
+    lengths = [len(game["moves"]) for game in games]
+    return {
+        "games": count,
+        "wins": wins,
+        "draws": draws,
+        "losses": losses,
+        "score": round(score, 4),
+        "score_ci95": [round(low, 4), round(high, 4)],
+        "elo": _elo(score),
+        "elo_ci95": [_elo(low), _elo(high)],
+        "avg_game_length": round(sum(lengths) / len(lengths), 1) if lengths else 0.0,
+        "contenders": contenders,
+        "avg_memory_per_game_kb": round(sum(memory) / len(memory), 1) if memory else None,
+        "max_worker_rss_kb": max(rss) if rss else None,
+    }
+
+
+def _commit() -> Optional[str]:
+    """Git commit of the working tree, to tell reports of different versions apart"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_arena(first: str, second: str, games: int = 20, workers: int = 1, size: Optional[int] = None,
+              variant: Optional[str] = None, opening_plies: int = 2, seed: int = 0,
+              memory: bool = False) -> Dict[str, Any]:
+    """Play ``games`` games of ``first`` against ``second`` and report the match.
+
+    ``workers`` > 1 plays the games in that many processes at once.
+    """
+    profiles = load_profiles()
+    contenders = (parse_contender(first, profiles), parse_contender(second, profiles))
+    if contenders[0].name == contenders[1].name:
+        # Same spec on both sides: tell the two apart in the report
+        contenders = (contenders[0].replace(name=f"{first}#1"), contenders[1].replace(name=f"{second}#2"))
+    rules = get_rules(size, variant)
+
+    jobs = []
+    for number in range(games):
+        pair = number // 2
+        opening = random_opening(rules.size, opening_plies, seed + pair, rules.variant)
+        black, white = contenders if number % 2 == 0 else contenders[::-1]
+        jobs.append((black, white, rules.size, rules.variant, opening, seed * 1000003 + number, memory))
+
+    started = time.time()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = list(pool.map(play_game, *zip(*jobs)))
+    else:
+        results = [play_game(*job) for job in jobs]
+    elapsed = time.time() - started
+    logger.info("Arena %s vs %s: %d games in %.1fs", first, second, games, elapsed)
+
+    return {
+        "commit": _commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "first": contenders[0].to_dict(),
+            "second": contenders[1].to_dict(),
+            "games": games,
+            "workers": workers,
+            "size": rules.size,
+            "variant": rules.variant,
+            "opening_plies": opening_plies,
+            "seed": seed,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "summary": summarize(results, contenders[0].name, contenders[1].name),
+        "games": [
+            {"moves": game["moves"], "winner": game["winner"],
+             "black": game["black"]["profile"], "white": game["white"]["profile"]}
+            for game in results
+        ],
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-contender speed and the match score of ``current`` next to ``baseline``"""
+    result: Dict[str, Any] = {
+        "commits": [baseline.get("commit"), current.get("commit")],
+        "score": [baseline["summary"]["score"], current["summary"]["score"]],
+        "contenders": {},
+    }
+    old = list(baseline["summary"]["contenders"].values())
+    new = list(current["summary"]["contenders"].values())
+    names = list(current["summary"]["contenders"])
+    for name, before, after in zip(names, old, new):
+        result["contenders"][name] = {
+            field: [before[field], after[field]]
+            for field in ("nodes_per_second", "avg_latency_ms", "p99_latency_ms")
+        }
+    return result
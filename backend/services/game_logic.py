@@ -1,18 +1,87 @@
-from typing import List, Optional
+import os
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Union
 from models.game import Position, PieceColor
+from logic.board import Board, WHITE, COLOR_CODES, iter_bits, opponent
+from logic.search import SearchEngine, SearchResult
+from logic.mcts import MCTSEngine
+from logic.transposition import shared_table
+from logic import vectorized
+from logic.threats import ThreatSolver, ThreatResult, VCF, VCT, find_forced_win
+from logic.book import default_book
+from logic.rules import FREESTYLE, Rules, get_rules
+from logic.runs import neighbour_tables
+from services.ai_profiles import DifficultyProfile, load_profiles
+
+BoardLike = Union[List[List[Optional[str]]], Board]
+
+
+def _line_points(count: int, open_ends: int) -> int:
+    if count >= 4:
+        return 1000
+    if count == 3 and open_ends >= 1:
+        return 100
+    if count == 2 and open_ends >= 1:
+        return 10
+    return count
+
+
+# Medium-AI points of one direction, indexed by [run length][open ends]
+_LINE_POINTS = tuple(tuple(_line_points(count, ends) for ends in range(3)) for count in range(10))
 
 class GameLogic:
-    def __init__(self):
-        self.board_size = 19
+    def __init__(self, rules: Optional[Rules] = None):
+        # Board size and variant of new games (BOARD_SIZE / GAME_VARIANT);
+        # grids of other sizes are played with the same variant
+        self.rules = rules or get_rules()
+        self.board_size = self.rules.size
+        # Difficulty tiers: engine, budgets and features of each (see ai_profiles)
+        self.profiles: Dict[str, DifficultyProfile] = load_profiles()
+        self.last_search: Optional[SearchResult] = None
+        self.mcts_workers = int(os.getenv("AI_MCTS_WORKERS", "1"))
+        self.mcts_exploration = float(os.getenv("AI_MCTS_EXPLORATION", "1.5"))
+        # Global switches over every tier's book/solver use
+        self.use_threat_solver = os.getenv("AI_THREAT_SOLVER", "1") != "0"
+        self.use_book = os.getenv("AI_OPENING_BOOK", "1") != "0"
+        # Budget of the standalone forced-win analysis
+        self.threat_time_limit = float(os.getenv("AI_THREAT_TIME_LIMIT", "0.1"))
+        self.last_threat: Optional[ThreatResult] = None
+        self.book_max_plies = int(os.getenv("AI_BOOK_MAX_PLIES", "10"))
+        # Medium AI scores the whole board with NumPy when it is installed
+        self.use_vectorized = vectorized.HAS_NUMPY and os.getenv("AI_MEDIUM_BACKEND", "numpy") != "python"
+
+    def to_board(self, board: BoardLike, rules: Optional[Rules] = None) -> Board:
+        """Return a bitboard view of ``board`` (list-of-lists or Board).
+
+        A grid is read under ``rules``, the game's own rules (see
+        ``logic.rules.rules_for``); without them, under this instance's variant.
+        """
+        if isinstance(board, Board):
+            return board
+        return self.rules_for(board, rules).board_from_rows(board)
+
+    def rules_for(self, board: BoardLike, rules: Optional[Rules] = None) -> Rules:
+        """Rules of the game's variant (``rules``, else this instance's) for the size of ``board``"""
+        if isinstance(board, Board) and board.rules is not None:
+            return board.rules
+        rules = rules or self.rules
+        size = board.size if isinstance(board, Board) else len(board)
+        if size == rules.size:
+            return rules
+        return get_rules(size, rules.variant)
         
-    def is_valid_move(self, board: List[List[Optional[str]]], position: Position) -> bool:
+    def is_valid_move(self, board: BoardLike, position: Position) -> bool:
         """Check if a move is valid"""
-        if position.row < 0 or position.row >= self.board_size:
+        size = board.size if isinstance(board, Board) else len(board)
+        if position.row < 0 or position.row >= size:
             return False
-        if position.col < 0 or position.col >= self.board_size:
+        if position.col < 0 or position.col >= size:
             return False
         
         # Check if position is empty
+        if isinstance(board, Board):
+            return board.is_empty(board.index(position.row, position.col))
         return board[position.row][position.col] is None
     
     def make_move(self, board: List[List[Optional[str]]], position: Position, piece: PieceColor) -> bool:
@@ -25,11 +94,33 @@ class GameLogic:
         if not self.is_valid_move(board, position):
             return False
 
-        board[position.row][position.col] = piece.value
+        self.apply_move(board, position, piece)
         return True
+
+    def apply_move(self, board: BoardLike, position: Position, piece: PieceColor) -> None:
+        """Place ``piece`` in-place without validation (look-ahead "make")"""
+        if isinstance(board, Board):
+            board.place(board.index(position.row, position.col), COLOR_CODES[piece.value])
+        else:
+            board[position.row][position.col] = piece.value
+
+    def undo_move(self, board: BoardLike, position: Position) -> None:
+        """Clear the cell filled by ``apply_move`` (look-ahead "unmake")"""
+        if isinstance(board, Board):
+            board.remove(board.index(position.row, position.col))
+        else:
+            board[position.row][position.col] = None
     
-    def check_winner(self, board: List[List[Optional[str]]], last_position: Position, piece: PieceColor) -> Optional[PieceColor]:
+    def check_winner(self, board: BoardLike, last_position: Position, piece: PieceColor,
+                     rules: Optional[Rules] = None) -> Optional[PieceColor]:
         """Check if there's a winner after the last move"""
+        if isinstance(board, Board):
+            index = board.index(last_position.row, last_position.col)
+            return piece if board.is_five_at(index, COLOR_CODES[piece.value]) else None
+        if (rules or self.rules).variant != FREESTYLE:
+            return self.check_winner(self.to_board(board, rules), last_position, piece)
+
+        size = len(board)
         directions = [
             (0, 1),   # horizontal
             (1, 0),   # vertical
@@ -45,8 +136,8 @@ class GameLogic:
                 new_row = last_position.row + dx * i
                 new_col = last_position.col + dy * i
                 
-                if (0 <= new_row < self.board_size and 
-                    0 <= new_col < self.board_size and 
+                if (0 <= new_row < size and 
+                    0 <= new_col < size and 
                     board[new_row][new_col] == piece.value):
                     count += 1
                 else:
@@ -57,8 +148,8 @@ class GameLogic:
                 new_row = last_position.row - dx * i
                 new_col = last_position.col - dy * i
                 
-                if (0 <= new_row < self.board_size and 
-                    0 <= new_col < self.board_size and 
+                if (0 <= new_row < size and 
+                    0 <= new_col < size and 
                     board[new_row][new_col] == piece.value):
                     count += 1
                 else:
@@ -69,175 +160,262 @@ class GameLogic:
         
         return None
     
-    def is_board_full(self, board: List[List[Optional[str]]]) -> bool:
+    def is_board_full(self, board: BoardLike) -> bool:
         """Check if the board is full (draw condition)"""
+        if isinstance(board, Board):
+            return board.is_full()
         for row in board:
             for cell in row:
                 if cell is None:
                     return False
         return True
     
-    def get_ai_move(self, board: List[List[Optional[str]]], difficulty: str = "medium") -> Position:
-        """AI logic with different difficulty levels"""
-        if difficulty == "easy":
-            return self._get_random_move(board)
-        elif difficulty == "medium":
-            return self._get_strategic_move(board)
-        elif difficulty == "hard":
-            return self._get_minimax_move(board)
-        else:
-            return self._get_strategic_move(board)
-    
-    def _get_random_move(self, board: List[List[Optional[str]]]) -> Position:
-        """Random move for easy AI"""
-        import random
-        empty_positions = []
-        for row in range(self.board_size):
-            for col in range(self.board_size):
-                if board[row][col] is None:
-                    empty_positions.append(Position(row=row, col=col))
-        
-        if empty_positions:
-            return random.choice(empty_positions)
-        return Position(row=0, col=0)
-    
-    def _get_strategic_move(self, board: List[List[Optional[str]]]) -> Position:
-        """Strategic AI that prioritizes winning and blocking"""
-        ai_piece = PieceColor.WHITE
-        player_piece = PieceColor.BLACK
-        
-        # 1. Check if AI can win in the next move
-        win_move = self._find_winning_move(board, ai_piece)
-        if win_move:
-            return win_move
-        
-        # 2. Check if AI needs to block player from winning
-        block_move = self._find_winning_move(board, player_piece)
-        if block_move:
-            return block_move
-        
-        # 3. Look for good strategic positions
-        strategic_move = self._find_strategic_move(board, ai_piece)
-        if strategic_move:
-            return strategic_move
-        
-        # 4. Fallback to center or nearby positions
-        return self._get_center_biased_move(board)
+    def evaluate_board(self, board: BoardLike, piece: PieceColor, rules: Optional[Rules] = None) -> int:
+        """Static evaluation of the whole board from ``piece``'s point of view"""
+        return self.to_board(board, rules).evaluate(COLOR_CODES[piece.value])
+
+    def profile(self, difficulty: Union[str, DifficultyProfile]) -> DifficultyProfile:
+        """Profile of a difficulty name (unknown names play like "medium")"""
+        if isinstance(difficulty, DifficultyProfile):
+            return difficulty
+        return self.profiles.get(difficulty) or self.profiles["medium"]
+
+    def get_ai_move(self, board: BoardLike, difficulty: Union[str, DifficultyProfile] = "medium",
+                    piece: PieceColor = PieceColor.WHITE, rules: Optional[Rules] = None) -> Position:
+        """AI move for ``piece`` within the budget of ``difficulty`` (a tier name or a profile)"""
+        bitboard = self.to_board(board, rules)
+        return self._position(bitboard, self.get_ai_cell(bitboard, difficulty, COLOR_CODES[piece.value]))
+
+    def get_ai_cell(self, board: Board, difficulty: Union[str, DifficultyProfile] = "medium",
+                    color: int = WHITE) -> int:
+        """``get_ai_move`` as a flat cell index (``row * size + col``).
+
+        Everything below the API works on cell indexes; a ``Position`` is
+        only built once, for the move that is returned.
+        """
+        profile = self.profile(difficulty)
+        if profile.noise and random.random() < profile.noise:
+            return self._random_cell(board, color)
+        if profile.book:
+            cell = self._book_cell(board, color)
+            if cell is not None:
+                return cell
+        if profile.threat_solver and self.use_threat_solver:
+            cell = self._threat_cell(board.copy(), profile.threat_time_limit, color)
+            if cell is not None:
+                return cell
+        if profile.engine == "search":
+            return self._minimax_cell(board, profile, color)
+        if profile.engine == "mcts":
+            return self._mcts_cell(board, profile, color)
+        return self._strategic_cell(board, color)
     
-    def _find_winning_move(self, board: List[List[Optional[str]]], piece: PieceColor) -> Optional[Position]:
-        """Find a move that creates 5 in a row"""
-        for row in range(self.board_size):
-            for col in range(self.board_size):
-                if board[row][col] is None:
-                    # Try placing piece here
-                    test_board = [row[:] for row in board]
-                    test_board[row][col] = piece.value
-                    if self.check_winner(test_board, Position(row=row, col=col), piece):
-                        return Position(row=row, col=col)
+    def get_ai_moves(self, boards: Sequence[BoardLike],
+                     difficulty: Union[str, DifficultyProfile] = "medium",
+                     rules: Optional[Rules] = None) -> List[Position]:
+        """``get_ai_move`` for several games at once"""
+        bitboards = [self.to_board(board, rules) for board in boards]
+        cells = self.get_ai_cells(bitboards, difficulty)
+        return [self._position(bitboard, cell) for bitboard, cell in zip(bitboards, cells)]
+
+    def get_ai_cells(self, boards: Sequence[Board],
+                     difficulty: Union[str, DifficultyProfile] = "medium", color: int = WHITE) -> List[int]:
+        """``get_ai_cell`` for several games at once.
+
+        Boards of the noiseless heuristic tiers are scored together as one
+        stacked NumPy array per board size; other tiers are computed one
+        by one.
+        """
+        profile = self.profile(difficulty)
+        if profile.engine != "heuristic" or profile.noise or profile.book or profile.threat_solver \
+                or not self.use_vectorized:
+            return [self.get_ai_cell(board, profile, color) for board in boards]
+
+        by_size: Dict[int, List[int]] = {}
+        for position, board in enumerate(boards):
+            by_size.setdefault(board.size, []).append(position)
+
+        moves: List[int] = [0] * len(boards)
+        for indices in by_size.values():
+            group = [boards[i] for i in indices]
+            candidates = [self._candidate_cells(board, color) for board in group]
+            cells = vectorized.strategic_moves(group, color, candidates)
+            for i, cell in zip(indices, cells):
+                moves[i] = self._center_cell(boards[i]) if cell is None else cell
+        return moves
+
+    def find_forced_win(self, board: BoardLike, piece: PieceColor, kind: str = VCF,
+                        rules: Optional[Rules] = None) -> Optional[List[Position]]:
+        """Forced winning line for ``piece`` (to move), attacker and defender moves alternating"""
+        bitboard = self.to_board(board, rules)
+        result = find_forced_win(bitboard, COLOR_CODES[piece.value], kind, time_limit=self.threat_time_limit)
+        self.last_threat = result
+        if not result.found:
+            return None
+        return [self._position(bitboard, cell) for cell in result.line]
+
+    @staticmethod
+    def _position(board: Board, cell: int) -> Position:
+        row, col = board.coords(cell)
+        return Position(row=row, col=col)
+
+    def _book_cell(self, board: Board, color: int = WHITE) -> Optional[int]:
+        """Opening book move for the current position, if the book has one legal for ``color``"""
+        if not self.use_book or board.move_count > self.book_max_plies:
+            return None
+        book = default_book(board.size)
+        return book.probe(board, color) if book is not None else None
+
+    def _threat_cell(self, board: Board, time_limit: float, color: int = WHITE) -> Optional[int]:
+        """Play a forced win if there is one, else refute the opponent's VCF"""
+        deadline = time.perf_counter() + time_limit
+        solver = ThreatSolver()
+
+        def solve(color: int, kind: str) -> ThreatResult:
+            solver.time_limit = max(deadline - time.perf_counter(), 1e-3)
+            return solver.solve(board, color, kind)
+
+        for kind in (VCF, VCT):
+            self.last_threat = solve(color, kind)
+            if self.last_threat.found:
+                return self.last_threat.move
+        threat = solve(opponent(color), VCF)
+        if threat.found:
+            # Try the cells of the opponent's line until one breaks every VCF
+            for cell in threat.line:
+                if time.perf_counter() >= deadline:
+                    break
+                board.place(cell, color)
+                try:
+                    reply = solve(opponent(color), VCF)
+                    refuted = reply.completed and not reply.found
+                finally:
+                    board.remove(cell)
+                if refuted:
+                    return cell
         return None
-    
-    def _find_strategic_move(self, board: List[List[Optional[str]]], piece: PieceColor) -> Optional[Position]:
-        """Find moves that create multiple threats or extend sequences"""
-        best_score = -1
-        best_move = None
-        
-        for row in range(self.board_size):
-            for col in range(self.board_size):
-                if board[row][col] is None:
-                    score = self._evaluate_position(board, Position(row=row, col=col), piece)
-                    if score > best_score:
-                        best_score = score
-                        best_move = Position(row=row, col=col)
-        
-        return best_move
-    
-    def _evaluate_position(self, board: List[List[Optional[str]]], pos: Position, piece: PieceColor) -> int:
+
+    def _candidate_cells(self, board: Board, color: int) -> int:
+        """Mask of the frontier cells ``color`` may play under the board's rules"""
+        candidates = board.frontier
+        if board.rules is not None and board.rules.forbids(color):
+            for cell in iter_bits(candidates):
+                if board.rules.forbidden(board, cell, color):
+                    candidates &= ~(1 << cell)
+        return candidates
+
+    def _random_cell(self, board: Board, color: int = WHITE) -> int:
+        """Random move near the stones (easy tier, profile noise)"""
+        cells = list(iter_bits(self._candidate_cells(board, color) or board.empty))
+        return random.choice(cells) if cells else 0
+
+    def _strategic_cell(self, board: Board, color: int) -> int:
+        """Medium AI: win, else block, else the frontier cell of best ``_cell_score``"""
+        candidates = self._candidate_cells(board, color)
+        if self.use_vectorized:
+            move = vectorized.strategic_move(board, color, candidates)
+            return self._center_cell(board) if move is None else move
+
+        if not candidates:
+            return self._center_cell(board)
+        # 1. Win, 2. block: the first such candidate in raster order
+        for side in (color, opponent(color)):
+            wins = board.winning_cells(side) & candidates
+            if wins:
+                return (wins & -wins).bit_length() - 1
+        # 3. Best one-ply score
+        best_score, best = -1, 0
+        for cell in iter_bits(candidates):
+            score = self._cell_score(board, cell, color)
+            if score > best_score:
+                best_score, best = score, cell
+        return best
+
+    def _find_winning_move(self, board: BoardLike, piece: PieceColor) -> Optional[Position]:
+        """Find a move that creates 5 in a row"""
+        bitboard = self.to_board(board)
+        wins = bitboard.winning_cells(COLOR_CODES[piece.value]) & bitboard.frontier
+        if not wins:
+            return None
+        return self._position(bitboard, (wins & -wins).bit_length() - 1)
+
+    def _evaluate_position(self, board: BoardLike, pos: Position, piece: PieceColor) -> int:
         """Evaluate how good a position is"""
+        bitboard = self.to_board(board)
+        return self._cell_score(bitboard, bitboard.index(pos.row, pos.col), COLOR_CODES[piece.value])
+
+    def _cell_score(self, board: Board, cell: int, color: int) -> int:
+        """One-ply value of ``color`` playing ``cell``: per direction, the run it
+        would make (up to four stones each way) and its open ends, scored by
+        ``_LINE_POINTS``"""
+        own = board.bits[color]
+        other = board.bits[opponent(color)]
         score = 0
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        
-        for dx, dy in directions:
-            # Count consecutive pieces in both directions
+        for back, ahead in neighbour_tables(board.size):
             count = 1
             open_ends = 0
-            
-            # Check positive direction
-            for i in range(1, 5):
-                new_row = pos.row + dx * i
-                new_col = pos.col + dy * i
-                
-                if (0 <= new_row < self.board_size and 0 <= new_col < self.board_size):
-                    if board[new_row][new_col] == piece.value:
-                        count += 1
-                    elif board[new_row][new_col] is None:
-                        open_ends += 1
+            for step in (ahead, back):
+                index = cell
+                for _ in range(4):
+                    index = step[index]
+                    if index < 0 or other >> index & 1:
                         break
-                    else:
-                        break
-                else:
-                    break
-            
-            # Check negative direction
-            for i in range(1, 5):
-                new_row = pos.row - dx * i
-                new_col = pos.col - dy * i
-                
-                if (0 <= new_row < self.board_size and 0 <= new_col < self.board_size):
-                    if board[new_row][new_col] == piece.value:
+                    if own >> index & 1:
                         count += 1
-                    elif board[new_row][new_col] is None:
-                        open_ends += 1
-                        break
                     else:
+                        open_ends += 1
                         break
-                else:
-                    break
-            
-            # Score based on count and open ends
-            if count >= 4:
-                score += 1000
-            elif count == 3 and open_ends >= 1:
-                score += 100
-            elif count == 2 and open_ends >= 1:
-                score += 10
-            else:
-                score += count
-        
+            score += _LINE_POINTS[count][open_ends]
         return score
-    
-    def _get_center_biased_move(self, board: List[List[Optional[str]]]) -> Position:
+
+    def _center_cell(self, board: Board) -> int:
         """Get a move biased towards the center"""
-        center = self.board_size // 2
+        size = board.size
+        center = size // 2
+        empty = board.empty
         
         # Try center first
-        if board[center][center] is None:
-            return Position(row=center, col=center)
+        if empty >> (center * size + center) & 1:
+            return center * size + center
         
         # Try positions near center
         for distance in range(1, center + 1):
-            positions = []
+            cells = []
             for dr in range(-distance, distance + 1):
                 for dc in range(-distance, distance + 1):
                     if abs(dr) == distance or abs(dc) == distance:
                         row, col = center + dr, center + dc
-                        if (0 <= row < self.board_size and 0 <= col < self.board_size 
-                            and board[row][col] is None):
-                            positions.append(Position(row=row, col=col))
-            
-            if positions:
-                import random
-                return random.choice(positions)
+                        if 0 <= row < size and 0 <= col < size and empty >> (row * size + col) & 1:
+                            cells.append(row * size + col)
+            if cells:
+                return random.choice(cells)
         
         # Fallback to first empty position
-        for row in range(self.board_size):
-            for col in range(self.board_size):
-                if board[row][col] is None:
-                    return Position(row=row, col=col)
-        
-        return Position(row=0, col=0)
+        return (empty & -empty).bit_length() - 1 if empty else 0
     
-    def _get_minimax_move(self, board: List[List[Optional[str]]], depth: int = 3) -> Position:
-        """Advanced AI using minimax algorithm (simplified)"""
-        # For now, use strategic move as minimax is complex to implement properly
-        # This would be a full minimax implementation in a production system
-        return self._get_strategic_move(board)
+    def _minimax_cell(self, board: Board, profile: Optional[DifficultyProfile] = None, color: int = WHITE) -> int:
+        """Advanced AI using iterative-deepening alpha-beta search"""
+        profile = profile or self.profiles["hard"]
+        engine = SearchEngine(
+            max_depth=profile.max_depth,
+            time_limit=profile.time_limit,
+            node_limit=profile.node_limit,
+            table=shared_table(),
+        )
+        # The search makes/unmakes moves in place; keep the caller's Board intact
+        result = engine.search(board.copy(), color)
+        self.last_search = result
+        # No candidate (e.g. every block is forbidden to black): any empty cell
+        return self._random_cell(board, color) if result.move is None else result.move
+
+    def _mcts_cell(self, board: Board, profile: DifficultyProfile, color: int = WHITE) -> int:
+        """AI backed by Monte Carlo tree search"""
+        engine = MCTSEngine(
+            time_limit=profile.time_limit,
+            playout_limit=profile.playouts,
+            exploration=self.mcts_exploration,
+            workers=self.mcts_workers,
+        )
+        result = engine.search(board, color)
+        self.last_search = result
+        return self._random_cell(board, color) if result.move is None else result.move
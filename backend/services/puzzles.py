@@ -0,0 +1,269 @@
+"""Puzzle mining: "find the win in N" positions from finished games.
+
+Every position of an archived game is handed to the threat solver with
+the side that moved there to play. Where it finds a forced win (VCF by
+default: a chain of fours the defender can never escape) the position
+becomes a puzzle whose solution is the solver's line:
+
+    puzzles = mine_game(moves, size=15)
+
+Only the first position of a winning streak is kept - the later ones are
+the same combination with moves already played - and wins in fewer than
+``min_moves`` moves are skipped as trivial. Puzzles are stored in the
+canonical orientation, under an id made of the canonical Zobrist key and
+the side to move, so a position reached in many games (or in a rotated or
+mirrored form) is one puzzle.
+
+``mine_puzzles`` streams ``finished`` games out of MongoDB in ``_id``
+order, solves each chunk on a process pool while the next chunk is read,
+inserts the new puzzles into ``puzzles`` and records the last game done in
+``puzzle_checkpoints``, so an interrupted run resumes where it stopped.
+"""
+import asyncio
+import logging
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import UpdateOne
+
+from database import get_collection
+from logic.board import BLACK, WHITE, COLOR_NAMES, Board, color_code, iter_bits, opponent
+from logic.rules import get_rules
+from logic.symmetry import transform_cell
+from logic.threats import ThreatResult, ThreatSolver, VCF
+
+logger = logging.getLogger(__name__)
+
+# Rating bands of the difficulty labels
+DIFFICULTIES = ((1200, "easy"), (1600, "medium"), (2000, "hard"))
+EXPERT = "expert"
+
+CHECKPOINTS = "puzzle_checkpoints"
+
+
+def rate_puzzle(moves: int, nodes: int) -> Tuple[int, str]:
+    """Rating and label of a win in ``moves`` the solver proved in ``nodes`` nodes.
+
+    Longer wins are harder, and so are wins the solver had to search a
+    wide tree for (many tempting threats that fail).
+    """
+    rating = round(800 + 200 * (moves - 1) + 40 * math.log2(nodes + 1))
+    for limit, label in DIFFICULTIES:
+        if rating < limit:
+            return rating, label
+    return rating, EXPERT
+
+
+def puzzle_id(size: int, variant: str, to_move: int, key: int) -> str:
+    return f"{size}:{variant}:{COLOR_NAMES[to_move]}:{key:016x}"
+
+
+def game_cells(game: Dict[str, Any], size: int) -> List[Tuple[int, int]]:
+    """``(cell, color)`` of the moves of a ``games`` document, up to the first malformed one"""
+    moves = []
+    for move in game.get("moves") or []:
+        position = move.get("position") or move
+        row, col = position.get("row"), position.get("col")
+        color = color_code(move.get("player") or move.get("piece"))
+        if row is None or col is None or not color or not (0 <= row < size and 0 <= col < size):
+            break
+        moves.append((row * size + col, color))
+    return moves
+
+
+def mine_game(moves: Sequence[Tuple[int, int]], size: int, variant: Optional[str] = None,
+              kind: str = VCF, min_moves: int = 2, time_limit: float = 0.05,
+              node_limit: Optional[int] = 20000, game_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Puzzles found along one game of ``(cell, color)`` moves"""
+    rules = get_rules(size, variant)
+    board = rules.new_board()
+    solver = ThreatSolver(time_limit=time_limit, node_limit=node_limit)
+    puzzles = []
+    streak = {color: False for color in COLOR_NAMES}
+    for ply, (cell, color) in enumerate(moves):
+        if not board.is_empty(cell):
+            break
+        result = solver.solve(board, color, kind)
+        winning = result.found and result.completed
+        if winning and not streak[color]:
+            attacker_moves = len(result.line) // 2 + 1
+            if attacker_moves >= min_moves:
+                puzzles.append(_puzzle(board, rules.variant, color, result, attacker_moves, ply, cell, game_id))
+        streak[color] = winning
+        board.place(cell, color)
+        if board.is_five_at(cell, color):
+            break
+    return puzzles
+
+
+def _puzzle(board: Board, variant: str, color: int, result: ThreatResult, attacker_moves: int, ply: int,
+            played: int, game_id: Optional[str]) -> Dict[str, Any]:
+    key, sym = board.canonical()
+    size = board.size
+
+    def stones(mask: int) -> List[List[int]]:
+        return sorted(list(divmod(transform_cell(cell, sym, size), size)) for cell in iter_bits(mask))
+
+    rating, difficulty = rate_puzzle(attacker_moves, result.nodes)
+    return {
+        "_id": puzzle_id(size, variant, color, key),
+        "size": size,
+        "variant": variant,
+        "to_move": COLOR_NAMES[color],
+        "kind": result.kind,
+        "black": stones(board.bits[BLACK]),
+        "white": stones(board.bits[WHITE]),
+        "solution": _solution(result.line, color, sym, size),
+        "moves": attacker_moves,
+        "rating": rating,
+        "difficulty": difficulty,
+        "nodes": result.nodes,
+        # Whether the player found the first move of the win in the game
+        "found_in_game": played == result.move,
+        "source": {"game_id": game_id, "ply": ply},
+    }
+
+
+def _solution(line: Sequence[int], color: int, sym: int, size: int) -> List[Dict[str, Any]]:
+    """The solver's line as moves; after an open or double four the attacker
+    simply plays the five, so an even-length line ends with two attacker moves"""
+    moves = []
+    for number, cell in enumerate(line):
+        attacker = number % 2 == 0 or number == len(line) - 1
+        row, col = divmod(transform_cell(cell, sym, size), size)
+        moves.append({"row": row, "col": col, "player": COLOR_NAMES[color if attacker else opponent(color)]})
+    return moves
+
+
+def mine_chunk(games: Sequence[Dict[str, Any]], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Puzzles of a chunk of games, deduplicated within the chunk"""
+    started = time.perf_counter()
+    found: Dict[str, Dict[str, Any]] = {}
+    positions = 0
+    for game in games:
+        size = len(game.get("board") or []) or get_rules().size
+        moves = game_cells(game, size)
+        positions += len(moves)
+        try:
+            puzzles = mine_game(moves, size, game.get("variant"), game_id=str(game["_id"]), **options)
+        except ValueError as e:
+            logger.warning(f"Skipping game {game['_id']}: {e}")
+            continue
+        for puzzle in puzzles:
+            found.setdefault(puzzle["_id"], puzzle)
+    return {
+        "puzzles": list(found.values()),
+        "games": len(games),
+        "positions": positions,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def _split(games: List[Dict[str, Any]], parts: int) -> Iterable[List[Dict[str, Any]]]:
+    step = max(1, math.ceil(len(games) / parts))
+    for start in range(0, len(games), step):
+        yield games[start:start + step]
+
+
+async def _read_chunk(collection, after: Any, size: int) -> List[Dict[str, Any]]:
+    query: Dict[str, Any] = {"status": "finished"}
+    if after is not None:
+        query["_id"] = {"$gt": after}
+    cursor = collection.find(query, {"moves": 1, "board": 1, "variant": 1}).sort("_id", 1).limit(size)
+    return await cursor.to_list(length=size)
+
+
+async def store_puzzles(collection, puzzles: Sequence[Dict[str, Any]]) -> int:
+    """Insert the puzzles not stored yet; how many were new"""
+    if not puzzles:
+        return 0
+    now = datetime.utcnow()
+    result = await collection.bulk_write(
+        [UpdateOne({"_id": puzzle["_id"]},
+                   {"$setOnInsert": {**{k: v for k, v in puzzle.items() if k != "_id"}, "created_at": now}},
+                   upsert=True)
+         for puzzle in puzzles],
+        ordered=False,
+    )
+    return result.upserted_count
+
+
+async def _store_chunk(puzzles, checkpoints, name: str, last: Any, chunk: Sequence[Dict[str, Any]],
+                       results: Sequence[Dict[str, Any]], totals: Dict[str, Any]) -> int:
+    """Store a solved chunk's puzzles, then move the checkpoint past it; new puzzles"""
+    found: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        totals["positions"] += result["positions"]
+        for puzzle in result["puzzles"]:
+            found.setdefault(puzzle["_id"], puzzle)
+    new = await store_puzzles(puzzles, list(found.values()))
+    totals["games"] += len(chunk)
+    totals["puzzles"] += new
+    # Written only once the chunk's puzzles are stored, so a crash repeats
+    # the chunk at worst (and its puzzles are not inserted twice)
+    await checkpoints.replace_one(
+        {"_id": name},
+        {"_id": name, "last_game_id": last, **totals, "updated_at": datetime.utcnow()},
+        upsert=True,
+    )
+    logger.info(f"Puzzle run '{name}': {totals['games']} games, {totals['puzzles']} puzzles (+{new})")
+    return new
+
+
+async def mine_puzzles(name: str = "default", chunk_size: int = 500, workers: int = 1,
+                       limit: Optional[int] = None, restart: bool = False,
+                       **options: Any) -> Dict[str, Any]:
+    """Mine every finished game not processed yet by the run ``name``.
+
+    ``options`` go to ``mine_game`` (``kind``, ``min_moves``,
+    ``time_limit``, ``node_limit``). Needs a MongoDB connection.
+    """
+    games = await get_collection("games")
+    puzzles = await get_collection("puzzles")
+    checkpoints = await get_collection(CHECKPOINTS)
+    await puzzles.create_index([("difficulty", 1), ("rating", 1)])
+
+    checkpoint = None if restart else await checkpoints.find_one({"_id": name})
+    totals = {
+        "games": checkpoint["games"] if checkpoint else 0,
+        "positions": checkpoint["positions"] if checkpoint else 0,
+        "puzzles": checkpoint["puzzles"] if checkpoint else 0,
+    }
+    after = checkpoint["last_game_id"] if checkpoint else None
+    if after is not None:
+        logger.info(f"Resuming puzzle run '{name}' after game {after}")
+
+    started = time.time()
+    processed = 0
+    loop = asyncio.get_running_loop()
+    upcoming = asyncio.ensure_future(_read_chunk(games, after, chunk_size))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            while True:
+                chunk = await upcoming
+                if limit is not None:
+                    chunk = chunk[:max(0, limit - processed)]
+                if not chunk:
+                    break
+                last = chunk[-1]["_id"]
+                # Read the next chunk while this one is being solved
+                upcoming = asyncio.ensure_future(_read_chunk(games, last, chunk_size))
+                jobs = [loop.run_in_executor(pool, mine_chunk, part, options) for part in _split(chunk, workers)]
+                results = await asyncio.gather(*jobs)
+                await _store_chunk(puzzles, checkpoints, name, last, chunk, results, totals)
+                processed += len(chunk)
+        finally:
+            if not upcoming.done():
+                upcoming.cancel()
+
+    elapsed = time.time() - started
+    return {
+        "name": name,
+        **totals,
+        "processed": processed,
+        "elapsed_s": round(elapsed, 2),
+        "games_per_second": round(processed / elapsed, 1) if elapsed else 0.0,
+    }
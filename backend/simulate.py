@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Simulação em massa do jogo de terminal: N partidas entre jogadores automáticos,
+sem mostrar nada no terminal, com um registro compacto dos resultados
+
+    python simulate.py --games 200 --black random --white medium --seed 1
+    python simulate.py --games 20 --black hard --white hard:max_depth=2 --swap --log arena.tsv
+    python main.py --games 5 --display            # o jogo de terminal repassa para cá
+"""
+import argparse
+import random
+import sys
+import time
+
+from dotenv import load_dotenv
+
+import admin
+import player
+from logic.rules import get_rules
+from services.arena import random_opening
+
+load_dotenv()
+
+
+#coordenada de uma jogada no formato de entrada do jogo de terminal (linha e coluna)
+def moveText(move):
+	return f'{chr(move[0]+65)}{chr(move[1]+97)}'
+
+
+#joga as partidas; a cada uma devolve (número, pretas, brancas, resultado, ms).
+#Cada partida começa com openingPlies jogadas sorteadas perto do centro (as da
+#arena), já que a IA é determinística e repetiria sempre as mesmas partidas; com
+#swap, as duas partidas de um par têm a mesma abertura com as cores trocadas
+def simulate(games, black='random', white='random', seed=None, size=None, variant=None, swap=False,
+		display=False, openingPlies=2):
+	rules = get_rules(size, variant)
+	dungeonMaster = admin.Admin(rules)
+	for number in range(1, games + 1):
+		names = (white, black) if (swap and number % 2 == 0) else (black, white)
+		gameSeed = random.randrange(2 ** 32) if seed is None else seed * 100003 + number
+		if (not swap or number % 2 == 1):
+			opening = [divmod(cell, rules.size) for cell in
+				random_opening(rules.size, openingPlies, gameSeed, rules.variant)]
+		#a IA usa o random global para variar as jogadas com ruído
+		random.seed(gameSeed)
+		p1 = player.makePlayer(names[0], 1, gameSeed)
+		p2 = player.makePlayer(names[1], 2, gameSeed + 1)
+		started = time.perf_counter()
+		result = dungeonMaster.playGame(p1, p2, display, opening)
+		yield number, names, result, (time.perf_counter() - started) * 1000
+
+
+#uma linha do registro por partida, campos separados por tab
+def logLine(number, names, result, ms):
+	winner = {None: 'draw', 1: 'black', 2: 'white'}[result['winner'] and result['winner'].id]
+	return '\t'.join([str(number), names[0], names[1], winner, result['end'], str(len(result['moves'])),
+		f'{ms:.1f}', ''.join(moveText(move) for move in result['moves'])])
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Play Gomoku games between automatic players, headless")
+	parser.add_argument("--games", type=int, default=100, help="number of games")
+	parser.add_argument("--black", default="random", help="'random' or an AI tier, e.g. medium or hard:max_depth=3")
+	parser.add_argument("--white", default="random", help="'random' or an AI tier")
+	parser.add_argument("--swap", action="store_true", help="swap colors every other game")
+	parser.add_argument("--seed", type=int, default=None, help="seed for reproducible games")
+	parser.add_argument("--opening", type=int, default=2, help="random opening plies played before the players take over")
+	parser.add_argument("--size", type=int, default=None, help="board size (default BOARD_SIZE)")
+	parser.add_argument("--variant", default=None, help="rule variant (default GAME_VARIANT)")
+	parser.add_argument("--display", action="store_true", help="print the final board of every game")
+	parser.add_argument("--log", default=None, help="results file (default: stdout)")
+	args = parser.parse_args(argv)
+
+	out = open(args.log, 'w') if args.log else sys.stdout
+	wins = {}
+	moves = 0
+	started = time.perf_counter()
+	try:
+		out.write(f'# games={args.games} black={args.black} white={args.white} swap={args.swap} '
+			f'seed={args.seed} size={args.size} variant={args.variant} opening={args.opening}\n')
+		out.write('#game\tblack\twhite\twinner\tend\tmoves\tms\tsequence\n')
+		for number, names, result, ms in simulate(args.games, args.black, args.white, args.seed,
+				args.size, args.variant, args.swap, args.display, args.opening):
+			out.write(logLine(number, names, result, ms) + '\n')
+			if (result['table']):
+				print(result['table'], file=sys.stderr)
+			winner = names[result['winner'].id - 1] if result['winner'] else 'draw'
+			wins[winner] = wins.get(winner, 0) + 1
+			moves += len(result['moves'])
+		elapsed = time.perf_counter() - started
+		out.write('# ' + ' '.join(f'{name}={count}' for name, count in sorted(wins.items()))
+			+ f' avg_moves={moves / max(1, args.games):.1f} games_per_s={args.games / elapsed:.1f}\n')
+	finally:
+		if (out is not sys.stdout):
+			out.close()
+
+	print(f"🎲 {args.games} games in {elapsed:.1f}s: "
+		+ ', '.join(f'{name} {count}' for name, count in sorted(wins.items())), file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,95 @@
+"""
+Utilitários compartilhados pelos testes: tabuleiros prontos e uma coleção
+do MongoDB em memória
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import Board, BLACK, WHITE
+
+
+def make_board(size, black=(), white=()):
+    """Tabuleiro ``size`` x ``size`` com as pedras (linha, coluna) de cada cor"""
+    board = Board(size)
+    for row, col in black:
+        board.place(board.index(row, col), BLACK)
+    for row, col in white:
+        board.place(board.index(row, col), WHITE)
+    return board
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda doc: doc[field])
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+
+class FakeCollection:
+    """Coleção em memória com o pouco da API do Motor que os serviços usam.
+
+    Documentos ficam em ``docs`` por ``_id``; ``updates`` guarda cada
+    atualização recebida, na ordem.
+    """
+
+    def __init__(self, docs=()):
+        self.docs = {doc["_id"]: dict(doc) for doc in docs}
+        self.updates = []
+
+    def find(self, query, projection=None):
+        after = query.get("_id", {}).get("$gt")
+        return FakeCursor([doc for key, doc in self.docs.items() if after is None or key > after])
+
+    async def find_one(self, query, projection=None):
+        doc = self.docs.get(query["_id"])
+        return dict(doc) if doc is not None else None
+
+    async def insert_one(self, doc):
+        doc.setdefault("_id", f"doc{len(self.docs) + 1}")
+        self.docs[doc["_id"]] = dict(doc)
+
+        class Result:
+            inserted_id = doc["_id"]
+        return Result()
+
+    async def update_one(self, query, update, upsert=False):
+        self.updates.append(update)
+        doc = self.docs.get(query.get("_id"))
+        inserted = doc is None and upsert
+        if inserted:
+            doc = self.docs[query["_id"]] = {"_id": query["_id"], **update.get("$setOnInsert", {})}
+        if doc is not None:
+            doc.update(update.get("$set", {}))
+
+        class Result:
+            upserted_id = query["_id"] if inserted else None
+        return Result()
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = dict(doc)
+
+    async def create_index(self, keys):
+        pass
+
+    async def bulk_write(self, operations, ordered=True):
+        class Result:
+            upserted_count = 0
+        for operation in operations:
+            key = operation._filter["_id"]
+            if key not in self.docs:
+                self.docs[key] = {"_id": key, **operation._doc["$setOnInsert"]}
+                Result.upserted_count += 1
+        return Result()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Testes para os perfis de dificuldade da IA (services.ai_profiles)
+"""
+
+import sys
+import os
+import json
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import Board, BLACK, WHITE
+from services.ai_profiles import DifficultyProfile, load_profiles
+from services.ai_service import AIService
+from services.game_logic import GameLogic
+from tests.helpers import FakeCollection
+
+
+class TestDifficultyProfiles:
+    """Testes da carga e derivação dos perfis"""
+
+    def test_builtin_tiers(self):
+        """As dificuldades de sempre existem como perfis"""
+        profiles = load_profiles()
+
+        assert {"easy", "medium", "hard", "mcts"} <= set(profiles)
+        assert profiles["easy"].noise == 1.0
+        assert profiles["medium"].engine == "heuristic"
+        assert profiles["hard"].engine in ("search", "mcts")
+
+    def test_file_overrides_and_adds_tiers(self, tmp_path):
+        """O arquivo de configuração ajusta campos e cria novas dificuldades"""
+        path = tmp_path / "profiles.json"
+        path.write_text(json.dumps({
+            "hard": {"time_limit": 0.5},
+            "expert": {"engine": "search", "max_depth": 10, "time_limit": 2.0, "book": True},
+        }))
+
+        profiles = load_profiles(str(path))
+
+        assert profiles["hard"].time_limit == 0.5
+        assert profiles["expert"].max_depth == 10
+        assert profiles["expert"].book
+
+    def test_file_read_once_until_changed(self, tmp_path, monkeypatch):
+        """O arquivo só é lido de novo quando muda"""
+        path = tmp_path / "profiles.json"
+        path.write_text(json.dumps({"hard": {"time_limit": 0.5}}))
+        reads = []
+        real_open = open
+        monkeypatch.setattr("builtins.open", lambda *args, **kwargs: reads.append(args[0]) or real_open(*args, **kwargs))
+
+        load_profiles(str(path))
+        load_profiles(str(path))
+        assert reads == [str(path)]
+
+        path.write_text(json.dumps({"hard": {"time_limit": 0.7}}))
+        os.utime(path, (0, 12345))
+        assert load_profiles(str(path))["hard"].time_limit == 0.7
+        assert len(reads) == 2
+
+    def test_rejects_invalid_profiles(self):
+        """Campos desconhecidos e motores inexistentes são recusados"""
+        with pytest.raises(ValueError):
+            DifficultyProfile.from_dict("x", {"depth": 3})
+        with pytest.raises(ValueError):
+            DifficultyProfile("x", engine="quantum")
+
+    def test_budget_caps_move_cost(self):
+        """O orçamento do pedido só reduz o custo do perfil"""
+        hard = DifficultyProfile("hard", engine="search", time_limit=0.3,
+                                 threat_solver=True, threat_time_limit=0.1)
+
+        capped = hard.with_budget(0.2)
+
+        assert capped.move_budget == pytest.approx(0.2)
+        assert capped.threat_time_limit == pytest.approx(0.05)
+        assert hard.with_budget(5.0) is hard
+
+    def test_scaled_sheds_depth(self):
+        """Sob carga o perfil perde tempo, nós e profundidade"""
+        hard = DifficultyProfile("hard", engine="search", max_depth=8, time_limit=0.4, node_limit=1000)
+
+        shed = hard.scaled(0.25)
+
+        assert shed.max_depth == 6
+        assert shed.time_limit == pytest.approx(0.1)
+        assert shed.node_limit == 250
+        assert hard.scaled(1.0) is hard
+
+
+class TestProfilesInUse:
+    """Testes do uso dos perfis pela GameLogic e pelo serviço"""
+
+    def test_game_logic_follows_profile(self):
+        """Um perfil de busca rasa limita a profundidade da IA"""
+        game_logic = GameLogic()
+        board = Board(15)
+        board.place(board.index(7, 7), BLACK)
+        board.place(board.index(7, 8), WHITE)
+        board.place(board.index(8, 8), BLACK)
+        shallow = DifficultyProfile("shallow", engine="search", max_depth=2, time_limit=5.0)
+
+        move = game_logic.get_ai_move(board, shallow)
+
+        assert board.is_empty(board.index(move.row, move.col))
+        assert game_logic.last_search.depth == 2
+
+    def test_service_sheds_under_load(self):
+        """Com a fila cheia o serviço reduz o orçamento dos pedidos"""
+        service = AIService(workers=1, max_queue=16)
+        service.shed_queue = 2
+
+        assert service.load_factor() == 1.0
+        service._pending = 8
+        profile = service._profile("hard", None)
+
+        assert service.load_factor() == pytest.approx(0.25)
+        assert profile.time_limit < service.profiles["hard"].time_limit
+        assert service.stats()["shed"] == 1
+        # Os perfis heurísticos não têm o que cortar
+        assert service._profile("medium", None) is service.profiles["medium"]
+
+    def test_create_game_accepts_profile_tiers(self, monkeypatch):
+        """A criação de partida PvE aceita qualquer dificuldade carregada dos perfis"""
+        from fastapi import HTTPException
+        from routers import games
+
+        collection = FakeCollection()
+
+        async def get_collection(name):
+            return collection
+
+        monkeypatch.setattr(games, "get_collection", get_collection)
+        monkeypatch.setitem(games.ai_service.profiles, "expert", DifficultyProfile("expert", engine="search"))
+        user = SimpleNamespace(id="user1", username="player", email="player@example.com")
+
+        for difficulty in ("mcts", "expert"):
+            request = games.CreateGameRequest(mode="pve", difficulty=difficulty)
+            game = asyncio.run(games.create_game(request, user))
+            assert collection.docs[game.id]["difficulty"] == difficulty
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(games.create_game(games.CreateGameRequest(mode="pve", difficulty="impossible"), user))
+        assert error.value.status_code == 400
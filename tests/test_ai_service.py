@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Testes para o pool de workers da IA (services.ai_service)
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import Board, BLACK, WHITE
+from services.game_logic import GameLogic
+from services.ai_service import (
+    AIService, AIServiceBusy, AIMoveTimeout, AIMoveCancelled, _likely_replies,
+)
+
+
+def _board():
+    board = Board(15)
+    board.place(board.index(7, 7), BLACK)
+    board.place(board.index(7, 8), WHITE)
+    board.place(board.index(8, 8), BLACK)
+    return board
+
+
+class TestAIService:
+    """Testes da fachada assíncrona do pool de processos"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.service = AIService(workers=1, max_queue=2, deadline=10)
+
+    def teardown_method(self):
+        self.service.stop()
+
+    def test_move_with_metrics(self):
+        """A jogada volta com tempos de fila e de cálculo"""
+        board = _board()
+
+        move = asyncio.run(self.service.get_move(board, "hard", budget=0.05))
+
+        assert board.is_empty(board.index(move.position.row, move.position.col))
+        assert move.compute_time > 0
+        assert move.queue_time >= 0
+        stats = self.service.stats()
+        assert stats["completed"] == 1
+        assert stats["pending"] == 0
+        assert stats["compute"]["max_ms"] > 0
+
+    def test_move_for_black(self):
+        """O serviço também calcula jogadas das pretas (dicas)"""
+        board = Board(15)
+        for col in range(3, 7):
+            board.place(board.index(7, col), BLACK)
+        board.place(board.index(7, 2), WHITE)
+        board.place(board.index(0, 0), WHITE)
+        board.place(board.index(0, 14), WHITE)
+
+        move = asyncio.run(self.service.get_move(board, "medium", color=BLACK))
+
+        assert (move.position.row, move.position.col) == (7, 7)
+
+    def test_queue_is_bounded(self):
+        """Pedidos além do limite da fila são rejeitados"""
+        async def scenario():
+            first = asyncio.ensure_future(self.service.get_move(_board(), "hard", budget=0.2))
+            second = asyncio.ensure_future(self.service.get_move(_board(), "hard", budget=0.2))
+            await asyncio.sleep(0)
+            with pytest.raises(AIServiceBusy):
+                await self.service.get_move(_board(), "medium")
+            await asyncio.gather(first, second)
+
+        asyncio.run(scenario())
+        assert self.service.stats()["rejected"] == 1
+
+    def test_deadline(self):
+        """Um pedido que não fica pronto no prazo expira"""
+        with pytest.raises(AIMoveTimeout):
+            asyncio.run(self.service.get_move(_board(), "hard", budget=1.0, deadline=0.05))
+
+        assert self.service.stats()["timed_out"] == 1
+
+    def test_cancel_when_game_ends(self):
+        """Encerrar a partida cancela os pedidos pendentes dela"""
+        async def scenario():
+            running = asyncio.ensure_future(self.service.get_move(_board(), "hard", budget=0.3, game_id="a"))
+            queued = asyncio.ensure_future(self.service.get_move(_board(), "hard", budget=0.3, game_id="b"))
+            await asyncio.sleep(0.05)
+            assert self.service.cancel_game("b") == 1
+            with pytest.raises(AIMoveCancelled):
+                await queued
+            return await running
+
+        move = asyncio.run(scenario())
+
+        assert move.position is not None
+        assert self.service.stats()["cancelled"] == 1
+
+    def test_medium_requests_are_batched(self):
+        """Pedidos médios simultâneos vão juntos para um worker"""
+        boards = []
+        for offset in range(6):
+            board = _board()
+            board.place(board.index(3, offset), BLACK)
+            boards.append(board)
+
+        async def scenario():
+            return await asyncio.gather(*(self.service.get_move(board, "medium") for board in boards))
+
+        self.service.max_queue = 8
+        moves = asyncio.run(scenario())
+
+        expected = GameLogic().get_ai_moves(boards, "medium")
+        assert [(m.position.row, m.position.col) for m in moves] == [(p.row, p.col) for p in expected]
+        stats = self.service.stats()
+        assert stats["batches"] == 1
+        assert stats["avg_batch_size"] == 6
+
+
+class TestPondering:
+    """Testes da busca no tempo do adversário"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.service = AIService(workers=1, deadline=10, ponder_moves=2)
+
+    def teardown_method(self):
+        self.service.stop()
+
+    def test_reply_served_from_cache(self):
+        """A resposta à jogada prevista sai do cache da ponderação"""
+        board = _board()
+        position = board.copy()
+        position.place(_likely_replies(board, 1)[0], BLACK)
+
+        async def scenario():
+            assert self.service.start_pondering("g", board, "medium")
+            await self.service._ponders["g"].task
+            return await self.service.get_move(position, "medium", game_id="g")
+
+        move = asyncio.run(scenario())
+
+        assert move.pondered
+        assert move.compute_time == 0
+        expected = GameLogic().get_ai_move(position, "medium")
+        assert (move.position.row, move.position.col) == (expected.row, expected.col)
+        assert self.service.stats()["ponder_hits"] == 1
+        assert not self.service.is_pondering("g")
+
+    def test_real_move_not_queued_behind_pondering(self):
+        """Uma jogada de verdade não espera pelo trabalho da ponderação"""
+        async def scenario():
+            await self.service.get_move(_board(), "medium")  # processos já iniciados
+            assert self.service.start_pondering("g", _board(), "hard", budget=0.5)
+            while self.service.stats()["ponder_jobs"] == 0:
+                await asyncio.sleep(0.01)
+            # Só há um processo de ponderação: a outra partida não pondera
+            assert not self.service.start_pondering("h", _board(), "hard")
+            move = await self.service.get_move(_board(), "medium", game_id="x")
+            self.service.cancel_game("g")
+            return move
+
+        move = asyncio.run(scenario())
+
+        assert move.queue_time < 0.2
+        assert self.service.stats()["ponder_workers"] == 1
+
+    def test_cancelled_when_game_ends(self):
+        """Fim de jogo cancela a ponderação"""
+        async def scenario():
+            board = Board(15)
+            board.place(board.index(7, 7), BLACK)
+            board.place(board.index(7, 8), WHITE)
+            self.service.start_pondering("g", board, "hard", budget=0.5)
+            await asyncio.sleep(0.05)
+            task = self.service._ponders["g"].task
+            self.service.cancel_game("g")
+            await asyncio.sleep(0)
+            return task
+
+        task = asyncio.run(scenario())
+
+        assert task.cancelled()
+        assert not self.service.is_pondering("g")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Testes para a análise pós-jogo (services.analysis_service)
+"""
+
+import sys
+import os
+import asyncio
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from bson import ObjectId
+
+from services import analysis_service as module
+from services.analysis_service import (
+    AnalysisService, analyze_moves, game_moves, BEST, GOOD, BLUNDER, MISSED_WIN, DONE, QUEUED,
+)
+from tests.helpers import FakeCollection
+
+# Pretas fazem um quatro aberto, esquecem de vencer uma vez e vencem depois
+SEQUENCE = [(7, 3), (0, 0), (7, 4), (0, 14), (7, 5), (14, 0), (10, 10), (1, 1), (7, 6)]
+MOVES = [(row, col, "black" if ply % 2 == 0 else "white") for ply, (row, col) in enumerate(SEQUENCE)]
+
+
+class TestAnalyzeMoves:
+    """Testes da anotação das jogadas"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.analysis = analyze_moves(MOVES, 15, max_depth=3, time_limit=0.05)
+
+    def test_labels(self):
+        """Vitória perdida, erro grave e a jogada vencedora são reconhecidos"""
+        labels = [move["label"] for move in self.analysis["moves"]]
+
+        assert labels[6] == MISSED_WIN
+        assert self.analysis["moves"][6]["best"] == [7, 6]
+        assert labels[5] == BLUNDER
+        assert labels[8] == BEST
+
+    def test_summary(self):
+        """O resumo conta os rótulos por cor"""
+        summary = self.analysis["summary"]
+
+        assert summary["black"]["moves"] == 5 and summary["white"]["moves"] == 4
+        assert summary["black"][MISSED_WIN] == 1
+        assert 0 <= summary["white"]["accuracy"] <= 100
+
+    def test_four_and_forced_block(self):
+        """Fazer um quatro é bom, ignorá-lo é um erro grave"""
+        cells = [110, 66, 124, 79, 130, 145, 126, 70, 80, 113, 95, 65, 125]
+        opening = [(cell // 15, cell % 15, "black" if ply % 2 == 0 else "white") for ply, cell in enumerate(cells)]
+
+        # Pretas fazem um quatro que começa uma vitória por quatros (VCF)
+        blocked = analyze_moves(opening + [(9, 5, "white")], 15, max_depth=3, time_limit=0.05)["moves"]
+        assert blocked[12]["label"] in (BEST, GOOD)
+        assert blocked[13]["label"] == BEST and blocked[13]["best"] == [9, 5]
+
+        # Brancas não bloqueiam o quatro
+        ignored = analyze_moves(opening + [(0, 0, "white"), (9, 5, "black")], 15,
+                                max_depth=3, time_limit=0.05)["moves"]
+        assert ignored[13]["label"] == BLUNDER
+        assert ignored[13]["best"] == [9, 5]
+        assert ignored[13]["score"] < 0 < ignored[13]["loss"]
+
+    def test_stops_at_invalid_move(self):
+        """Jogadas inválidas encerram a análise sem erro"""
+        analysis = analyze_moves(MOVES[:2] + [(7, 3, "black")], 15, max_depth=2, time_limit=0.05)
+
+        assert len(analysis["moves"]) == 2
+
+
+class TestAnalysisService:
+    """Testes da fila de análises e do cache por partida"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.game_id = str(ObjectId())
+        game = {"_id": ObjectId(self.game_id), "board": [[None] * 15 for _ in range(15)],
+                "status": "finished", "moves": [{"row": r, "col": c, "player": p} for r, c, p in MOVES[:4]]}
+        self.collections = {
+            "games": FakeCollection([game]),
+            "analysis_jobs": FakeCollection(),
+            "analyses": FakeCollection(),
+        }
+        self.service = AnalysisService(workers=1)
+        self.service.settings.update(max_depth=2, time_limit=0.02)
+
+    def _patch(self, monkeypatch):
+        async def get_collection(name):
+            return self.collections[name]
+
+        monkeypatch.setattr(module, "get_collection", get_collection)
+
+    def test_game_moves(self):
+        """As jogadas do documento viram tuplas (linha, coluna, cor)"""
+        game = {"moves": [{"row": 7, "col": 7, "player": "black", "timestamp": None}]}
+
+        assert game_moves(game) == [(7, 7, "black")]
+
+    def test_enqueue_once(self, monkeypatch):
+        """Uma partida entra na fila uma única vez"""
+        self._patch(monkeypatch)
+
+        first = asyncio.run(self.service.enqueue(self.game_id))
+        second = asyncio.run(self.service.enqueue(self.game_id))
+
+        assert first["status"] == second["status"] == QUEUED
+        assert self.service.counters["enqueued"] == 1
+
+    def test_processed_analysis_is_cached(self, monkeypatch):
+        """O resultado é gravado por partida e as leituras seguintes vêm da memória"""
+        self._patch(monkeypatch)
+        job = {"_id": self.game_id, "status": "running", "attempts": 1}
+        self.collections["analysis_jobs"].docs[self.game_id] = dict(job)
+
+        analysis = asyncio.run(self.service.process(job))
+
+        assert len(analysis["moves"]) == 4
+        assert self.collections["analysis_jobs"].docs[self.game_id]["status"] == DONE
+        assert self.collections["games"].docs[ObjectId(self.game_id)]["analysis"] == DONE
+        assert self.game_id in self.collections["analyses"].docs
+
+        fresh = AnalysisService(workers=1)
+        assert asyncio.run(fresh.get_analysis(self.game_id))["game_id"] == self.game_id
+        assert asyncio.run(fresh.get_analysis(self.game_id)) is not None
+        assert (fresh.counters["cache_misses"], fresh.counters["cache_hits"]) == (1, 1)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Testes para a arena de autojogo (services.arena)
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import Board, BLACK, WHITE
+from services.arena import parse_contender, random_opening, run_arena, summarize, compare
+from services.game_logic import GameLogic
+
+
+def _game(winner, black, white, latency=0.01):
+    side = {"moves": 1, "nodes": 100, "search_time": 0.01, "latencies": [latency]}
+    return {"moves": [0], "winner": winner, "black": {"profile": black, **side},
+            "white": {"profile": white, **side}, "peak_memory_kb": None, "peak_rss_kb": None}
+
+
+class TestArena:
+    """Testes das partidas IA contra IA"""
+
+    def test_parse_contender_overrides(self):
+        """Uma dificuldade pode ser ajustada campo a campo"""
+        profile = parse_contender("hard:max_depth=3,engine=mcts,book=false")
+
+        assert profile.name == "hard:max_depth=3,engine=mcts,book=false"
+        assert profile.max_depth == 3 and profile.engine == "mcts" and not profile.book
+        with pytest.raises(ValueError):
+            parse_contender("impossible")
+        with pytest.raises(ValueError):
+            parse_contender("hard:depth=3")
+
+    def test_random_opening_is_reproducible(self):
+        """A abertura depende só da semente"""
+        opening = random_opening(15, 3, seed=4)
+
+        assert opening == random_opening(15, 3, seed=4)
+        assert len(set(opening)) == 3
+
+    def test_ai_plays_either_color(self):
+        """A IA também joga de pretas"""
+        board = Board(15)
+        for col in range(3, 7):
+            board.place(board.index(7, col), BLACK)
+        board.place(board.index(7, 2), WHITE)
+
+        cell = GameLogic().get_ai_cell(board, "medium", BLACK)
+
+        assert cell == board.index(7, 7)
+
+    def test_run_arena_report(self):
+        """O relatório traz placar, velocidade e as partidas em pares de cores trocadas"""
+        report = run_arena("medium", "easy", games=4, workers=1, size=9, seed=1)
+
+        summary = report["summary"]
+        assert summary["games"] == 4
+        assert summary["wins"] + summary["draws"] + summary["losses"] == 4
+        assert set(summary["contenders"]) == {"medium", "easy"}
+        assert [game["black"] for game in report["games"]] == ["medium", "easy", "medium", "easy"]
+        assert report["games"][0]["moves"][:2] == report["games"][1]["moves"][:2]
+        json.dumps(report)
+
+    def test_summary_statistics(self):
+        """Pontuação, intervalo de confiança e latências"""
+        games = [_game("black", "a", "b"), _game("white", "b", "a"),
+                 _game(None, "a", "b"), _game("black", "b", "a", latency=0.5)]
+
+        summary = summarize(games, "a", "b")
+
+        assert (summary["wins"], summary["draws"], summary["losses"]) == (2, 1, 1)
+        assert summary["score"] == pytest.approx(0.625)
+        low, high = summary["score_ci95"]
+        assert low < 0.625 < high
+        assert summary["elo"] > 0
+        assert summary["contenders"]["a"]["p99_latency_ms"] == pytest.approx(500.0)
+        assert summary["contenders"]["a"]["nodes_per_second"] == 10000
+
+        # Uma varredura curta não tem intervalo de largura zero
+        sweep = summarize([_game("black", "a", "b"), _game("white", "b", "a")] * 2, "a", "b")
+        assert sweep["score"] == 1.0
+        assert 0.4 < sweep["score_ci95"][0] < 1.0 == sweep["score_ci95"][1]
+        assert sweep["elo_ci95"][0] is not None and sweep["elo_ci95"][1] is None
+
+        other = {"commit": "x", "summary": summarize(games[:2], "a", "b")}
+        assert compare(other, {"commit": "y", "summary": summary})["score"] == [1.0, 0.625]
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Testes para o tabuleiro em bitboard (logic.board.Board)
+"""
+
+import sys
+import os
+import pickle
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import Board, BLACK, WHITE, iter_bits
+from logic.game_logic import check_win
+from services.game_logic import GameLogic
+from models.game import Position, PieceColor
+
+
+class TestBoard:
+    """Testes do tabuleiro compacto"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.rows = [[None for _ in range(19)] for _ in range(19)]
+
+    def test_rows_round_trip(self):
+        """Conversão lista-de-listas <-> bitboard preserva as peças"""
+        self.rows[0][0] = "black"
+        self.rows[9][9] = "white"
+        self.rows[18][18] = PieceColor.BLACK
+
+        board = Board.from_rows(self.rows)
+
+        assert board.size == 19
+        assert board.move_count == 3
+        rows = board.to_rows()
+        assert rows[0][0] == "black"
+        assert rows[9][9] == "white"
+        assert rows[18][18] == "black"
+        assert sum(cell is not None for row in rows for cell in row) == 3
+
+    def test_from_mongo_document(self):
+        """Tabuleiro pode ser reconstruído a partir dos movimentos salvos"""
+        doc = {"moves": [
+            {"row": 7, "col": 7, "player": "black"},
+            {"position": {"row": 7, "col": 8}, "piece": "white"},
+        ]}
+
+        board = Board.from_document(doc, size=15)
+
+        assert board.size == 15
+        assert board.color_at(board.index(7, 7)) == BLACK
+        assert board.color_at(board.index(7, 8)) == WHITE
+
+    def test_pickle_round_trip(self):
+        """O tabuleiro vai para os workers como as duas máscaras"""
+        board = Board(15)
+        board.place(board.index(7, 7), BLACK)
+        board.place(board.index(7, 8), WHITE)
+
+        clone = pickle.loads(pickle.dumps(board))
+
+        assert clone.bits == board.bits
+        assert clone.key == board.key
+        assert clone.frontier == board.frontier
+
+    def test_five_in_all_directions(self):
+        """Cinco em linha é detectado nas quatro direções"""
+        lines = [
+            [(9, 5 + i) for i in range(5)],
+            [(5 + i, 9) for i in range(5)],
+            [(5 + i, 5 + i) for i in range(5)],
+            [(5 + i, 13 - i) for i in range(5)],
+        ]
+        for line in lines:
+            board = Board(19)
+            for row, col in line[:4]:
+                board.place(board.index(row, col), BLACK)
+            assert not board.has_five(BLACK)
+
+            row, col = line[4]
+            board.place(board.index(row, col), BLACK)
+            assert board.has_five(BLACK)
+            assert board.is_five_at(board.index(row, col), BLACK)
+            assert check_win(board, row, col) == "black"
+
+    def test_no_wrap_between_rows(self):
+        """Peças no fim de uma linha e início da próxima não formam sequência"""
+        board = Board(19)
+        for col in (16, 17, 18):
+            board.place(board.index(4, col), WHITE)
+        for col in (0, 1):
+            board.place(board.index(5, col), WHITE)
+
+        assert not board.has_five(WHITE)
+        assert check_win(board, 5, 1) is None
+
+    def test_winning_cells(self):
+        """Casas vencedoras são encontradas sem simular cada jogada"""
+        board = Board(19)
+        for col in (5, 6, 8, 9):
+            board.place(board.index(10, col), WHITE)
+
+        cells = list(iter_bits(board.winning_cells(WHITE)))
+
+        assert cells == [board.index(10, 7)]
+        assert board.winning_cells(BLACK) == 0
+
+    def test_pattern_count(self):
+        """Padrões são contados por shift-and-mask"""
+        board = Board(15)
+        for col in (5, 6, 7):
+            board.place(board.index(7, col), BLACK)
+
+        assert board.count("_xxx_", BLACK) == 1
+        assert board.count("_xxxx_", BLACK) == 0
+        assert board.evaluate(BLACK) > 0
+        assert board.evaluate(WHITE) < 0
+
+    def test_game_logic_accepts_board(self):
+        """GameLogic continua funcionando com o novo tabuleiro"""
+        game_logic = GameLogic()
+        board = Board(19)
+
+        for col in range(5):
+            assert game_logic.make_move(board, Position(row=3, col=col), PieceColor.BLACK)
+
+        assert not game_logic.make_move(board, Position(row=3, col=0), PieceColor.WHITE)
+        assert game_logic.check_winner(board, Position(row=3, col=4), PieceColor.BLACK) == PieceColor.BLACK
+        assert not game_logic.is_board_full(board)
+
+    def test_apply_and_undo_move(self):
+        """Fazer/desfazer jogadas altera o tabuleiro no próprio lugar"""
+        game_logic = GameLogic()
+        board = Board(19)
+        position = Position(row=4, col=4)
+
+        for target in (self.rows, board):
+            game_logic.apply_move(target, position, PieceColor.WHITE)
+            assert not game_logic.is_valid_move(target, position)
+            game_logic.undo_move(target, position)
+            assert game_logic.is_valid_move(target, position)
+
+        assert board.key == 0
+
+    def test_winning_move_search_leaves_board_intact(self):
+        """A busca por jogada vencedora não copia nem altera o tabuleiro"""
+        game_logic = GameLogic()
+        for col in range(5, 9):
+            self.rows[10][col] = "white"
+        snapshot = [row[:] for row in self.rows]
+
+        move = game_logic._find_winning_move(self.rows, PieceColor.WHITE)
+
+        assert (move.row, move.col) in [(10, 4), (10, 9)]
+        assert self.rows == snapshot
+
+    def test_frontier_tracks_moves_and_undo(self):
+        """O conjunto de candidatas acompanha jogadas e desfazimentos"""
+        board = Board(15)
+
+        def brute_force():
+            mask = 0
+            for index in range(15 * 15):
+                if not board.is_empty(index):
+                    continue
+                row, col = board.coords(index)
+                for r in range(row - 2, row + 3):
+                    for c in range(col - 2, col + 3):
+                        if board.in_bounds(r, c) and not board.is_empty(board.index(r, c)):
+                            mask |= 1 << index
+            return mask
+
+        assert board.frontier == 0
+        for row, col, color in [(7, 7, BLACK), (7, 8, WHITE), (0, 0, BLACK), (8, 9, WHITE)]:
+            board.place(board.index(row, col), color)
+            assert board.frontier == brute_force()
+
+        board.remove(board.index(7, 8))
+        board.remove(board.index(0, 0))
+        assert board.frontier == brute_force()
+        assert board.copy().frontier == board.frontier
+
+    def test_ai_candidates_come_from_frontier(self):
+        """As IAs fácil e média jogam perto das peças existentes"""
+        game_logic = GameLogic()
+        self.rows[3][15] = "black"
+
+        for difficulty in ("easy", "medium"):
+            move = game_logic.get_ai_move(self.rows, difficulty)
+            assert abs(move.row - 3) <= 2 and abs(move.col - 15) <= 2
+
+    def test_ai_cell_matches_ai_move(self):
+        """A IA trabalha com índices de casa; a Position só é criada na saída"""
+        game_logic = GameLogic()
+        game_logic.use_vectorized = False
+        for col in range(5, 8):
+            self.rows[9][col] = "black"
+        board = Board.from_rows(self.rows)
+
+        cell = game_logic.get_ai_cell(board, "medium")
+        move = game_logic.get_ai_move(self.rows, "medium")
+
+        assert isinstance(cell, int)
+        assert board.coords(cell) == (move.row, move.col)
+        assert game_logic.get_ai_cells([board, board], "medium") == [cell, cell]
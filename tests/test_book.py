@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Testes para o livro de aberturas (logic.book)
+"""
+
+import sys
+import os
+
+import pytest
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import Board, BLACK, WHITE
+from logic.book import OpeningBook, build_book, write_book, lines_from_games, default_book
+from logic.rules import get_rules, FREESTYLE, RENJU
+from services.game_logic import GameLogic
+
+
+def _cell(row, col, size=15):
+    return row * size + col
+
+
+class TestOpeningBook:
+    """Testes do formato binário e da busca no livro"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.lines = [
+            [_cell(7, 7), _cell(7, 8), _cell(8, 8)],
+            [_cell(7, 7), _cell(7, 8), _cell(6, 6)],
+            [_cell(7, 7), _cell(8, 8)],
+        ]
+
+    def test_round_trip_and_weights(self, tmp_path):
+        """Gravação e leitura preservam as jogadas, a mais frequente primeiro"""
+        entries = build_book(self.lines, 15)
+
+        empty = Board(15)
+        assert entries[empty.key][_cell(7, 7)] == 3
+
+        path = str(tmp_path / "book.bin")
+        count = write_book(path, entries, 15)
+        book = OpeningBook(path)
+        try:
+            assert len(book) == count
+            board = Board(15)
+            board.place(_cell(7, 7), BLACK)
+            assert book.lookup(board.key) == [(_cell(7, 8), 2), (_cell(8, 8), 1)]
+            assert book.probe(board) == _cell(7, 8)
+            assert book.lookup(12345) == []
+        finally:
+            book.close()
+
+    def test_probe_ignores_other_sizes(self, tmp_path):
+        """Tabuleiros de outro tamanho não usam o livro"""
+        path = str(tmp_path / "book.bin")
+        write_book(path, build_book(self.lines, 15), 15)
+        book = OpeningBook(path)
+        try:
+            assert book.probe(Board(15)) == _cell(7, 7)
+            assert book.probe(Board(19)) is None
+        finally:
+            book.close()
+
+    def test_rejects_other_files(self, tmp_path):
+        """Arquivos que não são livros são recusados"""
+        path = tmp_path / "not_a_book.bin"
+        path.write_bytes(b"not a book at all")
+
+        with pytest.raises(ValueError):
+            OpeningBook(str(path))
+
+    def test_lines_from_games(self):
+        """Partidas salvas viram sequências de jogadas"""
+        games = [
+            {"moves": [{"row": 7, "col": 7, "player": "black"}, {"row": 7, "col": 8, "player": "white"}]},
+            {"board": [[None] * 19 for _ in range(19)], "moves": [{"row": 9, "col": 9, "player": "black"}]},
+        ]
+
+        assert lines_from_games(games, 15) == [[_cell(7, 7), _cell(7, 8)]]
+
+    def test_lines_from_games_filters_variant(self):
+        """Com uma variante pedida, partidas de outras regras são ignoradas"""
+        games = [
+            {"variant": RENJU, "moves": [{"row": 7, "col": 7, "player": "black"}]},
+            {"variant": FREESTYLE, "moves": [{"row": 6, "col": 6, "player": "black"}]},
+        ]
+
+        assert lines_from_games(games, 15, FREESTYLE) == [[_cell(6, 6)]]
+        assert len(lines_from_games(games, 15)) == 2
+
+    def test_probe_skips_forbidden_moves(self, tmp_path):
+        """No Renju, o livro não sugere às pretas uma jogada proibida"""
+        line = [_cell(7, 5), _cell(0, 0), _cell(7, 6), _cell(0, 2),
+                _cell(5, 7), _cell(14, 14), _cell(6, 7), _cell(14, 12), _cell(7, 7)]
+        path = str(tmp_path / "book.bin")
+        write_book(path, build_book([line], 15), 15)
+        book = OpeningBook(path)
+        try:
+            for rules in (get_rules(15, FREESTYLE), get_rules(15, RENJU)):
+                board = rules.new_board()
+                for ply, move in enumerate(line[:-1]):
+                    board.place(move, BLACK if ply % 2 == 0 else WHITE)
+                expected = _cell(7, 7) if rules.variant == FREESTYLE else None
+                assert book.probe(board) == expected
+        finally:
+            book.close()
+
+    def test_hard_ai_plays_from_book(self):
+        """A IA difícil responde a abertura pelo livro, sem busca"""
+        if default_book(15) is None:
+            pytest.skip("livro de aberturas não gerado")
+        game_logic = GameLogic()
+        board = Board(15)
+        board.place(_cell(7, 7), BLACK)
+
+        move = game_logic.get_ai_move(board, "hard")
+
+        assert board.is_empty(board.index(move.row, move.col))
+        assert game_logic.last_search is None
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Testes para a busca Monte Carlo (logic.mcts)
+"""
+
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import WHITE
+from logic.mcts import MCTSEngine
+from services.game_logic import GameLogic
+from tests.helpers import make_board
+
+
+class TestMCTSEngine:
+    """Testes do motor PUCT"""
+
+    def test_takes_immediate_win(self):
+        """O MCTS completa cinco em linha quando possível"""
+        board = make_board(15, black=[(3, 3), (4, 4), (12, 1)], white=[(7, 3), (7, 4), (7, 5), (7, 6)])
+
+        result = MCTSEngine(playout_limit=50, time_limit=None, seed=1).search(board, WHITE)
+
+        assert board.coords(result.move) in [(7, 2), (7, 7)]
+
+    def test_blocks_four(self):
+        """O MCTS bloqueia a quatro do adversário"""
+        board = make_board(15, black=[(7, 5), (7, 6), (7, 7), (7, 8)], white=[(7, 4), (8, 8), (9, 9)])
+
+        result = MCTSEngine(playout_limit=100, time_limit=None, seed=1).search(board, WHITE)
+
+        assert board.coords(result.move) == (7, 9)
+
+    def test_playout_budget_and_board_restored(self):
+        """O orçamento de playouts é respeitado e o tabuleiro volta ao estado original"""
+        board = make_board(15, black=[(7, 7), (6, 6)], white=[(7, 8)])
+        before = (list(board.bits), board.key, board.frontier)
+
+        result = MCTSEngine(playout_limit=200, time_limit=None, seed=1).search(board, WHITE)
+
+        assert result.nodes == 200
+        assert result.completed
+        assert result.depth >= 2
+        assert board.is_empty(result.move)
+        assert (list(board.bits), board.key, board.frontier) == before
+
+    def test_respects_time_budget(self):
+        """Cada chamada retorna dentro do orçamento de tempo"""
+        board = make_board(19, black=[(9, 9), (10, 10), (8, 11)], white=[(9, 10), (10, 9)])
+
+        start = time.perf_counter()
+        result = MCTSEngine(time_limit=0.2).search(board, WHITE)
+
+        assert time.perf_counter() - start < 0.2 + 0.15
+        assert result.nodes > 0
+
+    def test_root_parallel_merges_trees(self):
+        """Árvores paralelas somam os playouts na raiz"""
+        board = make_board(15, black=[(7, 7), (6, 6)], white=[(7, 8)])
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            engine = MCTSEngine(playout_limit=90, time_limit=None, workers=3, executor=executor, seed=1)
+            result = engine.search(board, WHITE)
+
+        assert result.nodes == 90
+        assert board.is_empty(result.move)
+
+    def test_requires_budget(self):
+        """Sem orçamento de tempo nem de playouts o motor não é criado"""
+        with pytest.raises(ValueError):
+            MCTSEngine(time_limit=None, playout_limit=None)
+
+
+class TestMCTSBackend:
+    """Testes da seleção do MCTS na GameLogic"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.game_logic = GameLogic()
+        self.game_logic.use_book = False
+        self.game_logic.use_threat_solver = False
+        self.game_logic.profiles["mcts"] = self.game_logic.profiles["mcts"].replace(playouts=100)
+
+    def test_selected_by_difficulty(self):
+        """A dificuldade "mcts" usa o motor Monte Carlo"""
+        board = make_board(15, black=[(7, 7), (6, 6)], white=[(7, 8)]).to_rows()
+
+        move = self.game_logic.get_ai_move(board, "mcts")
+
+        assert board[move.row][move.col] is None
+        assert self.game_logic.last_search.nodes == 100
+
+    def test_selected_by_config(self):
+        """O perfil da dificuldade difícil pode usar o MCTS como motor"""
+        self.game_logic.profiles["hard"] = self.game_logic.profiles["hard"].replace(engine="mcts", playouts=100)
+        board = make_board(15, black=[(7, 7), (6, 6)], white=[(7, 8)])
+
+        self.game_logic.get_ai_move(board, "hard")
+
+        assert self.game_logic.last_search.nodes == 100
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Testes para a tabela de padrões e o avaliador incremental (logic.patterns)
+"""
+
+import sys
+import os
+import random
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import Board, BLACK, WHITE
+from logic.patterns import (
+    PatternEvaluator, FIVE, OPEN_FOUR, FOUR, OPEN_THREE, THREE, FORCED_WIN,
+)
+
+
+def _place(board, color, cells):
+    for row, col in cells:
+        board.place(board.index(row, col), color)
+
+
+class TestPatternEvaluator:
+    """Testes do avaliador por padrões de linha"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.board = Board(15)
+        self.evaluator = PatternEvaluator(self.board).attach()
+
+    def test_move_classification(self):
+        """A tabela classifica cinco, quatro aberta, quatro e três"""
+        _place(self.board, BLACK, [(7, 5), (7, 6), (7, 7)])
+
+        assert self.evaluator.move_patterns(self.board.index(7, 8), BLACK)[0] == OPEN_FOUR
+
+        _place(self.board, BLACK, [(3, 10), (4, 10)])
+        assert self.evaluator.move_patterns(self.board.index(5, 10), BLACK)[1] == OPEN_THREE
+
+        _place(self.board, WHITE, [(7, 4)])
+        assert self.evaluator.move_patterns(self.board.index(7, 8), BLACK)[0] == FOUR
+
+        _place(self.board, BLACK, [(7, 8)])
+        assert self.evaluator.move_patterns(self.board.index(7, 9), BLACK)[0] == FIVE
+
+    def test_board_edge_blocks_patterns(self):
+        """A borda do tabuleiro conta como bloqueio"""
+        _place(self.board, WHITE, [(0, 0), (0, 1)])
+
+        assert self.evaluator.move_patterns(self.board.index(0, 2), WHITE)[0] == THREE
+
+    def test_incremental_counts_match_rebuild(self):
+        """Contagens incrementais batem com uma reconstrução do zero"""
+        rng = random.Random(7)
+        played = []
+        for step in range(60):
+            if played and rng.random() < 0.3:
+                self.board.remove(played.pop())
+            else:
+                index = rng.choice([i for i in range(15 * 15) if self.board.is_empty(i)])
+                self.board.place(index, BLACK if step % 2 else WHITE)
+                played.append(index)
+
+            rebuilt = PatternEvaluator(self.board)
+            assert rebuilt.counts == self.evaluator.counts
+
+    def test_evaluate_sees_forced_wins(self):
+        """A avaliação reconhece quatro para o lado que joga"""
+        _place(self.board, WHITE, [(3, 3), (3, 4), (3, 5), (3, 6)])
+        _place(self.board, BLACK, [(3, 2)])
+
+        assert self.evaluator.evaluate(WHITE) == FORCED_WIN
+        assert self.evaluator.evaluate(BLACK) < FORCED_WIN
+
+    def test_detach_stops_updates(self):
+        """Depois de desanexado o avaliador não recebe mais jogadas"""
+        self.evaluator.detach()
+        _place(self.board, BLACK, [(7, 7)])
+
+        assert sum(self.evaluator.counts[BLACK]) == 0
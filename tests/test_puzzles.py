@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Testes para a mineração de quebra-cabeças (services.puzzles)
+"""
+
+import sys
+import os
+import asyncio
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from services import puzzles as module
+from services.puzzles import game_cells, mine_chunk, mine_game, mine_puzzles, rate_puzzle
+from tests.helpers import FakeCollection
+
+# Brancas não bloqueiam o três aberto das pretas, que vencem em duas jogadas
+SEQUENCE = [(7, 5), (0, 0), (7, 6), (0, 2), (7, 7), (0, 4), (7, 8), (7, 9), (7, 4)]
+
+
+def _game(game_id, mirror=False):
+    return {
+        "_id": game_id,
+        "board": [[None] * 15 for _ in range(15)],
+        "moves": [{"row": row, "col": 14 - col if mirror else col, "player": "black" if ply % 2 == 0 else "white"}
+                  for ply, (row, col) in enumerate(SEQUENCE)],
+    }
+
+
+class TestMining:
+    """Testes da extração de posições de vitória forçada"""
+
+    def test_win_in_two(self):
+        """O três aberto não bloqueado vira um quebra-cabeça de vitória em duas"""
+        puzzles = mine_game(game_cells(_game(1), 15), 15, game_id="1")
+
+        assert len(puzzles) == 1
+        puzzle = puzzles[0]
+        assert puzzle["to_move"] == "black" and puzzle["moves"] == 2
+        assert puzzle["source"] == {"game_id": "1", "ply": 6}
+        assert [move["player"] for move in puzzle["solution"]] == ["black", "black"]
+        assert len(puzzle["black"]) == 3 and len(puzzle["white"]) == 3
+
+    def test_min_moves(self):
+        """Vitórias curtas demais são ignoradas"""
+        assert mine_game(game_cells(_game(1), 15), 15, min_moves=3) == []
+
+    def test_symmetric_positions_are_one_puzzle(self):
+        """Posições espelhadas têm o mesmo identificador canônico"""
+        result = mine_chunk([_game(1), _game(2, mirror=True)], {})
+
+        assert len(result["puzzles"]) == 1
+        assert result["positions"] == 2 * len(SEQUENCE)
+
+    def test_game_cells_formats(self):
+        """Os dois formatos de jogada são lidos e a leitura para na primeira inválida"""
+        game = {"moves": [{"position": {"row": 7, "col": 7}, "piece": "black"},
+                          {"row": 7, "col": 8, "player": "white"},
+                          {"row": 40, "col": 8, "player": "black"},
+                          {"row": 6, "col": 8, "player": "white"}]}
+
+        assert game_cells(game, 15) == [(112, 1), (113, 2)]
+
+    def test_rating_grows_with_length(self):
+        """Vitórias mais longas recebem nota e dificuldade maiores"""
+        short, long = rate_puzzle(2, 10), rate_puzzle(6, 10)
+
+        assert short[0] < long[0]
+        assert short[1] == "easy" and long[1] != "easy"
+
+
+class TestPipeline:
+    """Testes do processamento em blocos com checkpoint"""
+
+    def test_resumes_from_checkpoint(self, monkeypatch):
+        """Uma execução interrompida continua do último bloco gravado"""
+        collections = {
+            "games": FakeCollection([_game(number, mirror=number % 2 == 1) for number in range(5)]),
+            "puzzles": FakeCollection(),
+            "puzzle_checkpoints": FakeCollection(),
+        }
+
+        async def get_collection(name):
+            return collections[name]
+
+        monkeypatch.setattr(module, "get_collection", get_collection)
+
+        first = asyncio.run(mine_puzzles(chunk_size=2, limit=3))
+        assert first["processed"] == 3
+        assert collections["puzzle_checkpoints"].docs["default"]["last_game_id"] == 2
+
+        second = asyncio.run(mine_puzzles(chunk_size=2))
+        assert second["processed"] == 2
+        assert second["games"] == 5
+        assert second["puzzles"] == len(collections["puzzles"].docs) == 1
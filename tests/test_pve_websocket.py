@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Testes da resposta da IA enviada pelo servidor nas partidas PvE (routers.websocket_games)
+"""
+
+import sys
+import os
+import asyncio
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from bson import ObjectId
+
+from logic.board import Board, BLACK, WHITE
+from models.game import Position
+from routers import websocket_games
+from services.ai_service import AIMove, AIServiceBusy
+from tests.helpers import FakeCollection
+
+GAME_ID = str(ObjectId())
+
+
+def _game():
+    return {
+        "mode": "pve",
+        "difficulty": "hard",
+        "players": {"black": {"id": "user1"}, "white": {"id": "ai"}},
+    }
+
+
+class TestPvEReply:
+    """Testes da jogada da IA calculada no servidor"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.collection = FakeCollection()
+        self.messages = []
+        self.events = []
+        self.board = Board(15)
+        self.board.place(self.board.index(7, 7), BLACK)
+
+    def _patch(self, monkeypatch, move=None, error=None, failures=0):
+        async def get_collection(name):
+            return self.collection
+
+        calls = []
+
+        async def get_move(board, difficulty, game_id=None):
+            assert board is not self.board
+            calls.append(board)
+            if error and (not failures or len(calls) <= failures):
+                raise error
+            return move
+
+        async def broadcast(game_id, message, exclude_user=None):
+            self.messages.append(message)
+
+        async def send_event(game_id, event_type, data):
+            self.events.append((event_type, data))
+
+        monkeypatch.setattr(websocket_games, "get_collection", get_collection)
+        monkeypatch.setattr(websocket_games.ai_service, "get_move", get_move)
+        monkeypatch.setattr(websocket_games.ai_service, "start_pondering", lambda *args: None)
+        monkeypatch.setattr(websocket_games.game_manager, "broadcast_to_game", broadcast)
+        monkeypatch.setattr(websocket_games.game_manager, "send_game_event", send_event)
+        monkeypatch.setattr(websocket_games, "AI_REPLY_RETRY_DELAY", 0)
+        return calls
+
+    def test_ai_color(self):
+        """Só partidas PvE com a IA de brancas têm resposta do servidor"""
+        assert websocket_games.ai_color(_game()) == "white"
+        assert websocket_games.ai_color({**_game(), "mode": "pvp-online"}) is None
+        assert websocket_games.ai_color({"mode": "pve", "players": {"white": {}}}) is None
+
+    def test_reply_is_stored_and_pushed_with_timing(self, monkeypatch):
+        """A jogada da IA é gravada e enviada com fila, busca, profundidade e nós"""
+        move = AIMove(Position(7, 8), "hard", queue_time=0.002, compute_time=0.05, depth=4, nodes=1234)
+        self._patch(monkeypatch, move=move)
+
+        asyncio.run(websocket_games.play_ai_reply(GAME_ID, _game(), self.board))
+
+        assert self.board.color_at(self.board.index(7, 8)) == WHITE
+        update = self.collection.updates[0]
+        assert update["$set"]["current_player"] == "black"
+        assert update["$set"]["board"][7][8] == "white"
+        assert update["$push"]["moves"]["player"] == "white"
+        message = self.messages[0]
+        assert message["type"] == "ai_move"
+        assert message["move"] == {"row": 7, "col": 8, "player": "white", "next_player": "black"}
+        timing = message["timing"]
+        assert (timing["queue_ms"], timing["compute_ms"], timing["depth"], timing["nodes"]) == (2.0, 50.0, 4, 1234)
+        assert timing["total_ms"] >= 0
+        assert self.events == []
+
+    def test_winning_reply_ends_game(self, monkeypatch):
+        """Uma jogada vencedora da IA encerra a partida"""
+        for col in range(3, 7):
+            self.board.place(self.board.index(0, col), WHITE)
+        self._patch(monkeypatch, move=AIMove(Position(0, 7), "hard"))
+
+        asyncio.run(websocket_games.play_ai_reply(GAME_ID, _game(), self.board))
+
+        assert self.collection.updates[0]["$set"]["status"] == "finished"
+        assert self.collection.updates[0]["$set"]["winner"] == "white"
+        assert self.events[0][0] == "game_end"
+
+    def test_busy_service_reports_error(self, monkeypatch):
+        """Com o serviço sempre ocupado o cliente recebe um erro e nada é gravado"""
+        calls = self._patch(monkeypatch, error=AIServiceBusy("AI queue is full"))
+
+        asyncio.run(websocket_games.run_ai_reply(GAME_ID, _game(), self.board))
+
+        assert len(calls) == websocket_games.AI_REPLY_RETRIES + 1
+        assert self.collection.updates == []
+        assert self.events[0][0] == "ai_error"
+        assert GAME_ID in websocket_games.game_manager.ai_stalled
+        websocket_games.game_manager.ai_stalled.discard(GAME_ID)
+
+    def test_busy_service_is_retried(self, monkeypatch):
+        """Uma recusa passageira do serviço é repetida até a jogada sair"""
+        calls = self._patch(monkeypatch, move=AIMove(Position(7, 8), "hard"),
+                            error=AIServiceBusy("AI queue is full"), failures=2)
+
+        asyncio.run(websocket_games.run_ai_reply(GAME_ID, _game(), self.board))
+
+        assert len(calls) == 3
+        assert self.collection.updates[0]["$set"]["current_player"] == "black"
+        assert self.events == []
+
+    def test_unexpected_error_is_logged(self, monkeypatch, caplog):
+        """Outros erros da tarefa são registrados no log em vez de se perderem"""
+        self._patch(monkeypatch, error=ValueError("mongo down"))
+
+        asyncio.run(websocket_games.run_ai_reply(GAME_ID, _game(), self.board))
+
+        assert "mongo down" in caplog.text
+        assert self.events[0] == ("ai_error", {"message": "AI move failed"})
+        websocket_games.game_manager.ai_stalled.discard(GAME_ID)
+
+    def test_resume_on_ai_turn(self, monkeypatch):
+        """Uma partida parada na vez da IA volta a ter a jogada calculada"""
+        self._patch(monkeypatch, move=AIMove(Position(7, 8), "hard"))
+        game = {**_game(), "status": "active", "current_player": "white",
+                "board": [[None] * 15 for _ in range(15)], "moves": [{"row": 7, "col": 7, "player": "black"}]}
+        game["board"][7][7] = "black"
+
+        async def scenario():
+            assert not websocket_games.resume_ai_reply(GAME_ID, {**game, "current_player": "black"})
+            assert websocket_games.resume_ai_reply(GAME_ID, game)
+            assert not websocket_games.resume_ai_reply(GAME_ID, game)  # já em andamento
+            await websocket_games.game_manager.ai_tasks[GAME_ID]
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            websocket_games.game_manager.boards.pop(GAME_ID, None)
+
+        assert self.messages[0]["move"]["row"] == 7 and self.messages[0]["move"]["col"] == 8
+        assert GAME_ID not in websocket_games.game_manager.ai_tasks
+
+
+class HintCollection(FakeCollection):
+    """Coleção que conta as dicas como o $inc condicional do Mongo"""
+
+    def __init__(self):
+        super().__init__()
+        self.hints = {}
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        (field, limit), = ((key, value["$not"]["$gte"]) for key, value in query.items() if key != "_id")
+        color = field.split(".")[1]
+        if self.hints.get(color, 0) >= limit:
+            return None
+        self.hints[color] = self.hints.get(color, 0) + 1
+        return {"hints": dict(self.hints)}
+
+    async def update_one(self, query, update):
+        for field, amount in update.get("$inc", {}).items():
+            color = field.split(".")[1]
+            self.hints[color] += amount
+
+
+class TestHints:
+    """Testes das ameaças e dicas por partida"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.collection = HintCollection()
+        self.game = {**_game(), "status": "active", "current_player": "black",
+                     "board": [[None] * 15 for _ in range(15)], "moves": []}
+        self.game_id = str(ObjectId())
+
+    def teardown_method(self):
+        websocket_games.game_manager.boards.pop(self.game_id, None)
+
+    def _patch(self, monkeypatch, error=None):
+        async def get_collection(name):
+            return self.collection
+
+        async def get_move(board, difficulty, color=WHITE):
+            if error:
+                raise error
+            return AIMove(Position(7, 7), difficulty, compute_time=0.01, depth=3, nodes=50)
+
+        monkeypatch.setattr(websocket_games, "get_collection", get_collection)
+        monkeypatch.setattr(websocket_games.ai_service, "get_move", get_move)
+
+    def test_threats_message(self):
+        """A mensagem traz as ameaças das duas cores"""
+        message = asyncio.run(websocket_games.threats_message(self.game_id, self.game))
+
+        assert message["type"] == "threats"
+        assert set(message["threats"]) == {"black", "white"}
+        assert "hint" not in message
+
+    def test_finished_games_are_not_cached(self):
+        """Consultas a partidas encerradas não deixam tabuleiros na memória"""
+        finished = {**self.game, "status": "finished"}
+
+        message = asyncio.run(websocket_games.threats_message(self.game_id, finished))
+
+        assert message["move_count"] == 0
+        assert self.game_id not in websocket_games.game_manager.boards
+
+    def test_tracked_boards_are_bounded(self, monkeypatch):
+        """Só os tabuleiros usados mais recentemente ficam guardados"""
+        monkeypatch.setattr(websocket_games, "MAX_TRACKED_BOARDS", 2)
+        manager = websocket_games.GameConnectionManager()
+        for game_id in ("a", "b", "a", "c"):
+            manager.board_state(game_id, self.game)
+
+        assert list(manager.boards) == ["a", "c"]
+
+    def test_hints_are_capped(self, monkeypatch):
+        """Cada jogador tem um número limitado de dicas por partida"""
+        self._patch(monkeypatch)
+
+        hints = [asyncio.run(websocket_games.request_hint(self.game_id, self.game, "black"))
+                 for _ in range(websocket_games.HINTS_PER_GAME + 1)]
+
+        assert (hints[0]["row"], hints[0]["col"]) == (7, 7)
+        assert hints[0]["timing"]["nodes"] == 50
+        assert hints[-2]["hints_left"] == 0
+        assert hints[-1]["error"] == "Hint limit reached"
+
+    def test_failed_hint_is_refunded(self, monkeypatch):
+        """Uma dica que a IA não conseguiu calcular não é descontada"""
+        self._patch(monkeypatch, error=AIServiceBusy("AI queue is full"))
+
+        hint = asyncio.run(websocket_games.request_hint(self.game_id, self.game, "black"))
+
+        assert "error" in hint
+        assert self.collection.hints["black"] == 0
+
+    def test_hint_only_on_own_turn(self, monkeypatch):
+        """Não há dica fora da vez do jogador"""
+        self._patch(monkeypatch)
+
+        hint = asyncio.run(websocket_games.request_hint(self.game_id, self.game, "white"))
+
+        assert "error" in hint and self.collection.hints == {}
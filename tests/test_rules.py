@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Testes para o motor de regras configurável (logic.rules)
+"""
+
+import sys
+import os
+import pickle
+
+import pytest
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import Board, BLACK, WHITE
+from logic.rules import (
+    get_rules, rules_for, FREESTYLE, STANDARD, RENJU, OVERLINE, DOUBLE_FOUR, DOUBLE_THREE,
+)
+from logic.search import SearchEngine
+from models.game import Position, PieceColor
+from services.game_logic import GameLogic
+
+
+def place(board, color, cells):
+    """Coloca peças de ``color`` nas casas (linha, coluna) indicadas"""
+    for row, col in cells:
+        board.place(board.index(row, col), color)
+
+
+class TestRulesTables:
+    """Testes da criação e compartilhamento das regras"""
+
+    def test_rules_are_shared(self):
+        """Cada (tamanho, variante) é construído uma vez e as tabelas por tamanho são comuns"""
+        renju = get_rules(15, RENJU)
+
+        assert get_rules(15, RENJU) is renju
+        assert get_rules(15, STANDARD).lines is renju.lines
+        assert renju.geometry is Board(15).geometry
+
+    def test_invalid_rules_rejected(self):
+        """Variantes desconhecidas e tabuleiros pequenos demais são recusados"""
+        with pytest.raises(ValueError):
+            get_rules(15, "pente")
+        with pytest.raises(ValueError):
+            get_rules(4, FREESTYLE)
+
+    def test_rules_for_game_document(self):
+        """As regras de uma partida seguem o tamanho do tabuleiro e a variante salva"""
+        game = {"board": get_rules(19, FREESTYLE).empty_rows(), "variant": RENJU}
+
+        rules = rules_for(game)
+
+        assert rules.size == 19 and rules.variant == RENJU
+
+    def test_pickled_board_keeps_rules(self):
+        """Tabuleiros enviados a outros processos mantêm a variante"""
+        board = get_rules(15, STANDARD).new_board()
+        place(board, BLACK, [(7, 7)])
+
+        clone = pickle.loads(pickle.dumps(board))
+
+        assert clone.rules is board.rules
+        assert board.copy().rules is board.rules
+
+
+class TestWinConditions:
+    """Testes da condição de vitória de cada variante"""
+
+    overline = [(7, col) for col in range(2, 8)]
+
+    def test_freestyle_overline_wins(self):
+        """No estilo livre seis em linha vencem"""
+        board = get_rules(15, FREESTYLE).new_board()
+        place(board, BLACK, self.overline)
+
+        assert board.rules is None
+        assert board.is_five_at(board.index(7, 7), BLACK)
+
+    def test_standard_needs_exactly_five(self):
+        """Na variante padrão só exatamente cinco vencem"""
+        board = get_rules(15, STANDARD).new_board()
+        place(board, WHITE, self.overline)
+
+        assert not board.is_five_at(board.index(7, 7), WHITE)
+        assert not board.has_five(WHITE)
+
+        board.remove(board.index(7, 2))
+        assert board.is_five_at(board.index(7, 7), WHITE)
+
+    def test_standard_winning_cells_skip_overlines(self):
+        """Casas que formariam seis em linha não contam como vitória"""
+        board = get_rules(15, STANDARD).new_board()
+        place(board, BLACK, [(7, 2), (7, 3), (7, 4), (7, 6), (7, 7)])
+
+        assert board.winning_cells(BLACK) == 0
+        place(board, BLACK, [(10, 3), (10, 4), (10, 5), (10, 6)])
+        assert board.winning_cells(BLACK) == 1 << board.index(10, 2) | 1 << board.index(10, 7)
+
+    def test_renju_overline_only_wins_for_white(self):
+        """No Renju as brancas vencem com seis, as pretas não"""
+        rules = get_rules(15, RENJU)
+        white = rules.new_board()
+        place(white, WHITE, self.overline)
+        black = rules.new_board()
+        place(black, BLACK, self.overline)
+
+        assert white.is_five_at(white.index(7, 7), WHITE)
+        assert not black.is_five_at(black.index(7, 7), BLACK)
+
+    def test_game_logic_checks_variant_on_grids(self):
+        """A GameLogic aplica a variante também ao tabuleiro em listas"""
+        game_logic = GameLogic(get_rules(15, STANDARD))
+        grid = get_rules(15, STANDARD).empty_rows()
+        for row, col in self.overline:
+            grid[row][col] = "black"
+
+        assert game_logic.check_winner(grid, Position(7, 7), PieceColor.BLACK) is None
+        grid[7][2] = None
+        assert game_logic.check_winner(grid, Position(7, 7), PieceColor.BLACK) == PieceColor.BLACK
+
+    def test_game_rules_override_server_variant(self, monkeypatch):
+        """A variante guardada na partida vale mesmo com outra variante no servidor"""
+        monkeypatch.setenv("GAME_VARIANT", FREESTYLE)
+        game_logic = GameLogic(get_rules(15, FREESTYLE))
+        game = {"board": get_rules(15, FREESTYLE).empty_rows(), "variant": RENJU}
+        for row, col in self.overline:
+            game["board"][row][col] = "black"
+        rules = rules_for(game)
+
+        assert game_logic.check_winner(game["board"], Position(7, 7), PieceColor.BLACK) == PieceColor.BLACK
+        assert game_logic.check_winner(game["board"], Position(7, 7), PieceColor.BLACK, rules) is None
+        assert game_logic.to_board(game["board"], rules).rules.variant == RENJU
+
+
+class TestRenjuForbiddenMoves:
+    """Testes das jogadas proibidas às pretas no Renju"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.rules = get_rules(15, RENJU)
+        self.board = self.rules.new_board()
+
+    def test_double_three(self):
+        """Duas linhas de três abertas na mesma jogada são proibidas"""
+        place(self.board, BLACK, [(7, 5), (7, 6), (5, 7), (6, 7)])
+        index = self.board.index(7, 7)
+
+        assert self.rules.forbidden(self.board, index, BLACK) == DOUBLE_THREE
+        assert self.rules.forbidden(self.board, index, WHITE) is None
+        assert not self.rules.is_legal(self.board, index, BLACK)
+
+    def test_blocked_three_is_allowed(self):
+        """Um três bloqueado não conta como três aberto"""
+        place(self.board, BLACK, [(7, 5), (7, 6), (5, 7), (6, 7)])
+        place(self.board, WHITE, [(7, 4), (7, 8)])
+
+        assert self.rules.forbidden(self.board, self.board.index(7, 7), BLACK) is None
+
+    def test_double_four(self):
+        """Dois quatros na mesma jogada são proibidos"""
+        place(self.board, BLACK, [(7, 4), (7, 5), (7, 6), (4, 7), (5, 7), (6, 7)])
+        place(self.board, WHITE, [(7, 3), (3, 7)])
+
+        assert self.rules.forbidden(self.board, self.board.index(7, 7), BLACK) == DOUBLE_FOUR
+
+    def test_overline_and_five(self):
+        """Seis em linha é proibido, mas cinco vencem mesmo com forma proibida"""
+        place(self.board, BLACK, [(7, 2), (7, 3), (7, 4), (7, 6), (7, 7)])
+        assert self.rules.forbidden(self.board, self.board.index(7, 5), BLACK) == OVERLINE
+
+        place(self.board, BLACK, [(3, 9), (4, 9), (5, 9), (6, 9), (8, 10), (9, 11), (10, 12)])
+        assert self.rules.forbidden(self.board, self.board.index(7, 9), BLACK) is None
+
+    def test_search_avoids_forbidden_moves(self):
+        """A busca não escolhe jogadas proibidas para as pretas"""
+        place(self.board, BLACK, [(7, 5), (7, 6), (5, 7), (6, 7)])
+        place(self.board, WHITE, [(0, 0), (0, 14), (14, 0), (14, 14)])
+        engine = SearchEngine(max_depth=2, time_limit=5.0)
+
+        result = engine.search(self.board, BLACK)
+        moves = engine._ordered_moves(self.board, BLACK, 0)
+
+        assert self.board.index(7, 7) not in moves
+        assert result.move != self.board.index(7, 7)
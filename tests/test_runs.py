@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Testes para o rastreamento incremental de sequências (logic.runs)
+"""
+
+import sys
+import os
+import random
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import Board, BLACK, WHITE
+from logic.runs import RunTracker
+from logic.game_logic import check_win
+
+
+class TestRunTracker:
+    """Testes das sequências mantidas a cada jogada"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.board = Board(15)
+        self.runs = RunTracker(self.board).attach()
+
+    def test_merges_runs_on_place(self):
+        """Uma peça entre duas sequências as une"""
+        for col in (3, 4, 6, 7):
+            self.board.place(self.board.index(7, col), BLACK)
+        assert self.runs.longest_run(self.board.index(7, 5), BLACK) == 5  # casa vazia: sequência possível
+
+        self.board.place(self.board.index(7, 5), BLACK)
+
+        assert self.runs.last_length == 5
+        assert self.board.is_five_at(self.board.index(7, 5), BLACK)
+        assert check_win(self.board, 7, 3) == "black"
+
+    def test_splits_runs_on_remove(self):
+        """Retirar uma peça divide a sequência de volta"""
+        for row in range(2, 7):
+            self.board.place(self.board.index(row, row), WHITE)
+        self.board.remove(self.board.index(4, 4))
+
+        assert self.runs.runs_through(self.board.index(2, 2), WHITE)[2] == 2
+        assert self.runs.runs_through(self.board.index(6, 6), WHITE)[2] == 2
+        assert not self.board.is_five_at(self.board.index(6, 6), WHITE)
+
+    def test_runs_do_not_wrap_rows(self):
+        """Sequências não continuam na linha seguinte"""
+        for col in (12, 13, 14):
+            self.board.place(self.board.index(3, col), BLACK)
+        for col in (0, 1):
+            self.board.place(self.board.index(4, col), BLACK)
+
+        assert not self.board.is_five_at(self.board.index(4, 1), BLACK)
+        assert self.runs.longest_run(self.board.index(4, 1), BLACK) == 2
+
+    def test_matches_shift_and_mask(self):
+        """Em partidas aleatórias o resultado é igual à detecção por máscaras"""
+        rng = random.Random(7)
+        reference = Board(15)
+        cells = list(range(225))
+        rng.shuffle(cells)
+        placed = []
+        for _ in range(400):
+            if placed and rng.random() < 0.3:
+                cell = placed.pop(rng.randrange(len(placed)))
+                self.board.remove(cell)
+                reference.remove(cell)
+                cells.append(cell)
+            elif cells:
+                cell, color = cells.pop(), rng.choice((BLACK, WHITE))
+                self.board.place(cell, color)
+                reference.place(cell, color)
+                placed.append(cell)
+                assert self.board.is_five_at(cell, color) == reference.is_five_at(cell, color)
+
+        rebuilt = RunTracker(self.board)
+        for cell in range(225):
+            for color in (BLACK, WHITE):
+                assert rebuilt.runs_through(cell, color) == self.runs.runs_through(cell, color)
+
+    def test_copies_are_untracked(self):
+        """Cópias para busca não carregam o rastreador"""
+        self.board.place(self.board.index(7, 7), BLACK)
+        clone = self.board.copy()
+
+        assert clone.runs is None
+        self.runs.detach()
+        assert self.board.runs is None and self.runs not in self.board.trackers
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Testes para a busca alpha-beta da IA difícil (logic.search)
+"""
+
+import sys
+import os
+import time
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import BLACK, WHITE
+from logic.patterns import PatternEvaluator
+from logic.rules import get_rules, FREESTYLE, STANDARD
+from logic.search import SearchEngine
+from logic.transposition import TranspositionTable
+from services.game_logic import GameLogic
+from tests.helpers import make_board
+
+
+class TestSearchEngine:
+    """Testes do motor negamax/alpha-beta"""
+
+    def test_takes_immediate_win(self):
+        """A busca completa cinco em linha quando possível"""
+        board = make_board(15, black=[(3, 3), (4, 4), (12, 1)], white=[(7, 3), (7, 4), (7, 5), (7, 6)])
+
+        result = SearchEngine(time_limit=1.0).search(board, WHITE)
+
+        assert board.coords(result.move) in [(7, 2), (7, 7)]
+
+    def test_blocks_open_three(self):
+        """A busca bloqueia uma três aberta do adversário"""
+        board = make_board(15, black=[(7, 7), (7, 8), (7, 9)], white=[(8, 8)])
+
+        result = SearchEngine(time_limit=0.5).search(board, WHITE)
+
+        assert board.coords(result.move) in [(7, 5), (7, 6), (7, 10), (7, 11)]
+
+    def test_respects_time_budget(self):
+        """Cada chamada retorna dentro do orçamento de tempo"""
+        board = make_board(19, black=[(9, 9), (10, 10), (8, 11), (11, 8)], white=[(9, 10), (10, 9), (8, 8)])
+        engine = SearchEngine(max_depth=30, time_limit=0.2)
+
+        start = time.perf_counter()
+        result = engine.search(board, BLACK)
+        elapsed = time.perf_counter() - start
+
+        assert result.move is not None
+        assert board.is_empty(result.move)
+        assert elapsed < 0.2 + 0.05
+        assert result.depth >= 1
+
+    def test_node_budget_keeps_best_so_far(self):
+        """Com orçamento de nós mínimo ainda há uma jogada disponível"""
+        board = make_board(19, black=[(9, 9), (10, 10)], white=[(9, 10)])
+        engine = SearchEngine(max_depth=30, time_limit=0, node_limit=300)
+
+        result = engine.search(board, WHITE)
+
+        assert result.move is not None
+        assert result.nodes <= 300
+        assert board.move_count == 3  # tabuleiro restaurado após a busca
+
+    def test_move_ordering_reduces_nodes(self):
+        """Killers, histórico e ameaças primeiro reduzem os nós na mesma profundidade"""
+        board = make_board(15, black=[(7, 7), (6, 6), (8, 9)], white=[(7, 8), (6, 8)])
+        plain = SearchEngine(max_depth=4, time_limit=None, killers=False, history=False, threat_ordering=False)
+        ordered = SearchEngine(max_depth=4, time_limit=None)
+
+        baseline = plain.search(board.copy(), WHITE)
+        result = ordered.search(board.copy(), WHITE)
+
+        assert result.depth == baseline.depth == 4
+        assert result.nodes < baseline.nodes
+        stats = result.to_dict()["stats"]
+        assert stats["cutoffs"] > 0
+        assert 0 < stats["first_move_cutoff_rate"] <= 1
+        assert stats["effective_branching"] > 1
+
+    def test_threat_moves_ordered_first(self):
+        """Jogadas que criam ou bloqueiam uma três aberta vêm primeiro"""
+        board = make_board(15, black=[(7, 7), (7, 8)], white=[(3, 3), (3, 4)])
+        engine = SearchEngine(max_depth=1, time_limit=None)
+        engine.search(board, WHITE)  # prepara as tabelas de killers e histórico
+        engine._evaluator = PatternEvaluator(board)
+
+        moves = engine._ordered_moves(board, WHITE, 0)
+
+        assert {board.coords(move) for move in moves[:2]} <= {(7, 6), (7, 9), (3, 2), (3, 5)}
+
+    def test_shared_table_keeps_variants_apart(self):
+        """A tabela compartilhada não reaproveita resultados de outra variante"""
+        def search(variant, table):
+            board = get_rules(15, variant).new_board()
+            for row, col in [(0, 0), (0, 1), (0, 4), (0, 5), (7, 7), (8, 8)]:
+                board.place(board.index(row, col), BLACK)
+            for row, col in [(7, 8), (6, 6), (9, 9), (12, 12)]:
+                board.place(board.index(row, col), WHITE)
+            engine = SearchEngine(max_depth=4, time_limit=0, node_limit=30000, table=table)
+            return engine.search(board, WHITE)
+
+        fresh = search(STANDARD, TranspositionTable(1))
+        table = TranspositionTable(1)
+        search(FREESTYLE, table)
+        shared = search(STANDARD, table)
+
+        assert (shared.move, shared.score, shared.nodes) == (fresh.move, fresh.score, fresh.nodes)
+
+    def test_hard_ai_uses_search(self):
+        """A IA difícil usa a busca e expõe as estatísticas"""
+        game_logic = GameLogic()
+        game_logic.use_book = False
+        rows = [[None for _ in range(19)] for _ in range(19)]
+        rows[9][9] = "black"
+
+        move = game_logic.get_ai_move(rows, "hard")
+
+        assert rows[move.row][move.col] is None
+        assert game_logic.last_search is not None
+        assert game_logic.last_search.depth >= 1
+
+    def test_no_search_move_falls_back_to_empty_cell(self, monkeypatch):
+        """Sem jogada da busca a IA ainda devolve uma casa livre"""
+        from logic.search import SearchResult
+        from logic.mcts import MCTSEngine
+        game_logic = GameLogic()
+        board = make_board(15, black=[(0, 0)], white=[(7, 7)])
+        monkeypatch.setattr(SearchEngine, "search", lambda self, board, color: SearchResult(None))
+        monkeypatch.setattr(MCTSEngine, "search", lambda self, board, color: SearchResult(None))
+
+        assert board.is_empty(game_logic._minimax_cell(board, color=BLACK))
+        assert board.is_empty(game_logic._mcts_cell(board, game_logic.profile("mcts"), BLACK))
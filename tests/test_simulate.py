@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Testes para a simulação sem terminal do jogo de linha de comando (simulate.py)
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import admin
+import player
+import simulate
+from logic.rules import get_rules
+from symbols import p1piece, p2piece
+
+
+class TestHeadlessGame:
+    """Testes das partidas entre jogadores automáticos"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.admin = admin.Admin(get_rules(15))
+
+    def test_render_table(self):
+        """O tabuleiro vira uma única string com os nomes das linhas e colunas"""
+        table = self.admin.createTable()
+        table[7][7] = p1piece
+
+        text = self.admin.renderTable(table)
+
+        lines = text.split('\n')
+        assert len(lines) == 15 + 3
+        assert lines[8].startswith('H ') and p1piece in lines[8]
+        assert lines[16].strip().startswith('A B C')
+
+    def test_random_games_are_reproducible(self):
+        """A mesma semente repete a partida"""
+        first = self.admin.playGame(player.RandomPlayer(1, 5), player.RandomPlayer(2, 6))
+        second = self.admin.playGame(player.RandomPlayer(1, 5), player.RandomPlayer(2, 6))
+
+        assert first['moves'] == second['moves']
+        assert len(set(first['moves'])) == len(first['moves'])
+        assert first['table'] is None
+        if first['winner'] is not None:
+            assert first['end'] == 'five'
+
+    def test_engine_beats_random(self):
+        """A IA média vence o jogador aleatório com cinco em linha"""
+        result = self.admin.playGame(player.RandomPlayer(1, 3), player.makePlayer('medium', 2), display=True)
+
+        assert result['winner'].id == 2 and result['end'] == 'five'
+        assert p2piece in result['table']
+
+    def test_invalid_move_forfeits(self):
+        """Uma jogada em casa ocupada perde a partida"""
+        class Stubborn(player.Player):
+            def chooseMove(self, admin, matrix):
+                return 7, 7
+
+        result = self.admin.playGame(Stubborn(1), Stubborn(2))
+
+        assert result['winner'].id == 1 and result['end'] == 'invalid'
+        assert result['moves'] == [(7, 7)]
+
+
+class TestOpenings:
+    """Testes das aberturas sorteadas"""
+
+    def test_engine_games_differ(self):
+        """Partidas entre IAs determinísticas não se repetem"""
+        games = list(simulate.simulate(4, 'medium', 'hard:max_depth=1', seed=1, size=9, swap=True))
+        moves = [result['moves'] for _, _, result, _ in games]
+
+        # cada par de partidas com cores trocadas começa com a mesma abertura
+        assert moves[0][:2] == moves[1][:2] and moves[2][:2] == moves[3][:2]
+        assert moves[0][:2] != moves[2][:2]
+        assert len({tuple(game) for game in moves}) == 4
+
+    def test_opening_is_played_first(self):
+        """As jogadas da abertura vêm antes das dos jogadores"""
+        game = admin.Admin(get_rules(9))
+        result = game.playGame(player.makePlayer('medium', 1), player.makePlayer('medium', 2),
+                               opening=[(0, 0), (8, 8)])
+
+        assert result['moves'][:2] == [(0, 0), (8, 8)]
+
+
+class TestLog:
+    """Testes do registro compacto"""
+
+    def test_log_file(self, tmp_path):
+        """Uma linha por partida entre o cabeçalho e o resumo"""
+        path = tmp_path / 'games.tsv'
+
+        simulate.main(['--games', '3', '--seed', '1', '--size', '9', '--log', str(path)])
+
+        lines = path.read_text().splitlines()
+        assert lines[0].startswith('# games=3') and lines[-1].startswith('# random=3')
+        rows = [line.split('\t') for line in lines[2:-1]]
+        assert [row[0] for row in rows] == ['1', '2', '3']
+        for row in rows:
+            assert len(row[7]) == 2 * int(row[5])
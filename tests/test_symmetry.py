@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Testes para as simetrias do tabuleiro (logic.symmetry) e chaves canônicas
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic import symmetry
+from logic.board import Board, BLACK, WHITE
+from logic.book import build_book, write_book, OpeningBook
+from logic.search import SearchEngine
+from logic.transposition import TranspositionTable
+
+
+def _transformed(board, sym):
+    """Cópia do tabuleiro com todas as pedras levadas pela simetria ``sym``"""
+    image = symmetry.permutations(board.size)[sym]
+    return Board.from_masks(
+        board.size,
+        sum(1 << image[cell] for cell in range(board.geometry.cells) if board.bits[BLACK] >> cell & 1),
+        sum(1 << image[cell] for cell in range(board.geometry.cells) if board.bits[WHITE] >> cell & 1),
+    )
+
+
+class TestSymmetry:
+    """Testes das oito simetrias e da canonicalização"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.board = Board(15)
+        for row, col, color in ((7, 7, BLACK), (7, 8, WHITE), (6, 8, BLACK), (5, 10, WHITE), (3, 2, BLACK)):
+            self.board.place(self.board.index(row, col), color)
+
+    def test_permutations_and_inverses(self):
+        """As oito simetrias são permutações distintas e as inversas desfazem cada uma"""
+        images = symmetry.permutations(15)
+        assert len(set(images)) == symmetry.COUNT
+        for sym, image in enumerate(images):
+            assert sorted(image) == list(range(225))
+            for cell in (0, 14, 37, 112, 224):
+                assert symmetry.restore_cell(symmetry.transform_cell(cell, sym, 15), sym, 15) == cell
+
+    def test_symmetric_boards_share_canonical_key(self):
+        """Rotações e reflexões de uma posição têm a mesma chave canônica"""
+        key, _ = self.board.canonical()
+        for sym in range(symmetry.COUNT):
+            image = _transformed(self.board, sym)
+            assert image.key == self.board.sym_keys[sym]
+            assert image.canonical()[0] == key
+
+    def test_incremental_keys_match_rebuild(self):
+        """As chaves simétricas mantidas por place/remove batem com a reconstrução"""
+        board = self.board.copy()
+        board.place(board.index(9, 9), WHITE)
+        board.remove(board.index(7, 8))
+        rebuilt = Board.from_masks(15, board.bits[BLACK], board.bits[WHITE])
+        assert board.sym_keys == rebuilt.sym_keys
+
+    def test_book_found_from_rotated_position(self, tmp_path):
+        """Uma jogada do livro é devolvida na orientação do tabuleiro consultado"""
+        # (7,7) + (5,8) não tem simetria própria, então a resposta é única
+        line = [self.board.index(7, 7), self.board.index(5, 8), self.board.index(6, 8)]
+        path = str(tmp_path / "book.bin")
+        write_book(path, build_book([line], 15), 15)
+        book = OpeningBook(path)
+        try:
+            played = Board(15)
+            played.place(line[0], BLACK)
+            played.place(line[1], WHITE)
+            for sym in range(symmetry.COUNT):
+                rotated = _transformed(played, sym)
+                assert book.probe(rotated) == symmetry.transform_cell(line[2], sym, 15)
+        finally:
+            book.close()
+
+    def test_search_reuses_symmetric_entries(self):
+        """A tabela de transposição devolve a jogada certa para uma posição espelhada"""
+        table = TranspositionTable(16)
+        engine = SearchEngine(max_depth=2, time_limit=None, table=table)
+        first = engine.search(self.board.copy(), WHITE)
+
+        mirrored = _transformed(self.board, 4)
+        again = SearchEngine(max_depth=2, time_limit=None, table=table).search(mirrored, WHITE)
+        assert again.score == first.score
+        assert mirrored.is_empty(again.move)
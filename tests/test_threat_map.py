@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Testes para o mapa de ameaças incremental (logic.threat_map)
+"""
+
+import sys
+import os
+import random
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import Board, BLACK, WHITE
+from logic.rules import get_rules, STANDARD
+from logic.threat_map import ThreatMap
+
+
+def place(board, color, cells):
+    """Coloca peças de ``color`` nas casas (linha, coluna) indicadas"""
+    for row, col in cells:
+        board.place(board.index(row, col), color)
+
+
+class TestThreatMap:
+    """Testes das ameaças de cada cor"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.board = Board(15)
+        self.threats = ThreatMap(self.board).attach()
+
+    def test_open_three_and_four(self):
+        """Três aberto, quatro e as casas que cada lado precisa bloquear"""
+        place(self.board, BLACK, [(7, 4), (7, 5), (7, 6), (10, 2)])
+        place(self.board, WHITE, [(10, 3), (10, 4), (10, 5), (10, 6)])
+
+        summary = self.threats.to_dict()
+
+        assert summary["black"]["open_threes"] == [[[7, 3], [7, 7]]]
+        assert summary["white"]["winning"] == [[10, 7]]
+        assert summary["white"]["fours"] == [[[10, 7]]]
+        assert summary["black"]["must_block"] == [[10, 7]]
+        assert summary["white"]["must_block"] == [[7, 3], [7, 7]]
+
+    def test_updates_follow_moves(self):
+        """Jogadas e remoções só atualizam as linhas tocadas"""
+        place(self.board, WHITE, [(10, 3), (10, 4), (10, 5), (10, 6)])
+        assert self.threats.to_dict()["white"]["winning"] == [[10, 2], [10, 7]]
+
+        self.board.place(self.board.index(10, 2), BLACK)
+        assert self.threats.to_dict()["white"]["winning"] == [[10, 7]]
+
+        self.board.remove(self.board.index(10, 6))
+        summary = self.threats.to_dict()
+        assert summary["white"]["winning"] == []
+        assert summary["white"]["open_threes"] == []
+
+    def test_matches_board_scan(self):
+        """As casas vencedoras coincidem com a varredura do tabuleiro"""
+        rng = random.Random(7)
+        empty = list(range(self.board.geometry.cells))
+        rng.shuffle(empty)
+        color = BLACK
+        for cell in empty[:120]:
+            self.board.place(cell, color)
+            color = WHITE if color == BLACK else BLACK
+            if self.board.is_five_at(cell, self.board.color_at(cell)):
+                self.board.remove(cell)
+                continue
+            for side in (BLACK, WHITE):
+                assert self.threats.winning_cells(side) == self.board.winning_cells(side)
+
+    def test_variant_overline(self):
+        """Na variante padrão a casa que faria seis não é vencedora"""
+        board = get_rules(15, STANDARD).new_board()
+        threats = ThreatMap(board).attach()
+        place(board, BLACK, [(7, 2), (7, 3), (7, 4), (7, 6), (7, 7)])
+
+        assert threats.winning_cells(BLACK) == 0
+        assert threats.to_dict()["black"]["fours"] == []
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Testes para o solver de ameaças VCF/VCT (logic.threats)
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import BLACK, WHITE
+from logic.threats import ThreatSolver, find_forced_win, VCF, VCT
+from services.game_logic import GameLogic
+from models.game import PieceColor
+from tests.helpers import make_board
+
+
+# Brancas fazem quatro duplo em (5, 8)
+DOUBLE_FOUR = dict(
+    white=[(5, 5), (5, 6), (5, 7), (6, 8), (7, 8), (8, 8)],
+    black=[(5, 4), (9, 8), (0, 0), (14, 14), (0, 14), (14, 0)],
+)
+
+# Brancas fazem três aberto duplo em (7, 9)
+DOUBLE_THREE = dict(
+    white=[(7, 7), (7, 8), (8, 9), (9, 9)],
+    black=[(0, 0), (0, 14), (14, 0), (14, 14)],
+)
+
+
+class TestThreatSolver:
+    """Testes da busca em espaço de ameaças"""
+
+    def test_vcf_finds_double_four(self):
+        """O VCF encontra a sequência de quatros vencedora"""
+        board = make_board(15, **DOUBLE_FOUR)
+
+        result = ThreatSolver().vcf(board, WHITE)
+
+        assert result.found
+        assert board.coords(result.move) == (5, 8)
+
+    def test_vct_needs_threes(self):
+        """Três aberto duplo só é visto pelo VCT"""
+        board = make_board(15, **DOUBLE_THREE)
+        solver = ThreatSolver(time_limit=2.0)
+
+        assert not solver.vcf(board, WHITE).found
+        result = solver.vct(board, WHITE)
+        assert result.found
+        assert board.coords(result.move) == (7, 9)
+
+    def test_no_win_and_board_restored(self):
+        """Sem ameaças não há vitória, e o tabuleiro fica intacto"""
+        board = make_board(15, **DOUBLE_THREE)
+        key, bits = board.key, list(board.bits)
+
+        result = ThreatSolver(time_limit=2.0).vct(board, BLACK)
+
+        assert not result.found
+        assert result.completed
+        assert board.key == key and board.bits == bits
+        assert board.trackers == []
+
+    def test_budget_is_respected(self):
+        """O orçamento de nós interrompe a busca"""
+        board = make_board(15, **DOUBLE_THREE)
+
+        result = find_forced_win(board, WHITE, VCT, time_limit=0, node_limit=2)
+
+        assert not result.completed
+        assert result.nodes == 2
+
+
+class TestThreatsInGameLogic:
+    """Integração do solver com a IA difícil"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.game_logic = GameLogic()
+
+    def test_hard_ai_plays_forced_win(self):
+        """A IA difícil joga a vitória forçada antes da busca"""
+        board = make_board(15, **DOUBLE_FOUR)
+
+        move = self.game_logic.get_ai_move(board, "hard")
+
+        assert (move.row, move.col) == (5, 8)
+        assert self.game_logic.last_threat.kind == VCF
+
+    def test_hard_ai_refutes_opponent_vcf(self):
+        """A IA difícil quebra o VCF do adversário"""
+        board = make_board(15, black=DOUBLE_FOUR["white"], white=DOUBLE_FOUR["black"])
+
+        move = self.game_logic.get_ai_move(board, "hard")
+
+        assert (move.row, move.col) == (5, 8)
+
+    def test_standalone_api_returns_positions(self):
+        """A API de análise devolve a linha vencedora como posições"""
+        board = make_board(15, **DOUBLE_THREE)
+        self.game_logic.threat_time_limit = 2.0
+
+        line = self.game_logic.find_forced_win(board, PieceColor.WHITE, VCT)
+
+        assert (line[0].row, line[0].col) == (7, 9)
+        assert self.game_logic.find_forced_win(board, PieceColor.BLACK) is None
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Testes para o hashing Zobrist e a tabela de transposição
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from logic.board import Board, BLACK, WHITE
+from logic.search import SearchEngine
+from logic.transposition import TranspositionTable, ENTRY_BYTES, EXACT, LOWER
+
+
+class TestZobrist:
+    """Testes das chaves Zobrist incrementais"""
+
+    def test_incremental_key_matches_full_hash(self):
+        """A chave incremental é igual à calculada do zero"""
+        board = Board(15)
+        board.place(board.index(7, 7), BLACK)
+        board.place(board.index(7, 8), WHITE)
+
+        assert board.key == Board.from_rows(board.to_rows()).key
+
+    def test_transposed_move_orders_share_key(self):
+        """Ordens diferentes de jogadas levam à mesma chave"""
+        first = Board(15)
+        second = Board(15)
+        for index, color in [(10, BLACK), (20, WHITE), (30, BLACK)]:
+            first.place(index, color)
+        for index, color in [(30, BLACK), (20, WHITE), (10, BLACK)]:
+            second.place(index, color)
+
+        assert first.key == second.key
+
+    def test_unmake_restores_key(self):
+        """Desfazer uma jogada restaura a chave anterior"""
+        board = Board(19)
+        board.place(board.index(9, 9), BLACK)
+        before = board.key
+
+        board.place(board.index(9, 10), WHITE)
+        board.remove(board.index(9, 10))
+
+        assert board.key == before
+
+
+class TestTranspositionTable:
+    """Testes da tabela de transposição"""
+
+    def test_memory_is_capped(self):
+        """A capacidade respeita o limite de memória configurado"""
+        table = TranspositionTable(size_mb=1)
+
+        assert table.size_bytes <= 1024 * 1024
+        assert table.capacity * ENTRY_BYTES == table.size_bytes
+
+    def test_hit_miss_and_collision_counters(self):
+        """Contadores de acerto, falha e colisão são expostos"""
+        table = TranspositionTable(size_mb=0.001)
+        table.store(5, depth=3, flag=EXACT, score=42, move=7)
+
+        assert table.probe(5) == (3, EXACT, 42, 7)
+        assert table.probe(5 + table.capacity) is None
+
+        stats = table.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["collisions"] == 1
+
+    def test_depth_preferred_replacement(self):
+        """Entradas mais profundas da mesma busca não são substituídas"""
+        table = TranspositionTable(size_mb=0.001)
+        other = 1 + table.capacity
+        table.store(1, depth=5, flag=EXACT, score=10)
+
+        table.store(other, depth=2, flag=LOWER, score=20)
+        assert table.probe(1) is not None
+
+        table.new_search()
+        table.store(other, depth=2, flag=LOWER, score=20)
+        assert table.probe(other) is not None
+
+    def test_search_uses_table(self):
+        """A busca reaproveita posições transpostas"""
+        board = Board(15)
+        for row, col in [(7, 7), (7, 8), (8, 9)]:
+            board.place(board.index(row, col), BLACK)
+        for row, col in [(8, 8), (6, 8)]:
+            board.place(board.index(row, col), WHITE)
+        table = TranspositionTable(size_mb=1)
+
+        SearchEngine(max_depth=3, time_limit=0, table=table).search(board, WHITE)
+
+        assert table.stats()["stores"] > 0
+        assert table.stats()["hits"] > 0
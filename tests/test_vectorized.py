@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Testes para o backend NumPy da IA média (logic.vectorized)
+"""
+
+import sys
+import os
+import random
+
+import pytest
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+np = pytest.importorskip("numpy")
+
+from logic.board import Board, BLACK, WHITE
+from logic import vectorized
+from logic.rules import get_rules, STANDARD, RENJU
+from services.game_logic import GameLogic
+from models.game import Position, PieceColor
+
+
+def _random_rows(rng, size, stones):
+    rows = [[None] * size for _ in range(size)]
+    for _ in range(stones):
+        rows[rng.randrange(size)][rng.randrange(size)] = rng.choice(["black", "white"])
+    return rows
+
+
+class TestVectorized:
+    """Testes da avaliação vetorizada do tabuleiro"""
+
+    def setup_method(self):
+        """Setup para cada teste"""
+        self.numpy_ai = GameLogic()
+        self.python_ai = GameLogic()
+        self.python_ai.use_vectorized = False
+
+    def test_winning_cells(self):
+        """Casas que completam cinco são detectadas nos dois lados"""
+        board = Board(15)
+        for col in range(3, 7):
+            board.place(board.index(5, col), WHITE)
+        board.place(board.index(5, 2), BLACK)
+        cells = vectorized.relative_cells(board, WHITE)
+
+        assert list(zip(*np.nonzero(vectorized.winning_cells(cells, 1)))) == [(5, 7)]
+        assert not vectorized.winning_cells(cells, -1).any()
+
+    def test_scores_match_python_evaluator(self):
+        """A pontuação por casa é igual à de _evaluate_position"""
+        rng = random.Random(3)
+        rows = _random_rows(rng, 15, 40)
+        self.python_ai.board_size = 15
+        scores = vectorized.strategic_scores(vectorized.relative_cells(Board.from_rows(rows), WHITE))
+
+        for row in range(15):
+            for col in range(15):
+                if rows[row][col] is None:
+                    expected = self.python_ai._evaluate_position(rows, Position(row=row, col=col), PieceColor.WHITE)
+                    assert scores[row, col] == expected
+
+    def test_stacked_boards(self):
+        """Uma pilha de tabuleiros é avaliada de uma vez"""
+        rng = random.Random(5)
+        boards = [Board.from_rows(_random_rows(rng, 15, 30)) for _ in range(4)]
+        stack = np.stack([vectorized.relative_cells(board, WHITE) for board in boards])
+
+        batched = vectorized.strategic_scores(stack)
+
+        for position, board in enumerate(boards):
+            single = vectorized.strategic_scores(vectorized.relative_cells(board, WHITE))
+            assert (batched[position] == single).all()
+
+    def test_medium_move_matches_python(self):
+        """A IA média escolhe a mesma jogada nos dois backends"""
+        rng = random.Random(11)
+        for _ in range(50):
+            rows = _random_rows(rng, 19, rng.randrange(1, 60))
+            numpy_move = self.numpy_ai.get_ai_move(rows, "medium")
+            python_move = self.python_ai.get_ai_move(rows, "medium")
+
+            assert (numpy_move.row, numpy_move.col) == (python_move.row, python_move.col)
+
+    def test_batched_moves_match_single(self):
+        """get_ai_moves dá as mesmas jogadas que get_ai_move uma a uma"""
+        rng = random.Random(13)
+        boards = [_random_rows(rng, size, rng.randrange(1, 40)) for size in (15, 19, 15, 19, 15)]
+
+        batched = self.numpy_ai.get_ai_moves(boards, "medium")
+
+        for rows, move in zip(boards, batched):
+            self.numpy_ai.board_size = len(rows)
+            single = self.numpy_ai.get_ai_move(rows, "medium")
+            assert (move.row, move.col) == (single.row, single.col)
+
+    def test_standard_rules_overline_is_not_a_win(self):
+        """No padrão, a IA média bloqueia o quatro em vez de fazer seis"""
+        rules = get_rules(15, STANDARD)
+        rows = rules.empty_rows()
+        for col in (0, 1, 2, 4, 5):
+            rows[0][col] = "white"
+        for col in range(4):
+            rows[10][col] = "black"
+
+        for ai in (self.numpy_ai, self.python_ai):
+            move = ai.get_ai_move(rows, "medium", PieceColor.WHITE, rules)
+            assert (move.row, move.col) == (10, 4)
+        batched = self.numpy_ai.get_ai_moves([rows], "medium", rules)
+        assert (batched[0].row, batched[0].col) == (10, 4)
+
+    def test_medium_move_matches_python_under_rules(self):
+        """Com regras padrão e Renju, os dois backends escolhem a mesma jogada legal"""
+        rng = random.Random(17)
+        for variant in (STANDARD, RENJU):
+            rules = get_rules(15, variant)
+            for _ in range(40):
+                rows = _random_rows(rng, 15, rng.randrange(1, 70))
+                for piece in (PieceColor.BLACK, PieceColor.WHITE):
+                    numpy_move = self.numpy_ai.get_ai_move(rows, "medium", piece, rules)
+                    python_move = self.python_ai.get_ai_move(rows, "medium", piece, rules)
+                    assert (numpy_move.row, numpy_move.col) == (python_move.row, python_move.col)
+
+                board = rules.board_from_rows(rows)
+                move = self.numpy_ai.get_ai_move(rows, "medium", PieceColor.BLACK, rules)
+                if self.numpy_ai._candidate_cells(board, BLACK):
+                    assert rules.forbidden(board, board.index(move.row, move.col), BLACK) is None
+
+    def test_renju_black_avoids_forbidden_cell(self):
+        """No Renju, as pretas não jogam o duplo três mesmo sendo a melhor casa"""
+        rules = get_rules(15, RENJU)
+        rows = rules.empty_rows()
+        for row, col in ((7, 5), (7, 6), (5, 7), (6, 7)):
+            rows[row][col] = "black"
+        for row, col in ((0, 0), (0, 2), (14, 14), (14, 12)):
+            rows[row][col] = "white"
+
+        numpy_move = self.numpy_ai.get_ai_move(rows, "medium", PieceColor.BLACK, rules)
+        python_move = self.python_ai.get_ai_move(rows, "medium", PieceColor.BLACK, rules)
+
+        assert (numpy_move.row, numpy_move.col) == (python_move.row, python_move.col)
+        assert (numpy_move.row, numpy_move.col) != (7, 7)
+        board = rules.board_from_rows(rows)
+        batched = self.numpy_ai.get_ai_cells([board], "medium", BLACK)
+        assert batched == [board.index(numpy_move.row, numpy_move.col)]